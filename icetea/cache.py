@@ -0,0 +1,193 @@
+"""
+Caching of responses, on top of Django's cache framework.
+
+Cached responses of a handler are invalidated by keeping a version for every
+handler class, which is part of the cache keys of its responses. Successful
+write requests on a handler increment its version, so that all of its
+responses, and the responses of the handlers that depend on it, are cached
+under new keys from then on. Outdated entries simply expire.
+
+The cache used is the one given by the ``ICETEA_CACHE`` setting (an alias of
+``CACHES``), which defaults to ``default``.
+"""
+import time
+from hashlib import md5
+
+from django.conf import settings
+
+try:
+    from django.core.cache import caches
+except ImportError:
+    # Django < 1.7
+    from django.core.cache import get_cache
+else:
+    def get_cache(alias):
+        return caches[alias]
+
+
+KEY_PREFIX = 'icetea'
+
+
+def cache():
+    """
+    Returns the cache that django-icetea uses.
+    """
+    return get_cache(getattr(settings, 'ICETEA_CACHE', 'default'))
+
+
+def handler_name(handler):
+    """
+    Returns the dotted path of a handler class, which identifies it in cache
+    keys.
+
+    @param handler: Handler class or instance, or its dotted path
+    @rtype: str
+    """
+    if isinstance(handler, basestring):
+        return handler
+    if not isinstance(handler, type):
+        handler = handler.__class__
+    return '%s.%s' % (handler.__module__, handler.__name__)
+
+
+def version_key(handler):
+    return '%s:version:%s' % (KEY_PREFIX, handler_name(handler))
+
+
+def versions(*handlers):
+    """
+    Returns the current versions of I{handlers}.
+
+    Handlers with no version yet, are given one based on the current time,
+    so that a version that has been evicted from the cache is never reused.
+
+    @param handlers: Handler classes or instances, or their dotted paths
+    @rtype: tuple
+    @return: Tuple of versions, in the order of I{handlers}
+    """
+    keys = [version_key(handler) for handler in handlers]
+    found = cache().get_many(keys)
+
+    for key in keys:
+        if key not in found:
+            cache().add(key, int(time.time() * 1000), None)
+            found[key] = cache().get(key)
+
+    return tuple(found[key] for key in keys)
+
+
+def invalidate(handler):
+    """
+    Increments the version of I{handler}, so that its cached responses, and
+    the ones of the handlers that depend on it, are not used any more.
+
+    @param handler: Handler class or instance, or its dotted path
+    """
+    key = version_key(handler)
+    try:
+        cache().incr(key)
+    except ValueError:
+        # No version yet
+        versions(handler)
+
+
+def response_key(handler, request, kwargs, emitter_format):
+    """
+    Returns the cache key of the response to I{request}. It covers the
+    versions of the handler and its L{dependencies<BaseHandler.cache_dependencies>},
+    the authenticated user, the keyword arguments of the URL, the
+    querystring and the emitter format.
+
+    @type kwargs: dict
+    @param kwargs: Keyword arguments of the URL
+
+    @type emitter_format: str
+    @param emitter_format: Emitter format
+
+    @rtype: str
+    """
+    user = getattr(request, 'user', None)
+    key = repr((
+        handler_name(handler),
+        versions(handler, *handler.cache_dependencies),
+        getattr(user, 'pk', None),
+        sorted(kwargs.items()),
+        # The order of values matters (eg for the ``order`` parameter), the
+        # order of parameters doesn't.
+        sorted(request.GET.lists()),
+        emitter_format,
+    ))
+    return '%s:response:%s' % (KEY_PREFIX, md5(key).hexdigest())
+
+
+def count_key(handler, request):
+    """
+    Returns the cache key of the total size of the data of I{request}. It
+    covers the versions of the handler and its
+    L{dependencies<BaseHandler.cache_dependencies>}, the authenticated user,
+    the requested path, and the values of the handler's filters in the
+    querystring. Other querystring parameters (eg ordering and slicing) do
+    not affect the total size.
+
+    @rtype: str
+    """
+    user = getattr(request, 'user', None)
+    filters = handler.filters or {}
+    key = repr((
+        handler_name(handler),
+        versions(handler, *handler.cache_dependencies),
+        getattr(user, 'pk', None),
+        request.path,
+        sorted(
+            (name, request.GET.getlist(name))
+            for name in filters if name in request.GET
+        ),
+    ))
+    return '%s:count:%s' % (KEY_PREFIX, md5(key).hexdigest())
+
+
+def filter_key(handler, request):
+    """
+    Returns the cache key of the primary keys of the data that matches the
+    filters of I{request}. It covers the versions of the handler and its
+    L{dependencies<BaseHandler.cache_dependencies>}, the authenticated user,
+    the requested path, and the values of the handler's filters in the
+    querystring. The order and repetitions of the values of a filter do not
+    matter.
+
+    @rtype: str
+    """
+    user = getattr(request, 'user', None)
+    filters = handler.filters or {}
+    key = repr((
+        handler_name(handler),
+        versions(handler, *handler.cache_dependencies),
+        getattr(user, 'pk', None),
+        request.path,
+        sorted(
+            (name, sorted(frozenset(request.GET.getlist(name))))
+            for name in filters if name in request.GET
+        ),
+    ))
+    return '%s:filter:%s' % (KEY_PREFIX, md5(key).hexdigest())
+
+
+def get(key):
+    """
+    Returns the value cached under I{key}, or None.
+    """
+    return cache().get(key)
+
+
+def set(key, value, timeout):
+    """
+    Caches I{value} under I{key}.
+
+    @type timeout: int
+    @param timeout: Timeout in seconds, or I{True} for the cache's default
+    timeout.
+    """
+    if timeout is True:
+        cache().set(key, value)
+    else:
+        cache().set(key, value, timeout)
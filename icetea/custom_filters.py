@@ -4,10 +4,14 @@ application. However I thought that including them in ``django-icetea`` would
 be nice, since they can be useful to more people.
 """
 
+from django.conf import settings
+from django.db import connections
 from django.db.models import Q, Count
 
+from . import indexes
 
-def in_all_filter(data, definition, values):
+
+def in_all_filter(data, definition, values, strategy=None):
     """
     ``@param data``:        The queryset on which the filter will be applied on
 
@@ -17,6 +21,10 @@ def in_all_filter(data, definition, values):
     ``@param values``:      Tuple with the values that will be applied on the
     lookup filters.
 
+    ``@param strategy``:    The strategy that executes the filter, out of
+    ``IN_ALL_STRATEGIES``. If not given, the ``ICETEA_IN_ALL_STRATEGY``
+    setting, or else :meth:`in_all_strategy` picks it.
+
     ``@return``:            Remaining queryset after the filters have been
     applied.
 
@@ -37,11 +45,21 @@ def in_all_filter(data, definition, values):
     with ``values=[1,2,3]``. What the query asks for is: *give me all
     contacts that belong to ALL lists 1, 2 and 3.*
 
-    So basically what we need to find is which ``Membership`` records contain a
-    ``list_id`` with value either 1 or 2 or 3. Then we count the
-    appearances of ``Contact`` instances in this queryset. Every ``Contact`` that
-    appears 3 times in the queryset, appears in all 3 lists, and therefore
-    should be a part of the response.
+    There are several ways to find them, with different performance
+    characteristics, depending on the number of values, the sizes of the
+    tables and the database:
+
+    * ``count``: Find which ``Membership`` records contain a ``list_id``
+      with value either 1 or 2 or 3, and count the appearances of every
+      ``Contact`` in them (``GROUP BY`` / ``HAVING``). Every ``Contact`` that
+      appears 3 times, appears in all 3 lists.
+    * ``exists``: Chain a subquery for every value; contacts whose ``id`` is
+      in the contacts of list 1, and in the contacts of list 2, and so on.
+    * ``intersect``: Select the contacts of every list, and keep the ones
+      that are in all of them, with ``INTERSECT`` (not supported by MySQL).
+    * ``ids``: Select the memberships of all lists at once, intersect the
+      sets of contact ids in Python, and filter the contacts by the
+      remaining ids. Only suitable for small lists.
 
     .. note::
 
@@ -53,8 +71,6 @@ def in_all_filter(data, definition, values):
         So we just consider this as a query with poor semantics, and we return
         only contacts that belong to no list!
     """
-    #TODO: Is this the optimal query???
-
     #   eg. field = memberships__list__in
     field_in = definition[:-4]
     #   eg. field = memberships_list
@@ -65,14 +81,130 @@ def in_all_filter(data, definition, values):
         if value in ['null']:
             return data.filter(**{field_exact: None})
 
-    #   eg. data.filter(memberships__contact__in=values)
-    query = Q(**{field_in: values})
+    # Repeated values don't make a difference
+    unique = []
+    for value in values:
+        if value not in unique:
+            unique.append(value)
+
+    if strategy is None:
+        strategy = getattr(settings, 'ICETEA_IN_ALL_STRATEGY', None) or \
+            in_all_strategy(data, unique)
+
+    return IN_ALL_STRATEGIES[strategy](data, field_in, field_exact, unique)
+
+
+def in_all_strategy(data, values):
+    """
+    ``@param data``:        The queryset on which the filter will be applied on
+
+    ``@param values``:      List of distinct values
+
+    ``@return``:            Name of the strategy to use
 
-    return data.filter(query).\
+    Picks the strategy of :meth:`in_all_filter`, by the number of values and
+    the database. On databases that support ``INTERSECT``, up to
+    ``IN_ALL_EXISTS_LIMIT`` values are filtered with a subquery each
+    (``exists``), and more values with ``intersect``, which selects the
+    matches of every value once, instead of joining them with the rest.
+    Other databases (MySQL) keep the ``count`` strategy.
+
+    The thresholds come from ``tests/benchmarks.py in_all``, on SQLite, where
+    ``count`` and ``ids`` never win.
+    """
+    vendor = connections[data.db].vendor
+    if vendor not in ('sqlite', 'postgresql', 'oracle'):
+        return 'count'
+    if len(values) <= IN_ALL_EXISTS_LIMIT:
+        return 'exists'
+    return 'intersect'
+
+
+def _in_all_count(data, field_in, field_exact, values):
+    """
+    ``GROUP BY`` / ``HAVING`` over the matches of all values.
+    """
+    return data.filter(Q(**{field_in: values})).\
         annotate(count=Count('id')).\
         filter(count=len(values))
 
 
+def _subquery(data, field_exact, value):
+    """
+    Returns a queryset of the primary keys of the model instances of
+    ``data`` for which ``field=value``.
+    """
+    return data.model._default_manager.using(data.db).\
+        filter(**{field_exact: value}).order_by().values('pk')
+
+
+def _in_all_exists(data, field_in, field_exact, values):
+    """
+    A subquery for every value.
+    """
+    for value in values:
+        data = data.filter(pk__in=_subquery(data, field_exact, value))
+    return data
+
+
+def _in_all_intersect(data, field_in, field_exact, values):
+    """
+    ``INTERSECT`` of the subqueries of every value.
+    """
+    connection = connections[data.db]
+    qn = connection.ops.quote_name
+
+    subqueries, params = [], []
+    for value in values:
+        sql, subquery_params = _subquery(data, field_exact, value).query.\
+            get_compiler(connection=connection).as_sql()
+        subqueries.append(sql)
+        params.extend(subquery_params)
+
+    opts = data.model._meta
+    where = '%s.%s IN (%s)' % (
+        qn(opts.db_table), qn(opts.pk.column), ' INTERSECT '.join(subqueries))
+    return data.extra(where=[where], params=params)
+
+
+def _in_all_ids(data, field_in, field_exact, values):
+    """
+    Intersection of the primary keys of the matches of every value, in
+    Python.
+    """
+    ids = {}
+    rows = data.model._default_manager.using(data.db).\
+        filter(**{field_in: values}).order_by().\
+        values_list('pk', field_exact)
+    for pk, value in rows:
+        # Values of the querystring are strings
+        ids.setdefault(unicode(value), set()).add(pk)
+
+    common = None
+    for value in values:
+        matches = ids.get(unicode(value), set())
+        common = matches if common is None else common & matches
+    return data.filter(pk__in=common)
+
+
+# Maps the strategies of ``in_all_filter`` to the functions that execute them
+IN_ALL_STRATEGIES = {
+    'count': _in_all_count,
+    'exists': _in_all_exists,
+    'intersect': _in_all_intersect,
+    'ids': _in_all_ids,
+}
+
+# Maximum number of values, for which ``in_all_strategy`` picks the
+# ``exists`` strategy
+IN_ALL_EXISTS_LIMIT = 2
+
+
+# Maximum number of values in every ``IN`` lookup of ``isearch_filter`` on a
+# shadow column
+ISEARCH_BATCH_SIZE = 900
+
+
 def isearch_filter(data, definition, values):
     """
     ``@param data``:        The queryset on which the filter will be applied on
@@ -95,9 +227,24 @@ def isearch_filter(data, definition, values):
     All queries are applied one after the other, with an OR operator
     joining their results.
 
+    If the field has a lower-cased shadow column (see
+    :class:`icetea.indexes.LowerCaseField`), the lower-cased values are
+    looked up in it instead, with a single indexed ``IN`` lookup per
+    ``ISEARCH_BATCH_SIZE`` values.
+
     """
 
     field = definition[:-9]
+
+    shadow = indexes.shadow_field(data.model, field)
+    if shadow is not None:
+        terms = sorted(set(shadow.shadow(term) for term in values))
+        query = Q()
+        for start in xrange(0, len(terms), ISEARCH_BATCH_SIZE):
+            query |= Q(**{'%s__in' % shadow.name:
+                          terms[start:start + ISEARCH_BATCH_SIZE]})
+        return data.filter(query)
+
     query = Q()
 
     for term in values:
@@ -150,18 +297,71 @@ def in_list_filter(data, definition, values):
 
             Since the JSONField basically has comma-separated quoted values, we
             need to search it for every: "value" (including the quotes), within ``values``.
+
+    If a list index is declared for the field (see :mod:`icetea.indexes`),
+    the values are looked up in the index instead, with a single indexed
+    ``IN`` lookup, and the queryset is limited to their owners.
     """
     field = definition[:-9]
 
+    index = indexes.list_index(data.model, field)
+    if index is not None:
+        terms = [index.normalize(term) for term in values]
+        if all(index.indexable(term) for term in terms):
+            owners = index.objects.db_manager(data.db).\
+                filter(value__in=terms).values('owner')
+            return data.filter(pk__in=owners)
+
     query = Q()
     for term in values:
         query |= Q(**{'%s__icontains' % field: '"' + term + '"'})
     return data.filter(query)
 
 
+def fulltext_filter(data, definition, values):
+    """
+    ``@param data``:        The queryset on which the filter will be applied on
+
+    ``@param definition``:  A string representing ``<index> + __fulltext``, eg
+    ``fulltext__fulltext``
+
+    ``@param values``:      Tuple with the search terms.
+
+    ``@return``:            Remaining queryset after the filter has been
+    applied.
+
+    Handles the ``__fulltext`` lookup filter, which performs a full-text
+    search on the full-text index named ``definition[:-10]`` of the model
+    (see :class:`icetea.indexes.FullTextIndex`). Every value matches the
+    records that contain all of its words, in any of the indexed fields, and
+    the records that match any of the values are ordered by rank.
+
+    .. rubric:: Example
+
+    Query on a handler of contacts, with the filter ``search`` defined as
+    ``fulltext__fulltext``, and a full-text index on their ``name`` and
+    ``surname``: ``/contacts/?search=john smith&search=jane``.
+
+    If the model has no such index, ``definition[:-10]`` is taken to be a
+    field, which is searched with an ``icontains`` lookup per value, with an
+    OR operator in between.
+    """
+    name = definition[:-10]
+
+    index = indexes.fulltext_index(data.model, name)
+    if index is not None:
+        return index.filter(data, values)
+
+    query = Q()
+    for term in values:
+        query |= Q(**{'%s__icontains' % name: term})
+    return data.filter(query)
+
+
 # Maps custom lookups to their handler methods
 filter_to_method = {
     '__in_all': in_all_filter,
     '__isearch': isearch_filter,
     '__in_list': in_list_filter,
+    '__fulltext': fulltext_filter,
 }
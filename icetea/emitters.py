@@ -1,17 +1,103 @@
 import StringIO
+import datetime
 import decimal
-import json
+from importlib import import_module
+from itertools import izip
+
+from django.conf import settings
 
 from django.core.exceptions import ObjectDoesNotExist
 from django.core.serializers.json import DateTimeAwareJSONEncoder
 from django.db.models import Model
-from django.db.models.fields import FieldDoesNotExist
+from django.db.models.fields import Field, FieldDoesNotExist
 from django.db.models.query import QuerySet
 from django.db.models.related import RelatedObject
-from django.utils.encoding import smart_unicode
+from django.utils.encoding import force_unicode, smart_unicode
+from django.utils.functional import Promise
 from django.utils.xmlutils import SimplerXMLGenerator
 
 
+# Kinds of fields in a serialization plan. See L{Emitter.compile_plan}.
+FAKE_STATIC = 'fake_static'
+FAKE_DYNAMIC = 'fake_dynamic'
+RELATED = 'related'
+M2M = 'm2m'
+RELATED_OBJECT = 'related_object'
+FK = 'fk'
+LOCAL = 'local'
+OTHER = 'other'
+
+# Types that ``smart_unicode(value, strings_only=True)`` returns untouched.
+PROTECTED_TYPES = frozenset((
+    unicode, int, long, float, bool, type(None),
+    datetime.datetime, datetime.date, datetime.time,
+))
+
+
+class TypeMapper(dict):
+    """
+    Dictionary of pairs {<API Handler>: <Model>}, which also keeps an index
+    of pairs {<Model>: <API Handler>}, so that the handler responsible for a
+    model class can be found without scanning all registered handlers.
+
+    The index is rebuilt lazily, after every modification of the
+    dictionary. Model classes that are not directly mapped (eg deferred or
+    proxy model classes), are resolved by walking their MRO, and the result
+    is cached in the index.
+    """
+    def __init__(self, *args, **kwargs):
+        super(TypeMapper, self).__init__(*args, **kwargs)
+        self._index = None
+
+    def _invalidate(method):
+        def wrapper(self, *args, **kwargs):
+            self._index = None
+            return method(self, *args, **kwargs)
+        wrapper.__name__ = method.__name__
+        return wrapper
+
+    __setitem__ = _invalidate(dict.__setitem__)
+    __delitem__ = _invalidate(dict.__delitem__)
+    clear = _invalidate(dict.clear)
+    pop = _invalidate(dict.pop)
+    popitem = _invalidate(dict.popitem)
+    setdefault = _invalidate(dict.setdefault)
+    update = _invalidate(dict.update)
+
+    del _invalidate
+
+    def get_handler(self, model):
+        """
+        Returns the API handler responsible for the model class I{model}, or
+        I{None} if there is no such handler.
+        """
+        index = self._index
+        if index is None:
+            # If more than one handlers are registered for the same model,
+            # the first one we come across wins.
+            index = {}
+            for _handler, _model in self.items():
+                index.setdefault(_model, _handler)
+            self._index = index
+
+        try:
+            return index[model]
+        except KeyError:
+            pass
+
+        # Check whether one of its superclasses is mapped. This is useful
+        # in cases ``model`` is not a pure model class, but rather a
+        # Deferred one.
+        handler = None
+        for base in model.__mro__[1:]:
+            if base in index:
+                handler = index[base]
+                break
+
+        index[model] = handler
+        return handler
+
+
 # Wrapped the ``import xlwt`` in try/catch, otherwise sphinx crashes.
 try:
     import xlwt
@@ -35,7 +121,14 @@ class Emitter(object):
     EMITTERS = {}
 
     # Maps pairs of {<API Handler class>: <Model>}
-    TYPEMAPPER = {}
+    TYPEMAPPER = TypeMapper()
+
+    # Caches serialization plans, in pairs of
+    # {(<API Handler>, <Model>, <fields>, <nested>): <plan>}
+    PLANS = {}
+
+    # Maximum amount of serialization plans kept in L{PLANS}
+    PLANS_SIZE = 512
 
     def __init__(self, handler, payload, fields=()):
         # API Handler, handling this request
@@ -65,6 +158,12 @@ class Emitter(object):
             @param nested: Are the fields of I{thing} nested, or are they
             first class fields? This is relevant only for models.
             """
+            # Most of the values that we serialize are plain scalars, which
+            # would fall through all type checks below, only to be returned
+            # untouched by ``smart_unicode``.
+            if type(thing) in PROTECTED_TYPES:
+                return thing
+
             ret = None
 
             if isinstance(thing, QuerySet):
@@ -109,6 +208,10 @@ class Emitter(object):
             If there is no handler responsible for constructing the
             representation of the model type that ``data`` belongs to, the
             method will try to construct a default representation of the data.
+
+            The fields are not looked up on every instance. Instead, we follow
+            the serialization plan (see L{Emitter.get_plan}) of the model type
+            that ``data`` belongs to.
             """
             def _fk(data, field):
                 """
@@ -117,13 +220,13 @@ class Emitter(object):
                 """
                 return _any(getattr(data, field.name), fields=(), nested=True)
 
-            def _m2m(data, field):
+            def _m2m(data):
                 """
-                Serializes and returns the many-to-many field ``field`` of the
-                ``data`` model instance. Many-to-Many fields are always nested.
+                Serializes and returns the ManyRelatedManager ``data``, of a
+                many-to-many field. Many-to-Many fields are always nested.
                 """
                 return [_model(m, fields=(), nested=True)
-                        for m in getattr(data, field.name).iterator()]
+                        for m in _iterate(data)]
 
             def _related(data):
                 """
@@ -133,152 +236,90 @@ class Emitter(object):
                 nested.
                 """
                 return [_model(m, fields=(), nested=True)
-                        for m in data.iterator()]
+                        for m in _iterate(data)]
 
-            def get_fields(handler, fields, nested):
+            def _iterate(data):
                 """
-                Returns a tuple with the final output field names.
+                Returns an iterable over the model instances of the related
+                manager ``data``. If the instances have already been
+                prefetched (see ``QuerySet.prefetch_related``), they are
+                simply read from the prefetch cache. Otherwise they are
+                streamed from the database.
                 """
-                # If the model is nested, we assemble the fields with the
-                # following formula
-                if nested:
-                    fields = set(handler.allowed_out_fields) - set(handler.exclude_nested)
-
-                # If the model is not nested, and the ``fields`` is still
-                # empty, then we use the ``allowed_out_fields`` that the API
-                # handler for model type of ``data`` defined.  (When could this
-                # happen? In the case that a BaseHandler would like to return a
-                # model instance of type A as a first class citizen. If that
-                # BaseHandler has an empty ``allowed_out_fields`` tuple, but
-                # the Handler for the model A would dictate a different
-                # representation. Then we use the representation that the
-                # handler for A defined.
-                elif not fields:
-                    fields = handler.allowed_out_fields
-                return fields
+                queryset = data.all()
+                if queryset._result_cache is not None:
+                    return queryset
+                return queryset.iterator()
 
-            ret = {}
             handler = self.in_typemapper(data)
 
-            if handler:
-                fields = get_fields(handler, fields, nested)
+            # No handler could be found. So we fallback to the string
+            # represenation of the model instance
+            if not handler:
+                return smart_unicode(data, strings_only=True)
 
-                for field_name in fields:
-                    # Try to retrieve the field by name
+            # Instances of querysets with deferred fields (see
+            # ``QuerySet.only`` and ``QuerySet.defer``) belong to a deferred
+            # proxy class of their model. They are represented exactly like
+            # instances of the model itself.
+            model = type(data)
+            if model._deferred:
+                model = model._meta.proxy_for_model
+
+            ret = {}
+            plan = self.get_plan(handler, model, fields, nested)
+
+            for field_name, kind, field_object in plan:
+                # Fake static field. Its value is computed by the model.
+                if kind == FAKE_STATIC:
+                    ret[field_name] = _any(data._compute_fake_static_field(field_name))
+                    continue
+
+                # Fake dynamic field. Its value has already been computed in
+                # the handler, so we simply read the value and serialize it.
+                if kind == FAKE_DYNAMIC:
                     try:
-                        field_object, model, direct, m2m = data._meta.get_field_by_name(field_name)
-
-                        # Django 1.7 and up now include the field attname in
-                        # the Options name.map. This means that both the field
-                        # name and field attname will be found by
-                        # `get_field_by_name`. For example the following
-                        # definition:
-                        #
-                        # class Foo(models.Model):
-                        #      bar = ForeignKeyField(...)
-                        #
-                        # In Django 1.6 get_field_by_name("bar_id") would raise
-                        # a FieldDoesNotExist exception but starting in 1.7 it
-                        # will return the field.
-                        #
-                        # This is a work around to maintain the 1.6 behaviour.
-                        if direct and field_object.rel is not None and field_name.endswith("_id"):
-                            raise FieldDoesNotExist
-
-                    except FieldDoesNotExist:
-                        # Field is not a physical model field.
-                        # So it's either a fake static field, or a fake dynamic
-                        # field.
-                        # In the first case, it is defined in the model's
-                        # ``_fake_static_fields`` tuple. So we invoke the
-                        # ``_compute_fake_static_field`` method to get its
-                        # value.
-                        # In the second case, its value has already been
-                        # computed in the handler, so we simple read the value
-                        # and serialize it.
-
-                        # So, is it a fake static field?
-                        if hasattr(data, '_fake_static_fields'):
-                            if field_name in data._fake_static_fields:
-                                try:
-                                    ret[field_name] = _any(data._compute_fake_static_field(field_name))
-                                except AttributeError:
-                                    raise
-                                else:
-                                    continue
-
-                        # Then it's a fake dynamic field
-                        try:
-                            ret[field_name] = _any(getattr(data, field_name))
-                        except:
-                            # Field hasn't been found on this model.
-                            # It's most likely defined as a fake dynamic field,
-                            # but has never been populated on this model
-                            # instance. This means there's most likely a bug in
-                            # the handler's ``inject_fake_dynamic_fields``
-                            # method.
-                            continue
-
-                    # The field ``field_object`` is a physical model field.
-                    else:
-                        try:
-                            value = getattr(data, field_name)
-                        except (AttributeError, ObjectDoesNotExist):
-                            # Happens if the field f does not exist on this
-                            # model instance.
-                            # For example: model class B inherits from model
-                            # class A. Therefore, every instance of A has
-                            # ReverseObject references to B. However, a pure
-                            # instance of model A, will throw a DoesNotExist
-                            # exception when trying to read the reference to B.
-                            continue
-
-                        # ``field_name``: Name of the field (string)
-                        # ``value``: Value of the field
-                        # ``field_object``: Instance of a subclass of
-                        #                   ``django.models.db.fields.Field``
-
-                        # Check if the field is a RelatedManager object(reverse
-                        # FK)
-                        if not direct and not m2m:
-                            ret[field_name] = _related(value)
-                            continue
-
-                        # Check if the field is many_to_many
-                        elif not direct and m2m:
-                            if field_object.serialize:
-                                ret[field_name] = _m2m(data, field_object)
-                                continue
-
-                        # Check if the field is a RelatedObject instance.
-                        # Happens when a modelB inherits from modelA. In that
-                        # case, in the representation of modelA, the modelB
-                        # instance appears as a RelatedObject.
-                        elif isinstance(field_object, RelatedObject):
-                            ret[field_name] = _model(value)
-
-                        # Check if it is a local field or virtual field
-                        elif (field_object in (data._meta.local_fields + data._meta.virtual_fields)
-                                and hasattr(field_object, 'serialize')
-                                and field_object.serialize):
-                            # Is it a serializable physical field on the model?
-                            if not field_object.rel:
-                                ret[field_name] = _any(value)
-                                continue
-                            # Is it a foreign key?
-                            else:
-                                ret[field_name] = _fk(data, field_object)
-                                continue
-
-                        # Else simple try to serialize the value
-                        else:
-                            ret[field_name] = _any(value)
-                            continue
+                        ret[field_name] = _any(getattr(data, field_name))
+                    except:
+                        # Field hasn't been found on this model.
+                        # It's most likely defined as a fake dynamic field,
+                        # but has never been populated on this model
+                        # instance. This means there's most likely a bug in
+                        # the handler's ``inject_fake_dynamic_fields``
+                        # method.
+                        pass
+                    continue
+
+                # The field ``field_object`` is a physical model field.
+                try:
+                    value = getattr(data, field_name)
+                except (AttributeError, ObjectDoesNotExist):
+                    # Happens if the field f does not exist on this
+                    # model instance.
+                    # For example: model class B inherits from model
+                    # class A. Therefore, every instance of A has
+                    # ReverseObject references to B. However, a pure
+                    # instance of model A, will throw a DoesNotExist
+                    # exception when trying to read the reference to B.
+                    continue
+
+                if kind == RELATED:
+                    ret[field_name] = _related(value)
+
+                elif kind == M2M:
+                    # Reverse many-to-many relations are represented by a
+                    # RelatedObject, which has no ``serialize`` attribute.
+                    if getattr(field_object, 'serialize', True):
+                        ret[field_name] = _m2m(value)
+
+                elif kind == RELATED_OBJECT:
+                    ret[field_name] = _model(value)
+
+                elif kind == FK:
+                    ret[field_name] = _fk(data, field_object)
 
-            # No handler could be found. So we fallback to the string
-            # represenation of the model instance
-            else:
-                ret = smart_unicode(data, strings_only=True)
+                else:
+                    ret[field_name] = _any(value)
 
             return ret
 
@@ -288,7 +329,22 @@ class Emitter(object):
 
             Queryset data might be both nested or first class citizens of the
             representation.
+
+            If the queryset hasn't been evaluated yet, and all the fields to
+            output are database columns of the queryset's model, we don't
+            construct model instances at all. We fetch the columns with
+            ``values_list``, and build the representation out of the rows.
             """
+            columns = not nested and self.flat_columns(data, fields)
+            if columns:
+                ret = []
+                for row in data.values_list(*columns).iterator():
+                    item = {}
+                    for field_name, value in izip(columns, row):
+                        item[field_name] = _any(value)
+                    ret.append(item)
+                return ret
+
             return [_any(v, fields, nested) for v in data]
 
         def _list(data, fields=(), nested=False):
@@ -317,18 +373,178 @@ class Emitter(object):
         """
         Returns the I{model}'s associated API handler.
         """
-        # First check whether this model instance belongs to a class
-        # which is directly mapped in the TYPEMAPPER
-        for _handler, _model in self.TYPEMAPPER.items():
-            if type(model_instance) is _model:
-                return _handler
-
-        # Else, check whether one of its superclasses is mapped
-        # in the typemapper (this is useful in cases ``model_instance``
-        # is not a pure model instance, but rather a Deferred one.
-        for _handler, _model in self.TYPEMAPPER.items():
-            if isinstance(model_instance, _model):
-                return _handler
+        return self.TYPEMAPPER.get_handler(type(model_instance))
+
+    def get_plan(self, handler, model, fields, nested):
+        """
+        Returns the serialization plan for instances of I{model}. Plans are
+        compiled once (see L{Emitter.compile_plan}), and kept in L{PLANS}, so
+        that the model's fields are not looked up again for every instance
+        that we serialize.
+
+        @param handler: API Handler responsible for the representation of
+        I{model}
+        @param model: Model class
+        @param fields: Fields that we are asked to output
+        @param nested: Is the model nested in the data response?
+
+        @rtype: tuple
+        @return: Serialization plan
+        """
+        # Nested models don't take ``fields`` into account
+        key = (handler, model, nested and () or tuple(fields), nested)
+
+        try:
+            return self.PLANS[key]
+        except KeyError:
+            plan = self.compile_plan(handler, model, fields, nested)
+
+        # Keep the cache bounded. Plans are cheap to compile, so we simply
+        # start over once the cache is full.
+        if len(self.PLANS) >= self.PLANS_SIZE:
+            self.PLANS.clear()
+        self.PLANS[key] = plan
+
+        return plan
+
+    def compile_plan(self, handler, model, fields, nested):
+        """
+        Compiles and returns the serialization plan for instances of
+        I{model}.
+
+        The plan is a tuple of C{(field_name, kind, field_object)} triplets, one
+        for every field that should be output, in the order that they
+        should be output. I{kind} indicates how the field's value is
+        retrieved and serialized, and is one of L{FAKE_STATIC},
+        L{FAKE_DYNAMIC}, L{RELATED}, L{M2M}, L{RELATED_OBJECT}, L{FK},
+        L{LOCAL} or L{OTHER}.
+        """
+        # If the model is nested, we assemble the fields with the
+        # following formula
+        if nested:
+            fields = set(handler.allowed_out_fields) - set(handler.exclude_nested)
+
+        # If the model is not nested, and the ``fields`` is still
+        # empty, then we use the ``allowed_out_fields`` that the API
+        # handler for model type of ``data`` defined.  (When could this
+        # happen? In the case that a BaseHandler would like to return a
+        # model instance of type A as a first class citizen. If that
+        # BaseHandler has an empty ``allowed_out_fields`` tuple, but
+        # the Handler for the model A would dictate a different
+        # representation. Then we use the representation that the
+        # handler for A defined.
+        elif not fields:
+            fields = handler.allowed_out_fields
+
+        opts = model._meta
+        fake_static_fields = getattr(model, '_fake_static_fields', ())
+
+        plan = []
+        for field_name in fields:
+            # Try to retrieve the field by name
+            try:
+                field_object, _, direct, m2m = opts.get_field_by_name(field_name)
+
+                # Django 1.7 and up now include the field attname in
+                # the Options name.map. This means that both the field
+                # name and field attname will be found by
+                # `get_field_by_name`. For example the following
+                # definition:
+                #
+                # class Foo(models.Model):
+                #      bar = ForeignKeyField(...)
+                #
+                # In Django 1.6 get_field_by_name("bar_id") would raise
+                # a FieldDoesNotExist exception but starting in 1.7 it
+                # will return the field.
+                #
+                # This is a work around to maintain the 1.6 behaviour.
+                if direct and field_object.rel is not None and field_name.endswith("_id"):
+                    raise FieldDoesNotExist
+
+            except FieldDoesNotExist:
+                # Field is not a physical model field.
+                # So it's either a fake static field, or a fake dynamic
+                # field.
+                # In the first case, it is defined in the model's
+                # ``_fake_static_fields`` tuple.
+                # In the second case, its value is computed in the handler.
+                if field_name in fake_static_fields:
+                    kind = FAKE_STATIC
+                else:
+                    kind = FAKE_DYNAMIC
+                field_object = None
+
+            else:
+                # Check if the field is a RelatedManager object(reverse
+                # FK)
+                if not direct and not m2m:
+                    kind = RELATED
+
+                # Check if the field is many_to_many (forward or reverse)
+                elif m2m:
+                    kind = M2M
+
+                # Check if the field is a RelatedObject instance.
+                # Happens when a modelB inherits from modelA. In that
+                # case, in the representation of modelA, the modelB
+                # instance appears as a RelatedObject.
+                elif isinstance(field_object, RelatedObject):
+                    kind = RELATED_OBJECT
+
+                # Check if it is a serializable local field or virtual field
+                elif (field_object in (opts.local_fields + opts.virtual_fields)
+                        and getattr(field_object, 'serialize', False)):
+                    # Is it a foreign key?
+                    if field_object.rel:
+                        kind = FK
+                    else:
+                        kind = LOCAL
+
+                # Else simply try to serialize the value
+                else:
+                    kind = OTHER
+
+            plan.append((field_name, kind, field_object))
+
+        return tuple(plan)
+
+    def flat_columns(self, data, fields):
+        """
+        Returns the names of the fields that should be output for the model
+        instances of queryset I{data}, if they can be read with
+        C{data.values_list()}. Else returns I{None}.
+
+        This is the case if I{data} has not been evaluated yet, it is not a
+        distinct or aggregate query, and all fields of the serialization plan
+        are concrete non-relational fields. Fake fields, relations and fields
+        with custom descriptors (eg. fields using I{SubfieldBase}) require
+        model instances.
+        """
+        if data._result_cache is not None:
+            return None
+
+        query = data.query
+        if (query.distinct or query.group_by is not None
+                or getattr(query, 'aggregates', None)):
+            return None
+
+        model = data.model
+        handler = self.TYPEMAPPER.get_handler(model)
+        if not handler:
+            return None
+
+        columns = []
+        for field_name, kind, field_object in self.get_plan(handler, model, fields, False):
+            if (kind not in (LOCAL, OTHER)
+                    or not isinstance(field_object, Field)
+                    or field_object.rel is not None
+                    or field_object.column is None
+                    or hasattr(model, field_object.attname)):
+                return None
+            columns.append(field_name)
+
+        return tuple(columns)
 
     def render(self):
         """
@@ -369,15 +585,170 @@ class Emitter(object):
         return cls.EMITTERS.pop(name, None)
 
 
+class JSONEncoder(DateTimeAwareJSONEncoder):
+    """
+    JSON encoder that understands timestamps, decimals and lazy strings.
+
+    Only its I{default} method is used, so that it applies to any of the
+    L{JSON_BACKENDS}.
+    """
+    def default(self, o):
+        if isinstance(o, Promise):
+            return force_unicode(o)
+        return super(JSONEncoder, self).default(o)
+
+
+# JSON backends, in pairs of {<name>: (<module>, <options of ``dumps``>)}. The
+# options make the output of all backends identical: objects that the
+# backend would otherwise encode in its own way, are passed to
+# ``JSONEncoder.default``.
+JSON_BACKENDS = {
+    'json': ('json', {}),
+    'simplejson': ('simplejson', {
+        'use_decimal': False,
+        'namedtuple_as_object': False,
+        'for_json': False,
+    }),
+}
+
+# Backends tried in turn, if the ``ICETEA_JSON_BACKEND`` setting is not set,
+# for indented and compact output respectively. The encoder of ``simplejson``
+# is only faster than the one of ``json`` for compact output.
+JSON_BACKENDS_AUTO = {
+    False: ('json',),
+    True: ('simplejson', 'json'),
+}
+
+
+def json_dumps(backend=None, compact=False):
+    """
+    Returns the I{dumps} function of the JSON backend I{backend}, with its
+    options applied. See L{JSON_BACKENDS}.
+
+    @type backend: str
+    @param backend: Name of the backend. If I{None}, the first backend of
+    L{JSON_BACKENDS_AUTO} that is installed is used.
+
+    @type compact: bool
+    @param compact: Whether the output will be compact
+
+    @rtype: callable
+    @return: The backend's I{dumps}
+    """
+    if backend is None:
+        for name in JSON_BACKENDS_AUTO[compact]:
+            try:
+                return json_dumps(name)
+            except ImportError:
+                continue
+
+    module, options = JSON_BACKENDS[backend]
+    dumps = import_module(module).dumps
+
+    def backend_dumps(data, **kwargs):
+        kwargs.update(options)
+        return dumps(data, **kwargs)
+    return backend_dumps
+
+
 class JSONEmitter(Emitter):
     """
     JSON emitter, understands timestamps.
+
+    The output is indented, unless compact output is requested (see
+    L{compact}). It is serialized by the JSON backend that the
+    ``ICETEA_JSON_BACKEND`` setting specifies (see L{json_dumps}).
     """
+    # Caches the I{dumps} function of every backend, in pairs of
+    # {(<backend>, <compact>): <dumps>}
+    DUMPS = {}
+
+    encoder = JSONEncoder()
+
+    def compact(self, request):
+        """
+        Returns I{True} if the output should be compact, with no indentation
+        and whitespace. The querystring parameter ``compact`` decides, and
+        if not given, the ``ICETEA_JSON_COMPACT`` setting.
+
+        @type request: HTTPRequest
+        @param request: Incoming request, or None
+
+        @rtype: bool
+        """
+        compact = request.GET.get('compact', None) if request is not None else None
+        if compact is None:
+            return getattr(settings, 'ICETEA_JSON_COMPACT', False)
+        return compact != 'false'
+
+    def dumps(self, data, compact=False):
+        """
+        Serializes I{data} into JSON.
+
+        @param data: Serializable data
+
+        @type compact: bool
+        @param compact: Whether the output should be compact
+
+        @rtype: str or unicode
+        @return: JSON representation of I{data}
+        """
+        key = getattr(settings, 'ICETEA_JSON_BACKEND', None), bool(compact)
+        if key not in self.DUMPS:
+            self.DUMPS[key] = json_dumps(*key)
+
+        if compact:
+            options = dict(separators=(',', ':'))
+        else:
+            options = dict(indent=4, separators=(', ', ': '))
+
+        return self.DUMPS[key](data, default=self.encoder.default,
+            ensure_ascii=False, **options)
+
     def render(self, request):
         # I{self.data} is already in a serializable form, since it can only
         # contain any of the following python data structures: dict, list, str.
         # So here we simply serialize it into JSON.
-        return json.dumps(self.data, cls=DateTimeAwareJSONEncoder, ensure_ascii=False, indent=4)
+        return self.dumps(self.data, self.compact(request))
+
+    def stream(self, request):
+        """
+        Generator of the JSON representation of I{self.data}, in pieces.
+
+        I{self.data} is a dictionary whose I{data} key is an iterator of
+        serializable records. The records are serialized one at a time, as
+        the iterator yields them. The rest of the dictionary is serialized
+        after the iterator has been exhausted, so that it may still be
+        updated meanwhile (eg with debug information).
+
+        The output is identical to the one of L{render}, apart from the order
+        of the dictionary keys (I{data} comes first).
+        """
+        compact = self.compact(request)
+        if compact:
+            newline, indent, item_separator, key_separator = '', '', ',', ':'
+        else:
+            newline, indent, item_separator, key_separator = '\n', ' ' * 4, ', ', ': '
+
+        def dumps(data, depth):
+            return self.dumps(data, compact).replace('\n', '\n' + indent * depth)
+
+        yield '{' + newline + indent + '"data"' + key_separator + '['
+        separator = newline + indent * 2
+        for item in self.data['data']:
+            yield separator + dumps(item, 2)
+            separator = item_separator + newline + indent * 2
+        if separator.startswith(item_separator):
+            yield newline + indent + ']'
+        else:
+            yield ']'
+
+        for key, value in self.data.iteritems():
+            if key == 'data':
+                continue
+            yield item_separator + newline + indent + \
+                dumps(key, 1) + key_separator + dumps(value, 1)
+        yield newline + '}'
 
 
 Emitter.register('json', JSONEmitter, 'application/json; charset=utf-8')
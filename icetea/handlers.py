@@ -1,12 +1,25 @@
+import json
 import logging
-
-from django.core.exceptions import ValidationError, ObjectDoesNotExist
-from django.db import models
-
+import operator
+from collections import OrderedDict
+from itertools import islice
+
+from django.core.exceptions import ValidationError, ObjectDoesNotExist, \
+    NON_FIELD_ERRORS
+from django.db import IntegrityError, connections, models, router, \
+    transaction
+from django.db.models import signals
+from django.db.models.constants import LOOKUP_SEP
+from django.db.models.deletion import Collector
+from django.db.models.query import prefetch_related_objects
+from django.db.models.sql.datastructures import EmptyResultSet
+
+from . import cache, indexes
 from .authentication import DjangoAuthentication, NoAuthentication
 from .custom_filters import filter_to_method
 from .emitters import Emitter
 from .exceptions import UnprocessableEntity, ValidationErrorList
+from .utils import decode_cursor, encode_cursor
 
 
 logger = logging.getLogger(__name__)
@@ -71,6 +84,10 @@ class BaseHandlerMeta(type):
         if cls.slice is True:
             cls.slice = 'slice'
 
+        # Indicates which querystring parameter will request cursor pagination
+        if getattr(cls, 'cursor', None) is True:
+            cls.cursor = 'cursor'
+
         # Indicates Authentication method.
         if cls.authentication is True:
             cls.authentication = DjangoAuthentication()
@@ -180,6 +197,50 @@ class BaseHandler():
     only the data will be returned.
     """
 
+    stream = False
+    """
+    Specifies whether the response data of plural I{GET} requests is streamed.
+    If I{True}, the data is serialized in chunks of L{stream_chunk_size}
+    records while the response is being sent, instead of being serialized as
+    a whole beforehand. The querystring parameter ``stream`` overrides it per
+    request. Only applies to emitters that support streaming (I{json}).
+    """
+
+    stream_chunk_size = 500
+    """
+    Number of records that are loaded and serialized at a time, when the
+    response data is streamed. See L{stream}.
+    """
+
+    response_cache = False
+    """
+    Specifies whether the responses to I{GET} requests are cached, using
+    Django's cache framework (see L{cache}). If I{True}, they are cached with
+    the default timeout of the cache. It can also be the timeout, in seconds.
+
+    Cached responses are invalidated by successful I{POST}, I{PUT} and
+    I{DELETE} requests on the handler, or on any of the
+    L{cache_dependencies}.
+    """
+
+    cache_dependencies = ()
+    """
+    Handlers whose successful write requests invalidate the cached responses
+    of this handler (see L{response_cache}). Tuple of handler classes, or
+    their dotted paths.
+    """
+
+    etag = False
+    """
+    Specifies whether responses to I{GET} requests carry an I{ETag} header,
+    so that clients can make conditional requests with I{If-None-Match}.
+    Requests whose I{ETag} matches are answered with I{304 Not Modified}.
+
+    The I{ETag} is computed from the value that L{etag_validator} returns,
+    before the request is executed. If it returns I{None}, it's computed from
+    the response data, without the debug information.
+    """
+
     # TODO: Instead of doing so, why not simply doing like the ``slice`` and
     # ``order`` parameters.
     # excel = True # allows output to excel. default file name(file.xls) is
@@ -264,18 +325,7 @@ class BaseHandler():
         B{after} all filters and ordering (not slicing) are applied.
         """
         data = self.working_set(request, *args, **kwargs)
-
-        filters = self.filters or {}
-        if filters:
-            for name, definition in filters.iteritems():
-                values = request.GET.getlist(name)
-                if values:
-                    try:
-                        data = self.filter_data(request, data, definition, values)
-                    except ValueError:
-                        # Happens when giving invalid filter type data, like
-                        # for example providing a string instead of integer.
-                        raise UnprocessableEntity('Invalid filter data')
+        data = self.apply_filters(request, data)
 
         order = request.GET.getlist(self.order)
         if order:
@@ -290,6 +340,30 @@ class BaseHandler():
         """
         raise NotImplementedError
 
+    def apply_filters(self, request, data):
+        """
+        Applies the filters whose querystring parameters are given in
+        I{request}, with L{filter_data}.
+
+        @type request: HTTPRequest
+        @param request: Incoming request
+
+        @param data: Working set (see L{working_set})
+
+        @return: Filtered data
+        """
+        filters = self.filters or {}
+        for name, definition in filters.iteritems():
+            values = request.GET.getlist(name)
+            if values:
+                try:
+                    data = self.filter_data(request, data, definition, values)
+                except ValueError:
+                    # Happens when giving invalid filter type data, like
+                    # for example providing a string instead of integer.
+                    raise UnprocessableEntity('Invalid filter data')
+        return data
+
     def filter_data(self, request, data, definition, values):
         """
         Applies filters to the provided data.
@@ -328,16 +402,28 @@ class BaseHandler():
         if not slice:
             return data, None
 
-        user_want_to_count = request.GET.get('count', None)
-        if user_want_to_count is None:
-            if self.count and total is None: # uses default behavior defined in the class
-                total = len(data)
-        else:
-            if user_want_to_count != 'false' and total is None:
-                total = len(data)
+        if total is None and self.count_requested(request):
+            total = len(data)
 
         return self.slice_data(data, slice), total
 
+    def count_requested(self, request):
+        """
+        Returns I{True} if the total size of the data should be included in
+        the response. The querystring parameter ``count`` decides, and if not
+        given, the L{count} attribute.
+
+        @type request: HTTPRequest object
+        @param request: Incoming request
+
+        @rtype: bool
+        """
+        user_want_to_count = request.GET.get('count', None)
+        if user_want_to_count is None:
+            # uses default behavior defined in the class
+            return bool(self.count)
+        return user_want_to_count != 'false'
+
     def slice_data(self, data, slice):
         """
         Slices and returns the provided data.
@@ -348,6 +434,30 @@ class BaseHandler():
 
         @return: Sliced data. If data is not sliceable, simply return it as is.
         """
+        # start: Slicing starts here
+        # stop:  Stop slicing here -1
+        # step:  Step
+        start, stop, step = self.slice_args(slice)
+
+        try:
+            return data[start:stop:step]
+        except:
+            # Allows us to run L{response_slice_data} without having to worry
+            # whether the data is actually sliceable.
+            return data
+
+    def slice_args(self, slice):
+        """
+        Returns the arguments of the slice notation I{slice}.
+
+        @type slice: str
+        @param slice: Slice notation ``start:stop:step``, as captured from the
+        querystring
+
+        @rtype: tuple
+        @return: (start, stop, step). Missing or invalid arguments are
+        I{None}.
+        """
         slice = slice.split(':')
 
         # Gather all slice arguments
@@ -359,17 +469,7 @@ class BaseHandler():
                 param = None
             finally:
                 slice_args.append(param)
-        # start: Slicing starts here
-        # stop:  Stop slicing here -1
-        # step:  Step
-        start, stop, step = slice_args
-
-        try:
-            return data[start:stop:step]
-        except:
-            # Allows us to run L{response_slice_data} without having to worry
-            # whether the data is actually sliceable.
-            return data
+        return tuple(slice_args)
 
     def execute_request(self, request, *args, **kwargs):
         """
@@ -411,38 +511,167 @@ class BaseHandler():
                 request.dataset = self.data(request, *args, **kwargs)
             self.validate(request, *args, **kwargs)
 
+        # Metadata that any step of the request adds to the response, next
+        # to ``data`` and ``total``
+        request.envelope = {}
+
         # Pick action to run
         action = getattr(self,  CALLMAP.get(request.method.upper()))
         # Run it
         data = action(request, *args, **kwargs)
         # Select output fields
         fields = self.get_output_fields(request)
+
         # Slice
         sliced_data, total = self.response_slice_data(request, data)
-        # inject fake dynamic fields to the response data
-        sliced_data = self.inject_fake_dynamic_fields(request, sliced_data, fields)
-
-        # Use the emitter to serialize any python objects / data structures
-        # within I{sliced_data}, to serializable forms(dict, list, string),
-        # so that the specific emitter we use for returning
-        # the response, can easily serialize them in some other format,
-        # The L{Emitter} is responsible for making sure that only fields contained in
-        # I{fields} will be included in the result.
-        emitter = Emitter(self, sliced_data, fields)
-        ser_data = emitter.construct()
+
+        minimal = self.minimal_requested(request)
+        if minimal:
+            # Only the primary keys, or the number, of the affected records
+            ser_data = self.minimal_data(sliced_data, minimal)
+        elif self.stream_response(request, sliced_data):
+            # Generator of serialized records. Records are loaded,
+            # injected with fake dynamic fields and serialized in chunks,
+            # while the response is being emitted.
+            ser_data = self.stream_data(request, sliced_data, fields)
+        else:
+            # inject fake dynamic fields to the response data
+            sliced_data = self.inject_fake_dynamic_fields(request, sliced_data, fields)
+
+            # Use the emitter to serialize any python objects / data structures
+            # within I{sliced_data}, to serializable forms(dict, list, string),
+            # so that the specific emitter we use for returning
+            # the response, can easily serialize them in some other format,
+            # The L{Emitter} is responsible for making sure that only fields contained in
+            # I{fields} will be included in the result.
+            emitter = Emitter(self, sliced_data, fields)
+            ser_data = emitter.construct()
 
         # Structure the response data
         ret = {'data': ser_data}
         if total is not None:
             ret['total'] = total
+        ret.update(request.envelope)
         # Add extra metadata
         self.enrich_response(ret, data)
 
         if request.method.upper() == 'DELETE':
             self.data_safe_for_delete(data)
 
+        # Cached responses of this handler, and of the handlers that depend on
+        # it, are now outdated.
+        if request.method.upper() in ('POST', 'PUT', 'DELETE'):
+            cache.invalidate(self)
+
         return ret
 
+    def minimal_requested(self, request):
+        """
+        Returns the minimal representation of the response data of a write
+        request that has been requested; I{pk} for the primary keys of the
+        affected records, or I{count} for their number. Returns I{None} for
+        the full representation.
+
+        Only L{ModelHandler} supports minimal representations.
+
+        @type request: HTTPRequest object
+        @param request: Incoming request
+
+        @rtype: str
+        """
+        return None
+
+    def etag_validator(self, request, *args, **kwargs):
+        """
+        Override this method in your handler, in order to return a cheap
+        validator of the data that a I{GET} request will output (eg the
+        latest modification time of the requested data). Any two responses
+        with equal validators are considered identical, so the validator
+        should change whenever the output changes.
+
+        It's called before the request is executed, so that requests whose
+        I{ETag} matches can be answered without executing the request or
+        serializing its result. See L{etag}.
+
+        @type request: HTTPRequest object
+        @param request: Incoming request
+
+        @return: Any value whose representation identifies the output, or
+        I{None} if there is no cheap validator.
+        """
+        return None
+
+    def stream_response(self, request, data):
+        """
+        Returns I{True} if the response data should be streamed. See
+        L{stream}.
+
+        Only the data of plural I{GET} requests can be streamed, and only if
+        the handler doesn't override L{inject_fake_dynamic_fields} or
+        L{enrich_response}, which expect the sliced data as a whole.
+
+        @type request: HTTPRequest object
+        @param request: Incoming request
+
+        @param data: Sliced data
+
+        @rtype: bool
+        @return: Whether the response data should be streamed
+        """
+        if request.method.upper() != 'GET' or \
+            not isinstance(data, (models.query.QuerySet, list, tuple)):
+            return False
+
+        cls = type(self)
+        if cls.inject_fake_dynamic_fields.im_func is not \
+            BaseHandler.inject_fake_dynamic_fields.im_func or \
+            cls.enrich_response.im_func is not \
+            BaseHandler.enrich_response.im_func:
+            return False
+
+        user_want_to_stream = request.GET.get('stream', None)
+        if user_want_to_stream is None:
+            return bool(self.stream)
+        return user_want_to_stream != 'false'
+
+    def stream_data(self, request, data, fields):
+        """
+        Generator of the serialized records of I{data}. Records are loaded
+        L{stream_chunk_size} at a time. Querysets are read with
+        I{iterator()}, and their I{prefetch_related} lookups are performed
+        per chunk. Fake dynamic fields are injected per chunk (see
+        L{inject_fake_dynamic_fields}), which therefore receives lists of
+        records; handlers that override it are not streamed (see
+        L{stream_response}).
+
+        @type request: HTTPRequest object
+        @param request: Incoming request
+
+        @param data: Sliced data
+
+        @type fields: tuple
+        @param fields: Fields to output
+
+        @return: Iterator of serialized records
+        """
+        if isinstance(data, models.query.QuerySet):
+            lookups = data._prefetch_related_lookups
+            records = data.iterator()
+        else:
+            lookups = ()
+            records = iter(data)
+
+        while True:
+            chunk = list(islice(records, self.stream_chunk_size))
+            if not chunk:
+                break
+            if lookups:
+                prefetch_related_objects(chunk, lookups)
+
+            chunk = self.inject_fake_dynamic_fields(request, chunk, fields)
+            for item in Emitter(self, chunk, fields).construct():
+                yield item
+
     def inject_fake_dynamic_fields(self, request, data, fields):
         """
         @param request: Incoming request object
@@ -568,6 +797,193 @@ class ModelHandler(BaseHandler):
     the filter I{filter(id__in=[12, 14])}, on the corresponding model.
     """
 
+    auto_related = True
+    """
+    Specifies whether the working set should follow the relations that will
+    be included in the response, using I{select_related} for single-valued
+    relations and I{prefetch_related} for multi-valued relations. See
+    L{related_lookups}.
+    """
+
+    auto_only = True
+    """
+    Specifies whether I{GET} requests should only load the model columns that
+    are needed for the response. See L{only_data}.
+    """
+
+    sample_batch_size = 900
+    """
+    Maximum number of primary keys in every I{pk__in} query of stepped
+    slices (see L{slice_data}) and set-based updates (see L{set_update}). It
+    should be below the maximum number of query parameters of the database
+    (999 for older SQLite versions).
+    """
+
+    unique_batch_size = 900
+    """
+    Maximum number of query parameters in every query that validates the
+    uniqueness of the model instances of bulk I{POST} and plural I{PUT}
+    requests (see L{validate_unique_data}).
+    """
+
+    bulk_create_batch_size = 500
+    """
+    Maximum number of model instances inserted by every query of bulk I{POST}
+    requests, using Django's I{bulk_create}. If I{None}, the instances are
+    saved one at a time. See L{bulk_insertable} for when instances are
+    always saved one at a time.
+    """
+
+    bulk_create_atomic = False
+    """
+    Specifies the semantics of I{POST} requests whose model instances fail
+    to be inserted in the database (eg because they violate a uniqueness
+    constraint among themselves). If I{True}, the request is all-or-nothing:
+    nothing is created, and the failures are reported with a I{400}
+    response. If I{False}, the rest of the instances are created, and the
+    failures are reported in the I{errors} key of the response.
+
+    Either way, the failures are reported per I{index} of the request data.
+    """
+
+    set_update = False
+    """
+    Specifies whether plural I{PUT} requests update the data with a single
+    I{QuerySet.update}, instead of loading, validating and saving every model
+    instance. The incoming values are validated once, against the model
+    fields. If I{True}, the response contains the updated records. If
+    I{count}, the response data is just the number of updated records.
+
+    Only applies to requests that L{set_updatable} allows; the rest follow
+    the usual path.
+    """
+
+    minimal = False
+    """
+    Specifies the default representation of the response data of write
+    (I{POST}, I{PUT} and I{DELETE}) requests. If I{False}, the affected
+    model instances are serialized in full. If I{pk}, the response data is
+    only their primary keys, and if I{count}, only their number. I{True} is
+    the same as I{pk}. Relations are not loaded at all for minimal
+    representations.
+
+    It can be overridden per request with the querystring parameter
+    ``minimal`` (I{pk}, I{count} or I{false}), or with the I{Prefer} header
+    (I{return=minimal} or I{return=representation}). See
+    L{minimal_requested}.
+    """
+
+    delete_batch_size = None
+    """
+    Maximum number of records deleted in every transaction of plural
+    I{DELETE} requests. The records are deleted in batches ordered by primary
+    key, so that a large deletion doesn't lock a large part of the table for
+    long; at the cost of atomicity. If I{None}, all records are deleted in a
+    single transaction. See L{delete_data}.
+    """
+
+    update_changed_fields = False
+    """
+    Specifies whether I{PUT} requests only save the fields of the model
+    instances that actually changed, using I{save(update_fields=...)}, and
+    skip the instances that didn't change at all. The values of the fields
+    are compared as they would be saved in the database, so that eg I{"5"}
+    and I{5} are the same value for an I{IntegerField}. Fields with I{auto_now} are saved along with
+    any changes.
+
+    Instances are saved as a whole if the request updates anything other
+    than concrete model fields. See L{field_values} and L{changed_fields}.
+    """
+
+    count_cache = False
+    """
+    Specifies whether the total size of sliced (or paginated) data is
+    cached, so that paging through the same data doesn't count it for every
+    page. If I{True}, it is cached with the default timeout of the cache. It
+    can also be the timeout, in seconds.
+
+    Cached totals are kept per authenticated user, requested path and
+    values of the L{filters}, and are invalidated like cached responses (see
+    L{response_cache}).
+    """
+
+    filter_cache = False
+    """
+    Specifies whether the primary keys of the data that matches the
+    L{filters} of I{GET} requests are cached, so that requests that repeat
+    the same filters, eg with another slice or ordering, select the data by
+    primary key instead of filtering it again. If I{True}, they are cached
+    with the default timeout of the cache. It can also be the timeout, in
+    seconds.
+
+    Cached primary keys are kept per authenticated user, requested path and
+    values of the L{filters} (in any order), and are invalidated like cached
+    responses (see L{response_cache}). See L{apply_filters}.
+    """
+
+    filter_cache_size = 900
+    """
+    Maximum number of primary keys cached per request (see
+    L{filter_cache}). Larger results are not cached. It should be below the
+    maximum number of query parameters of the database, since the cached
+    primary keys are selected with a single I{pk__in} query.
+    """
+
+    count_strategy = 'exact'
+    """
+    Specifies how the total size of sliced (or paginated) data is computed.
+    With I{exact}, the data is counted. With I{approximate}, the estimate of
+    the query planner of the database is used if it's at least
+    L{approximate_count_threshold}, and the response is marked with
+    I{approximate: true}. Estimates are only available on PostgreSQL and
+    MySQL. Otherwise, the data is counted. See L{estimate_count}.
+    """
+
+    approximate_count_threshold = 10000
+    """
+    Estimated sizes below this threshold are counted exactly. See
+    L{count_strategy}.
+    """
+
+    has_more = False
+    """
+    Specifies whether sliced requests report whether there are more records
+    after the slice (I{has_more}), instead of the total size of the data
+    (I{total}). This saves counting the data. It can be overridden per
+    request with the querystring parameter ``has_more``. See
+    L{has_more_data}.
+    """
+
+    cursor = False
+    """
+    Specifies the querystring parameter for requesting cursor (keyset)
+    pagination of the data. If I{True}, the parameter I{cursor} is used. If
+    I{False}, cursor pagination is disabled. See L{cursor_data}.
+    """
+
+    cursor_size = 50
+    """
+    Default number of records in every page of cursor pagination. It can be
+    overridden per request with the querystring parameter ``limit``, up to
+    L{cursor_max_size}.
+    """
+
+    cursor_max_size = 1000
+    """
+    Maximum number of records in every page of cursor pagination.
+    """
+
+    etag_field = None
+    """
+    Name of a model field, whose values change whenever a model instance
+    changes (eg a I{DateTimeField} with I{auto_now}). If defined, the
+    validator of I{GET} requests (see L{etag_validator}) is the maximum value
+    of the field over the requested data, along with its count.
+
+    Relations of the model that are included in the response, are not
+    taken into account.
+    """
+
     read = True
     create = True
     update = True
@@ -597,41 +1013,51 @@ class ModelHandler(BaseHandler):
         @rtype: None
         @return: None
         """
-        def validate_all_post(instances):
+        def validate_all(instances, params):
             """
             Generator that validates a list of L{model} instances.
-            Should be used to validate the model instance in the case of Bulk
-            POST and plural PUT requests.
+            Should be used to validate the model instances in the case of Bulk
+            POST and plural PUT requests. The uniqueness of all instances is
+            validated at once, with L{validate_unique_data}.
 
             @param instances: List of L{model} instances
 
+            @param params: Callable, that returns the I{params} of the
+            ValidationError of an instance, given the instance and its index
+
             For every instance in I{instances}, it returns None if the
             instance validates correctly, or a ValidationError if not.
             """
-            for i, instance in enumerate(instances):
+            errors, exclude = [], []
+            for instance in instances:
+                # Like ``full_clean`` does, only the fields that passed
+                # validation are validated for uniqueness.
+                instance_errors = {}
                 try:
-                    instance.full_clean()
+                    instance.full_clean(validate_unique=False)
                 except ObjectDoesNotExist:
-                    yield ValidationError(
-                        'Foreign Keys on model not defined',
-                        params={'index': i}
-                    )
+                    instance_errors = None
                 except ValidationError as e:
-                    e.params = {'index': i}
-                    yield e
-                yield None
+                    instance_errors = e.update_error_dict(instance_errors)
+                errors.append(instance_errors)
+                exclude.append(instance_errors is None and \
+                    [field.name for field in self.model._meta.fields] or \
+                    [name for name in instance_errors if name != NON_FIELD_ERRORS])
 
-        def validate_all_put(instances):
-            for instance in instances:
-                try:
-                    instance.full_clean()
-                except ObjectDoesNotExist:
+            unique_errors = self.validate_unique_data(instances, exclude)
+
+            for i, instance in enumerate(instances):
+                if errors[i] is None:
                     yield ValidationError(
                         'Foreign Keys on model not defined',
-                        params={'id': instance.id}
+                        params=params(i, instance)
                     )
-                except ValidationError as e:
-                    e.params = {'id': instance.id}
+                    continue
+                for name, messages in unique_errors[i].iteritems():
+                    errors[i].setdefault(name, []).extend(messages)
+                if errors[i]:
+                    e = ValidationError(errors[i])
+                    e.params = params(i, instance)
                     yield e
                 yield None
 
@@ -665,20 +1091,39 @@ class ModelHandler(BaseHandler):
                 request.data = \
                     [self.model(**data_item) for data_item in request.data]
 
-                error_list = [error for error in validate_all_post(request.data) if error]
+                error_list = [error for error in validate_all(
+                    request.data, lambda i, instance: {'index': i}) if error]
                 if error_list:
                     raise ValidationErrorList(error_list)
 
         elif request.method.upper() == 'PUT':
             current = getattr(request, 'dataset', None)
 
+            if not isinstance(current, self.model) and \
+                self.set_updatable(request):
+                # Set-based update. The values are validated once, and
+                # applied by ``update``.
+                request.update_values = self.clean_update_values(request.data)
+                request.data = current
+                return
+
+            # Values of the updated fields before the update, for every
+            # instance whose changes are tracked (see
+            # ``update_changed_fields``)
+            request.original_values = {}
+
             def update(instance, update_items):
                 # Update ``instance`` with the key, value pairs in
                 # ``update_values``
+                if self.update_changed_fields:
+                    original = self.field_values(instance, request.data)
+                    if original is not None:
+                        request.original_values[instance.pk] = original
                 [setattr(instance, field, value) for field, value in update_items]
 
             # (key, value) pairs to update
             update_items = request.data.items()
+            request.update_fields = request.data.keys()
 
             if isinstance(current, self.model):
                 # Single model instance
@@ -690,11 +1135,110 @@ class ModelHandler(BaseHandler):
                 # Update, validate all, make list of all exceptions that
                 # occur, and pack them in a ValidationErrorList.
                 [update(instance, update_items) for instance in current]
-                error_list = [error for error in validate_all_put(current) if error]
+                error_list = [error for error in validate_all(
+                    current, lambda i, instance: {'id': instance.id}) if error]
                 if error_list:
                     raise ValidationErrorList(error_list)
             request.data = current
 
+    def validate_unique_data(self, instances, exclude=None):
+        """
+        Validates the uniqueness of I{instances}, like Django's
+        I{validate_unique} does for every one of them, but with a single
+        query per unique constraint (per L{unique_batch_size} values) for all
+        of them, instead of a query per unique constraint per instance.
+        Instances that have the same values for a unique constraint as a
+        preceding instance, are not unique either.
+
+        When I{instances} are updated, the current values of all of them
+        in the database are ignored.
+
+        The values that the queries return are compared to the ones of
+        I{instances} in Python, so values that only the collation of the
+        database considers equal (eg differing in case, under the default
+        collations of MySQL) are not detected. Saving such instances fails
+        with an I{IntegrityError}, which L{insert_data} and L{update} turn
+        into validation errors.
+
+        @type instances: list
+        @param instances: Model instances
+
+        @type exclude: list
+        @param exclude: List of the names of the fields to exclude from
+        validation, for every instance in I{instances}
+
+        @rtype: list
+        @return: List of dictionaries of {field name: [errors]}, for every
+        instance in I{instances}
+        """
+        if exclude is None:
+            exclude = [()] * len(instances)
+        errors = [{} for instance in instances]
+
+        # {(model class, unique check): [(index, values)]}
+        checks = OrderedDict()
+        for i, instance in enumerate(instances):
+            unique_checks, date_checks = \
+                instance._get_unique_checks(exclude=exclude[i])
+
+            for model_class, unique_check in unique_checks:
+                values = []
+                for name in unique_check:
+                    field = instance._meta.get_field(name)
+                    value = getattr(instance, field.attname)
+                    if value is None or \
+                        (field.primary_key and not instance._state.adding):
+                        break
+                    values.append(value)
+                else:
+                    checks.setdefault((model_class, tuple(unique_check)), []).\
+                        append((i, tuple(values)))
+
+            # Rarely used, so checked one instance at a time
+            for name, messages in \
+                instance._perform_date_checks(date_checks).iteritems():
+                errors[i].setdefault(name, []).extend(messages)
+
+        for (model_class, unique_check), candidates in checks.iteritems():
+            updated = set(
+                instance._get_pk_val(model_class._meta)
+                for instance in instances if not instance._state.adding
+            )
+
+            values = list(set(value for i, value in candidates))
+            size = max(1, self.unique_batch_size // len(unique_check))
+            existing = set()
+            for start in xrange(0, len(values), size):
+                batch = values[start:start + size]
+                if len(unique_check) == 1:
+                    lookup = models.Q(**{'%s__in' % unique_check[0]:
+                                         [item[0] for item in batch]})
+                else:
+                    lookup = reduce(operator.or_, [
+                        models.Q(**dict(zip(unique_check, item)))
+                        for item in batch
+                    ])
+                rows = model_class._default_manager.filter(lookup).\
+                    values_list(*(unique_check + ('pk',)))
+                existing.update(
+                    row[:-1] for row in rows if row[-1] not in updated
+                )
+
+            if len(unique_check) == 1:
+                key = unique_check[0]
+            else:
+                key = NON_FIELD_ERRORS
+
+            seen = set()
+            for i, value in candidates:
+                if value in existing or value in seen:
+                    errors[i].setdefault(key, []).append(
+                        instances[i].unique_error_message(model_class, unique_check)
+                    )
+                seen.add(value)
+
+        return errors
+
     def working_set(self, request, *args, **kwargs):
         """
         Returns the working set of the model handler. It should be the whole
@@ -712,82 +1256,291 @@ class ModelHandler(BaseHandler):
         * Keyword arguments are defined in the URL mapper, and are usually in
         the form of I{/api_endpoint/<id>/}.
 
-        * For faster query execution, consider the use of
+        * If L{auto_related} is enabled, the relations that will be included
+        in the response are followed with
         U{select_related<https://docs.djangoproject.com/en/dev/ref/models/querysets/#select-related>}
-        Be aware though, that it can be very U{memory-intensive
-        <https://code.djangoproject.com/ticket/17>}. A middle-of-the-way
-        solution would probably be to use it with the I{depth} parameter.
+        and
+        U{prefetch_related<https://docs.djangoproject.com/en/dev/ref/models/querysets/#prefetch-related>}.
         """
         try:
-            return self.model.objects.filter(**kwargs)
+            data = self.model.objects.filter(**kwargs)
         except ValueError:
             raise
 
-    def data_item(self, request, *args, **kwargs):
+        # Minimal representations don't include any relations
+        if self.auto_related and not self.minimal_requested(request):
+            data = self.related_data(request, data)
+
+        return data
+
+    def etag_validator(self, request, *args, **kwargs):
         """
-        Returns a single model instance, if such has been pointed out. Else the
-        super class returns None.
+        If L{etag_field} is defined, returns the maximum value of
+        L{etag_field} over the requested data, along with its count. The
+        requested data is not loaded.
 
         @type request: HTTPRequest object
         @param request: Incoming request
 
-        @return: Model instance, or None
+        @rtype: tuple
+        @return: (max_value, count), or I{None}
         """
-        # First we check if we have been provided with conditions that are
-        # capable of denoting a single item. If we would try to ``get`` an
-        # instance based on *kwargs* right away, things would go wrong in case
-        # of a set with one element. This element would be returned by this
-        # method as if it was explicitly requested.
-        for field in kwargs.keys():
-            try:
-                if self.model._meta.get_field(field).unique:
-                    # We found a parameter that identifies a single item, so
-                    # we assume that singular data was requested. If the data
-                    # turns out not to be there, an ``ObjectDoesNotExist``
-                    # exception will be raised.
-                    value = kwargs.get(field)
-                    if value is not None:
-                        # Ignore ``None`` valued keyword-arguments
-                        return self.working_set(request, *args, **kwargs).get(**{ field: value })
-            except models.FieldDoesNotExist:
-                # No field named *field* on *self.model*, try next field.
-                pass
-        return super(ModelHandler, self).data_item(request, *args, **kwargs)
+        if not self.etag_field:
+            return None
 
-    def filter_data(self, request, data, definition, values):
+        data = self.data(request, *args, **kwargs)
+        if isinstance(data, self.model):
+            return getattr(data, self.etag_field), 1
+
+        aggregate = data.aggregate(
+            etag_max=models.Max(self.etag_field), etag_count=models.Count('pk'))
+        return aggregate['etag_max'], aggregate['etag_count']
+
+    def only_data(self, request, data):
         """
+        Limits the columns that the queryset I{data} loads, to the ones
+        needed for the response of the current request. See
+        L{output_columns}.
+
+        Nothing is limited if I{data} already defers or limits its columns,
+        or follows all of its relations with I{select_related}.
+
         @type request: HTTPRequest object
         @param request: Incoming request
 
         @type data: QuerySet
-        @param data: Data on which the filter iwll be applied
+        @param data: Queryset of L{model} instances
 
-        @type definition: str, tuple
-        @param definition: Filter definition. Could be:
+        @rtype: QuerySet
+        @return: Queryset that loads only the needed columns
+        """
+        query = data.query
+        if query.select_related is True or query.deferred_loading != (set(), True):
+            return data
 
-        * A Django U{field lookup
-        <https://docs.djangoproject.com/en/dev/topics/db/queries/#field-lookups>},
-        defining both the field and the lookup. For example I{id__in}, which
-        defines the field {id} and the lookup filter to be applied upon it.
+        columns = self.output_columns(self.get_output_fields(request))
+        if columns is None:
+            return data
 
-        * A {a custom filter} as defined in L{custom_filters}, defining
-        both the field and the filter. For example, I{emails__in_list},
-        which defines the field {emails} and the filter {__in_list} to be
-        applied upon it.
+        # Relations followed with ``select_related`` cannot be deferred.
+        if query.select_related:
+            columns.extend(query.select_related.keys())
 
-        * A tuple defining the fields on which an OR based Full Text search will be performed.
-        For example I{('name', 'surname')}.
+        # Ordering fields are read by cursor pagination
+        if self.cursor and self.cursor in request.GET:
+            names = dict((field.attname, field.name)
+                for field in self.model._meta.fields)
+            columns.extend(names[name]
+                for name, _ in self.cursor_ordering(data) if name in names)
 
-        @type values: list
-        @param values: The values to be applied on the filter.
+        return data.only(*columns)
 
-        @rtype: QuerySet
-        @return: Filtered queryset
+    def output_columns(self, fields):
         """
-        if isinstance(definition, basestring):
-            # If the definition's suffix is equal to the name of a custom
-            # lookup filter, call the corresponding method.
-            for lookup in filter_to_method:
+        Returns the names of the L{model} fields whose columns are needed in
+        order to output the fields I{fields}. These are the primary key, and
+        the local fields and foreign keys in I{fields}. Many-to-many and
+        reverse relations only need the primary key.
+
+        Fake fields might depend on any field of the model, so if I{fields}
+        contains any of them, all columns are needed and I{None} is returned.
+
+        @type fields: tuple
+        @param fields: Fields that will be output
+
+        @rtype: list
+        @return: List of field names, or None
+        """
+        opts = self.model._meta
+        columns = [opts.pk.name]
+
+        for name in fields:
+            try:
+                field, _, direct, m2m = opts.get_field_by_name(name)
+            except models.FieldDoesNotExist:
+                return None
+
+            if direct and not m2m and field.name not in columns:
+                columns.append(field.name)
+
+        return columns
+
+    def related_data(self, request, data):
+        """
+        Applies I{select_related} and I{prefetch_related} on the queryset
+        I{data}, for the relations that will be included in the response of
+        the current request.
+
+        @type request: HTTPRequest object
+        @param request: Incoming request
+
+        @type data: QuerySet
+        @param data: Queryset of L{model} instances
+
+        @rtype: QuerySet
+        @return: Queryset that follows the relations
+        """
+        select, prefetch = self.related_lookups(self.get_output_fields(request))
+
+        if select:
+            data = data.select_related(*select)
+        if prefetch:
+            data = data.prefetch_related(*prefetch)
+
+        return data
+
+    def related_lookups(self, fields):
+        """
+        Returns the lookups of the relations that the emitter will follow in
+        order to output the L{model} fields I{fields}.
+
+        Relations are followed recursively, for as long as the related models
+        are represented by some handler (see L{emitters.Emitter.TYPEMAPPER}).
+        In that case, the fields of the related model that will be output are
+        that handler's I{allowed_out_fields - exclude_nested}.
+
+        @type fields: tuple
+        @param fields: Fields that will be output
+
+        @rtype: tuple
+        @return: Tuple of (select, prefetch). I{select} is a list of lookups
+        for I{select_related} (foreign keys and one-to-one relations).
+        I{prefetch} is a list of lookups for I{prefetch_related} (many-to-many
+        and reverse foreign key relations, and any relation that is reached
+        through them).
+        """
+        select, prefetch = [], []
+
+        def follow(model, fields, prefix, multiple, seen):
+            for name in fields:
+                try:
+                    field, _, direct, m2m = model._meta.get_field_by_name(name)
+                except models.FieldDoesNotExist:
+                    # Fake static or dynamic field
+                    continue
+
+                if direct:
+                    # Foreign key attnames (``<field>_id``) are not followed
+                    # by the emitter. See L{emitters.Emitter.compile_plan}.
+                    if getattr(field, 'rel', None) is None or name.endswith('_id'):
+                        continue
+                    related_model = field.rel.to
+                    single = not m2m
+                else:
+                    related_model = field.model
+                    single = not m2m and field.field.unique
+
+                lookup = prefix + name
+                if single and not multiple:
+                    select.append(lookup)
+                else:
+                    prefetch.append(lookup)
+
+                # Follow the fields of the related model's nested
+                # representation. Models that we have already passed by are
+                # not followed again.
+                handler = Emitter.TYPEMAPPER.get_handler(related_model)
+                if handler is not None and related_model not in seen:
+                    follow(
+                        related_model,
+                        set(handler.allowed_out_fields) - set(handler.exclude_nested),
+                        lookup + '__',
+                        multiple or not single,
+                        seen + (related_model,),
+                    )
+
+        follow(self.model, fields, '', False, (self.model,))
+
+        return select, prefetch
+
+    def data_item(self, request, *args, **kwargs):
+        """
+        Returns a single model instance, if such has been pointed out. Else the
+        super class returns None.
+
+        @type request: HTTPRequest object
+        @param request: Incoming request
+
+        @return: Model instance, or None
+        """
+        # First we check if we have been provided with conditions that are
+        # capable of denoting a single item. If we would try to ``get`` an
+        # instance based on *kwargs* right away, things would go wrong in case
+        # of a set with one element. This element would be returned by this
+        # method as if it was explicitly requested.
+        for field in kwargs.keys():
+            try:
+                if self.model._meta.get_field(field).unique:
+                    # We found a parameter that identifies a single item, so
+                    # we assume that singular data was requested. If the data
+                    # turns out not to be there, an ``ObjectDoesNotExist``
+                    # exception will be raised.
+                    value = kwargs.get(field)
+                    if value is not None:
+                        # Ignore ``None`` valued keyword-arguments
+                        data = self.working_set(request, *args, **kwargs)
+                        if self.auto_only and request.method.upper() == 'GET':
+                            data = self.only_data(request, data)
+                        return data.get(**{ field: value })
+            except models.FieldDoesNotExist:
+                # No field named *field* on *self.model*, try next field.
+                pass
+        return super(ModelHandler, self).data_item(request, *args, **kwargs)
+
+    def read(self, request, *args, **kwargs):
+        """
+        Reads the requested data. For plural requests, the columns that the
+        data loads are limited to the ones needed for the response (see
+        L{auto_only}).
+
+        @type request: HTTPRequest object
+        @param request: Incoming request
+
+        @rtype: Model or QuerySet
+        @return: Result dataset
+        """
+        data = super(ModelHandler, self).read(request, *args, **kwargs)
+
+        if (self.auto_only and isinstance(data, models.query.QuerySet)
+                and request.method.upper() == 'GET'):
+            data = self.only_data(request, data)
+
+        return data
+
+    def filter_data(self, request, data, definition, values):
+        """
+        @type request: HTTPRequest object
+        @param request: Incoming request
+
+        @type data: QuerySet
+        @param data: Data on which the filter iwll be applied
+
+        @type definition: str, tuple
+        @param definition: Filter definition. Could be:
+
+        * A Django U{field lookup
+        <https://docs.djangoproject.com/en/dev/topics/db/queries/#field-lookups>},
+        defining both the field and the lookup. For example I{id__in}, which
+        defines the field {id} and the lookup filter to be applied upon it.
+
+        * A {a custom filter} as defined in L{custom_filters}, defining
+        both the field and the filter. For example, I{emails__in_list},
+        which defines the field {emails} and the filter {__in_list} to be
+        applied upon it.
+
+        * A tuple defining the fields on which an OR based Full Text search will be performed.
+        For example I{('name', 'surname')}.
+
+        @type values: list
+        @param values: The values to be applied on the filter.
+
+        @rtype: QuerySet
+        @return: Filtered queryset
+        """
+        if isinstance(definition, basestring):
+            # If the definition's suffix is equal to the name of a custom
+            # lookup filter, call the corresponding method.
+            for lookup in filter_to_method:
                 if definition.endswith(lookup):
                     return filter_to_method[lookup](data, definition, values)
             return data.filter(**{ definition: values })
@@ -809,6 +1562,47 @@ class ModelHandler(BaseHandler):
 
         return data
 
+    def apply_filters(self, request, data):
+        """
+        Applies the filters of I{request}, like L{BaseHandler.apply_filters}
+        does, unless L{filter_cache} is enabled and the primary keys of the
+        data that matches them are cached, in which case I{data} is limited
+        to those. The primary keys are cached for I{GET} requests whose
+        filters match at most L{filter_cache_size} records, and don't order
+        them (eg by full-text rank), since the order is lost.
+
+        @type request: HTTPRequest
+        @param request: Incoming request
+
+        @type data: QuerySet
+        @param data: Working set (see L{working_set})
+
+        @rtype: QuerySet
+        @return: Filtered data
+        """
+        filters = self.filters or {}
+        if not self.filter_cache or request.method.upper() != 'GET' or \
+            not any(name in request.GET for name in filters):
+            return super(ModelHandler, self).apply_filters(request, data)
+
+        key = cache.filter_key(self, request)
+        pks = cache.get(key)
+        if pks is not None:
+            return data.filter(pk__in=pks)
+
+        filtered = super(ModelHandler, self).apply_filters(request, data)
+        if filtered.query.order_by != data.query.order_by or \
+            filtered.query.extra_order_by != data.query.extra_order_by:
+            return filtered
+
+        pks = list(filtered.order_by().values_list('pk', flat=True)
+                   [:self.filter_cache_size + 1])
+        if len(pks) > self.filter_cache_size:
+            return filtered
+
+        cache.set(key, pks, self.filter_cache)
+        return data.filter(pk__in=pks)
+
     def order_data(self, data, *order):
         """
         """
@@ -821,26 +1615,31 @@ class ModelHandler(BaseHandler):
         @type request: HTTPRequest
         @param request: Incoming request
 
-        @type data: Model or Queryset
+        @type data: Model, Queryset or int
         @param data: Dataset to slice
 
         @rtype: list
         @return: List of (sliced_data, total)
         """
-        # Single model instance cannot be sliced
-        if isinstance(data, self.model) or not request.GET.get(self.slice, None):
+        # Single model instance cannot be sliced, and neither can the number
+        # of updated records (see ``set_update``)
+        if isinstance(data, (self.model, int, long)):
+            return data, None
+
+        # Cursor pagination has been requested
+        if self.cursor and self.cursor in request.GET:
+            return self.cursor_data(request, data)
+
+        if not request.GET.get(self.slice, None):
             return data, None
 
+        if self.has_more_requested(request):
+            return self.has_more_data(request, data)
+
         total = None
-        user_want_to_count = request.GET.get('count', None)
-        if user_want_to_count is None:
-            if self.count: # uses default behavior defined in the class
-                # Slicing is allowed, and has been requested, AND we have a queryset
-                total = data.count()
-        else:
-            if user_want_to_count != 'false':
-                # Slicing is allowed, and has been requested, AND we have a queryset
-                total = data.count()
+        if self.count_requested(request):
+            # Slicing is allowed, and has been requested, AND we have a queryset
+            total = self.count_data(request, data)
 
         # ``data`` gets sliced
         sliced_data, _ = super(ModelHandler, self).response_slice_data(request, data, total)
@@ -848,10 +1647,405 @@ class ModelHandler(BaseHandler):
         # Return sliced, total
         return sliced_data, total
 
+    def count_data(self, request, data):
+        """
+        Returns the total size of I{data}, according to L{count_strategy},
+        and caches it if L{count_cache} is enabled.
+
+        @type request: HTTPRequest
+        @param request: Incoming request
+
+        @type data: QuerySet
+        @param data: Dataset to count
+
+        @rtype: int
+        @return: Total size of I{data}
+        """
+        key = total = None
+        if self.count_cache:
+            key = cache.count_key(self, request)
+            total = cache.get(key)
+
+        if total is None:
+            estimate = None
+            if self.count_strategy == 'approximate':
+                estimate = self.estimate_count(data)
+                if estimate is not None and estimate < self.approximate_count_threshold:
+                    estimate = None
+            total = (estimate, True) if estimate is not None else (data.count(), False)
+
+            if key is not None:
+                cache.set(key, total, self.count_cache)
+
+        total, approximate = total
+        if approximate:
+            request.envelope['approximate'] = True
+        return total
+
+    def estimate_count(self, data):
+        """
+        Returns the size of I{data}, as estimated by the query planner of the
+        database, or I{None} if the database doesn't provide estimates.
+        Estimates are taken from I{EXPLAIN} on PostgreSQL and MySQL.
+
+        @type data: QuerySet
+        @param data: Dataset to estimate
+
+        @rtype: int
+        """
+        connection = connections[data.db]
+        if connection.vendor not in ('postgresql', 'mysql'):
+            return None
+
+        try:
+            sql, params = data.values('pk').query.sql_with_params()
+        except EmptyResultSet:
+            return 0
+
+        cursor = connection.cursor()
+        try:
+            if connection.vendor == 'postgresql':
+                cursor.execute('EXPLAIN (FORMAT JSON) ' + sql, params)
+                plan = cursor.fetchone()[0]
+                if isinstance(plan, basestring):
+                    plan = json.loads(plan)
+                return int(plan[0]['Plan']['Plan Rows'])
+            else:
+                cursor.execute('EXPLAIN ' + sql, params)
+                columns = [column[0] for column in cursor.description]
+                return int(cursor.fetchone()[columns.index('rows')] or 0)
+        finally:
+            cursor.close()
+
+    def slice_data(self, data, slice):
+        """
+        Slices and returns the provided data.
+
+        Querysets can't be sliced with a step in the database, so stepped
+        slices (eg ``0:100000:100``) are sampled by primary key instead: only
+        the primary keys of the range are read, and the model instances of
+        every I{step}-th key are then loaded. See L{sample_data}.
+
+        @param data: Dataset to slice
+        @param slice: Querydict with ``slice`` parameter, as captured from the
+        querystring
+
+        @return: Sliced data. If data is not sliceable, simply return it as is.
+        """
+        start, stop, step = self.slice_args(slice)
+        if not isinstance(data, models.query.QuerySet) or \
+            step is None or step <= 1 or (start or 0) < 0 or \
+            (stop is not None and stop < 0):
+            return super(ModelHandler, self).slice_data(data, slice)
+
+        pks = data.values_list('pk', flat=True)[start:stop]
+        return self.sample_data(data, list(islice(pks.iterator(), 0, None, step)))
+
+    def sample_data(self, data, pks):
+        """
+        Returns the records of I{data} with the primary keys I{pks}, in the
+        order of I{data}.
+
+        The records are selected with I{pk__in}. If there are more than
+        L{sample_batch_size} primary keys, they are selected in batches, and
+        a list of the records is returned.
+
+        @type data: QuerySet
+        @param data: Dataset
+
+        @type pks: list
+        @param pks: Primary keys, in the order of I{data}
+
+        @rtype: QuerySet or list
+        """
+        size = self.sample_batch_size
+        if len(pks) <= size:
+            return data.filter(pk__in=pks)
+
+        records = []
+        for i in range(0, len(pks), size):
+            records.extend(data.filter(pk__in=pks[i:i + size]))
+        return records
+
+    def has_more_requested(self, request):
+        """
+        Returns I{True} if sliced requests should report whether there are
+        more records after the slice, instead of counting the data. The
+        querystring parameter ``has_more`` decides, and if not given, the
+        L{has_more} attribute.
+
+        @type request: HTTPRequest
+        @param request: Incoming request
+
+        @rtype: bool
+        """
+        has_more = request.GET.get('has_more', None)
+        if has_more is None:
+            return bool(self.has_more)
+        return has_more != 'false'
+
+    def has_more_data(self, request, data):
+        """
+        Slices the data, and reports whether there are more records after the
+        slice as I{has_more} in the response. Instead of counting the data,
+        one more record than the slice contains is fetched.
+
+        The total size is only included if counting is explicitly requested
+        with the querystring parameter ``count``. Slices without a
+        (non-negative) end have no records after them, and slices with
+        negative bounds are sliced as usual.
+
+        @type request: HTTPRequest
+        @param request: Incoming request
+
+        @type data: QuerySet
+        @param data: Dataset to slice
+
+        @rtype: tuple
+        @return: (sliced_data, total)
+        """
+        slice = request.GET.get(self.slice)
+        start, stop, step = self.slice_args(slice)
+
+        total = None
+        if 'count' in request.GET and self.count_requested(request):
+            total = self.count_data(request, data)
+
+        start = start or 0
+        if stop is None and start >= 0:
+            # Nothing follows an open-ended slice
+            request.envelope['has_more'] = False
+            return self.slice_data(data, slice), total
+        if stop is None or start < 0 or stop < 0:
+            return self.slice_data(data, slice), total
+
+        if stop <= start:
+            request.envelope['has_more'] = False
+            return [], total
+
+        if step and step > 1:
+            # Only the primary keys of the range are read, see
+            # ``sample_data``.
+            pks = list(data.values_list('pk', flat=True)[start:stop + 1])
+            request.envelope['has_more'] = len(pks) > stop - start
+            return self.sample_data(data, pks[:stop - start:step]), total
+
+        sliced_data = list(data[start:stop + 1])
+        request.envelope['has_more'] = len(sliced_data) > stop - start
+        return sliced_data[:stop - start], total
+
+    def cursor_data(self, request, data):
+        """
+        Returns a page of the data, using cursor (keyset) pagination, along
+        with its total size.
+
+        The data is ordered by its ordering (see L{order_data}), plus the
+        primary key, so that the order is total. A page contains the
+        records that follow (or precede) the record that the cursor given in
+        the querystring parameter L{cursor} points to, and they are selected
+        with a condition on the values of the ordering fields, instead of an
+        I{OFFSET}. Pages are therefore equally fast at any depth, and
+        records are not skipped or repeated while the data is modified.
+
+        The cursors of the next and previous pages are added to the response
+        as I{next} and I{prev}, or I{None} if there is no such page. Any
+        empty cursor requests the first page.
+
+        @type request: HTTPRequest
+        @param request: Incoming request
+
+        @type data: QuerySet
+        @param data: Dataset to paginate
+
+        @rtype: tuple
+        @return: (page, total). I{page} is a list of model instances. I{total}
+        is I{None} unless counting has been explicitly requested with the
+        querystring parameter ``count``, since counting would scan the whole
+        data on every page.
+        """
+        total = None
+        if 'count' in request.GET and self.count_requested(request):
+            total = self.count_data(request, data)
+
+        try:
+            size = int(request.GET.get('limit', self.cursor_size))
+        except ValueError:
+            raise ValidationError('Invalid limit')
+        size = max(1, min(size, self.cursor_max_size))
+
+        ordering = self.cursor_ordering(data)
+
+        token = request.GET.get(self.cursor, None)
+        if token:
+            try:
+                values, forward = decode_cursor(token)
+            except ValueError:
+                raise ValidationError('Invalid cursor')
+            if len(values) != len(ordering):
+                raise ValidationError('Invalid cursor')
+        else:
+            values, forward = None, True
+
+        if not forward:
+            # Walk backwards, in reverse order
+            ordering = [(name, not descending) for name, descending in ordering]
+
+        page = data.order_by(*[
+            descending and '-' + name or name for name, descending in ordering
+        ])
+        if values is not None:
+            page = page.filter(self.cursor_seek(ordering, values))
+
+        # One more record tells whether there is a page further on
+        page = list(page[:size + 1])
+        further = len(page) > size
+        page = page[:size]
+
+        if forward:
+            next_page, prev_page = further, values is not None
+        else:
+            page.reverse()
+            next_page, prev_page = True, further
+
+        names = [name for name, _ in ordering]
+        request.envelope['next'] = next_page and page and \
+            encode_cursor(self.cursor_values(page[-1], names), True) or None
+        request.envelope['prev'] = prev_page and page and \
+            encode_cursor(self.cursor_values(page[0], names), False) or None
+
+        return page, total
+
+    def cursor_ordering(self, data):
+        """
+        Returns the ordering of I{data}, as a list of (field, descending)
+        pairs, ending with the primary key.
+
+        Foreign keys are ordered by their column, and C{pk} is replaced by
+        the name of the primary key. Orderings that are not fields of the
+        model or of its related models (eg the rank of L{__fulltext
+        <custom_filters.fulltext_filter>}, selected with I{extra}) can't be
+        sought, so they raise a I{ValidationError}.
+
+        @type data: QuerySet
+        @param data: Dataset
+
+        @rtype: list
+        """
+        opts = self.model._meta
+        order = list(data.query.order_by)
+        if not order and data.query.default_ordering:
+            order = list(opts.ordering)
+
+        ordering = []
+        for name in order:
+            if name == '?':
+                raise ValidationError(
+                    'Random ordering cannot be paginated with a cursor')
+            descending = name.startswith('-')
+            name = name.lstrip('-')
+
+            if name == 'pk':
+                name = opts.pk.name
+            if not self.cursor_field(name):
+                raise ValidationError(
+                    'Ordering by %s cannot be paginated with a cursor' % name)
+            if LOOKUP_SEP not in name:
+                field = opts.get_field(name)
+                if field.rel:
+                    name = field.attname
+
+            ordering.append((name, descending))
+            if name in (opts.pk.name, opts.pk.attname):
+                # The ordering is already total
+                break
+        else:
+            ordering.append((opts.pk.attname, False))
+
+        return ordering
+
+    def cursor_field(self, name):
+        """
+        Returns I{True} if I{name} is a field of the model, or a field of a
+        related model that is reached through foreign keys (eg
+        C{client__name}).
+
+        @type name: str
+        @param name: Field name, or lookup path
+
+        @rtype: bool
+        """
+        model = self.model
+        for part in name.split(LOOKUP_SEP):
+            if model is None:
+                return False
+            try:
+                field = model._meta.get_field(part)
+            except models.FieldDoesNotExist:
+                return False
+            model = field.rel and field.rel.to or None
+        return True
+
+    def cursor_seek(self, ordering, values):
+        """
+        Returns the condition that selects the records which follow the
+        record whose ordering fields have the values I{values}, in the
+        ordering I{ordering}.
+
+        It's the expanded form of the row comparison C{(f1, f2, pk) >
+        (v1, v2, vpk)}, which unlike the latter also supports mixed
+        ascending and descending orderings: C{f1 > v1 OR (f1 = v1 AND f2 >
+        v2) OR (f1 = v1 AND f2 = v2 AND pk > vpk)}. It also includes the
+        redundant condition C{f1 >= v1}, so that an index on the first
+        ordering field can be used for the seek.
+
+        I{None} values are matched with I{IS NULL}, and can't be compared,
+        so ordering fields should not be nullable.
+
+        @type ordering: list
+        @param ordering: List of (field, descending) pairs
+
+        @type values: list
+        @param values: Values of the ordering fields
+
+        @rtype: Q
+        """
+        seek = models.Q()
+        equal = {}
+        for (name, descending), value in zip(ordering, values):
+            if value is not None:
+                lookup = descending and 'lt' or 'gt'
+                seek |= models.Q(
+                    **dict(equal, **{'%s__%s' % (name, lookup): value}))
+                equal[name] = value
+            else:
+                equal['%s__isnull' % name] = True
+
+        name, descending = ordering[0]
+        if values[0] is not None:
+            lookup = descending and 'lte' or 'gte'
+            seek &= models.Q(**{'%s__%s' % (name, lookup): values[0]})
+
+        return seek
+
+    def cursor_values(self, instance, names):
+        """
+        Returns the values of the fields I{names} of the model instance
+        I{instance}. Fields of related models (eg C{client__name}) are
+        looked up on the related instances.
+        """
+        values = []
+        for name in names:
+            value = instance
+            for attribute in name.split('__'):
+                value = getattr(value, attribute)
+            values.append(value)
+        return values
+
     def create(self, request, *args, **kwargs):
         """
         Writes the model instances available in I{request.data}, to the
-        database.
+        database, along with their rows in the list and full-text indexes of
+        the model, in a single transaction. See L{insert_data} and L{index_data}.
 
         After this method, I{request.data} only contains the successfully
         created model instance(s).
@@ -862,7 +2056,8 @@ class ModelHandler(BaseHandler):
         They both escape the uniqueness constraints since they are not yet
         created, but only the first of them managed to be created eventually),
         and the second only fails upon hitting the database.
-        * Database failure
+
+        Failures are handled according to L{bulk_create_atomic}.
 
         @type request: HTTPRequest
         @param request: Incoming request
@@ -870,35 +2065,403 @@ class ModelHandler(BaseHandler):
         @rtype: Model or Queryset
         @return: Succesfully created instance(s)
         """
-        def persist(instance):
+        single = isinstance(request.data, self.model)
+        instances = single and [request.data] or list(request.data or ())
+
+        with transaction.atomic(using=router.db_for_write(self.model)):
+            created, errors = self.insert_data(request, instances)
+            self.index_data(created)
+
+            if single:
+                # Failures of single instances are not reported per index
+                for error in errors:
+                    error.params = None
+
+            if errors and self.bulk_create_atomic:
+                # Rolls back the transaction
+                if single:
+                    raise errors[0]
+                raise ValidationErrorList(errors)
+
+        if errors:
+            request.envelope['errors'] = [
+                dict(type='Validation Error', errors=error.messages,
+                     **(error.params or {}))
+                for error in errors
+            ]
+
+        if single:
+            request.data = created and created[0] or None
+        elif request.data:
+            request.data = created
+
+        return super(ModelHandler, self).create(request, *args, **kwargs)
+
+    def insert_data(self, request, instances):
+        """
+        Inserts I{instances} in the database. If they are
+        L{bulk insertable<bulk_insertable>}, they are inserted in batches of
+        L{bulk_create_batch_size}, using Django's I{bulk_create}. Otherwise
+        they are saved one at a time.
+
+        Every batch is inserted within a savepoint. If a batch fails with an
+        I{IntegrityError}, its instances are inserted one at a time, to find
+        the ones that fail. If L{bulk_create_atomic} is I{True}, no more
+        batches are inserted after a failed one, since the whole transaction
+        will be rolled back anyway.
+
+        @type instances: list
+        @param instances: Model instances to insert
+
+        @rtype: tuple
+        @return: Tuple of (created instances, errors). Errors are
+        I{ValidationError} instances, with the I{index} of the failed instance
+        in I{instances} as their I{params}.
+        """
+        if self.bulk_insertable(request, instances):
+            def insert(batch):
+                self.model.objects.bulk_create(batch)
+            batch_size = self.bulk_create_batch_size
+        else:
+            def insert(batch):
+                for instance in batch:
+                    instance.save(force_insert=True)
+            batch_size = 1
+
+        def failed(index, instance):
+            logger.exception("Saving obj (%r) failed", instance)
+            return ValidationError(
+                'Could not be saved, because of a conflict with other data',
+                params={'index': index},
+            )
+
+        created, errors = [], []
+        for start in xrange(0, len(instances), batch_size):
+            batch = instances[start:start + batch_size]
             try:
-                instance.save(force_insert=True)
-            except Exception:
-                # TODO:
-                # 1. If I was using InnoDB storage engine, I could simply consider
-                # the whole operation (whether single or Bulk) as a
-                # transaction, and roll it back in the first failure.
-                # Unfortunately I cannot assume that InnoDB is used
-                #
-                # 2. Use bulk_create that Django 1.4 offers
-                #
-                # Long term plan:
-                # - Single item POST: Raise an error and an appropriate
-                #   HTTPResponse, when the database fails.
-                # - Bulk POST: Use Django 1.4 ``bulk_create``. This way a
-                # failure can raise an error.
-                logger.exception("Saving obj (%r) failed", instance)
+                with transaction.atomic(using=router.db_for_write(self.model)):
+                    insert(batch)
+            except IntegrityError:
+                if len(batch) == 1:
+                    errors.append(failed(start, batch[0]))
+                else:
+                    for index, instance in enumerate(batch, start):
+                        try:
+                            with transaction.atomic(
+                                using=router.db_for_write(self.model)):
+                                insert([instance])
+                        except IntegrityError:
+                            errors.append(failed(index, instance))
+                        else:
+                            created.append(instance)
+
+                if self.bulk_create_atomic:
+                    break
+            else:
+                created.extend(batch)
+
+        return created, errors
+
+    def bulk_insertable(self, request, instances):
+        """
+        Returns whether I{instances} can be inserted with Django's
+        I{bulk_create}. I{bulk_create} doesn't call the I{save} method of the
+        instances, doesn't send the I{pre_save} and I{post_save} signals and
+        doesn't support multi-table inheritance. Moreover, most databases
+        don't return the primary keys of the created rows, so the created
+        instances are left without one.
+
+        So instances are bulk insertable if L{bulk_create_batch_size} is
+        defined, there's more than one of them, the model doesn't override
+        I{save}, no receivers of I{pre_save} or I{post_save} are connected
+        for it, it has no parent models, and either their primary keys are
+        known, or the response doesn't need them; that is, all output fields
+        are concrete fields of the model, other than its primary key, the
+        L{minimal representation<minimal_requested>} of the primary keys
+        hasn't been requested, and the model has no
+        L{list indexes<indexes.ListIndex>} or
+        L{full-text indexes<indexes.FullTextIndex>}, whose rows refer to
+        them.
+
+        @type instances: list
+        @param instances: Model instances to insert
+
+        @rtype: bool
+        """
+        if not self.bulk_create_batch_size or len(instances) < 2:
+            return False
+
+        opts = self.model._meta
+        if self.save_hooks() or opts.parents:
+            return False
+
+        connection = connections[router.db_for_write(self.model)]
+        if getattr(connection.features, 'can_return_ids_from_bulk_insert', False):
+            return True
+        if all(instance.pk is not None for instance in instances):
+            return True
+        if indexes.list_indexes(self.model) or \
+            indexes.fulltext_indexes(self.model):
+            return False
+        if self.minimal_requested(request) == 'pk':
+            return False
+
+        names = set()
+        for field in opts.concrete_fields:
+            if not field.primary_key:
+                names.update((field.name, field.attname))
+        return all(
+            field in names for field in self.get_output_fields(request)
+        )
+
+    def field_values(self, instance, names):
+        """
+        Returns the current values of the fields I{names} of I{instance}, to
+        find out later which of them changed (see L{changed_fields}). Values
+        of relations are their primary keys.
+
+        @type instance: Model
+        @param instance: Model instance
+
+        @type names: iterable
+        @param names: Field names, or attribute names (eg I{client_id})
+
+        @rtype: dict
+        @return: Dictionary of {attribute name: value}, or I{None} if any of
+        I{names} is not a concrete field of the model, other than its primary
+        key, so that changes cannot be tracked.
+        """
+        fields = dict(
+            (name, field) for field in self.model._meta.concrete_fields
+            if not field.primary_key
+            for name in (field.name, field.attname)
+        )
+        values = {}
+        for name in names:
+            field = fields.get(name)
+            if field is None:
                 return None
+            values[field.attname] = getattr(instance, field.attname)
+        return values
+
+    def changed_fields(self, instance, original):
+        """
+        Returns the attribute names of the fields of I{instance} whose values
+        differ from I{original}, as they would be saved in the database, along
+        with any fields with I{auto_now}, if there are any changes, and the
+        L{shadow columns<indexes.LowerCaseField>} of the changed fields. These are the I{update_fields} to save
+        I{instance} with.
+
+        @type instance: Model
+        @param instance: Model instance
+
+        @type original: dict
+        @param original: Original values (see L{field_values})
+
+        @rtype: list
+        """
+        connection = connections[
+            router.db_for_write(self.model, instance=instance)]
+        fields = dict(
+            (field.attname, field) for field in self.model._meta.concrete_fields
+        )
+
+        # Values are compared the way they would be saved, since not all
+        # fields convert them on validation (eg foreign keys given as
+        # strings).
+        changed = []
+        for name, value in original.iteritems():
+            field = fields[name]
+            if field.get_db_prep_save(getattr(instance, name), connection) != \
+                field.get_db_prep_save(value, connection):
+                changed.append(name)
+
+        if changed:
+            changed.extend(
+                field.attname for field in self.model._meta.concrete_fields
+                if (getattr(field, 'auto_now', False) or
+                    isinstance(field, indexes.LowerCaseField) and
+                    self.model._meta.get_field(field.source).attname in
+                    changed) and
+                field.attname not in changed
+            )
+        return changed
+
+    def save_hooks(self):
+        """
+        Returns whether saving instances of the model runs custom code,
+        because the model overrides I{save}, or receivers of I{pre_save} or
+        I{post_save} are connected for it. Bulk operations skip it.
+
+        @rtype: bool
+        """
+        return self.model.save.im_func is not models.Model.save.im_func or \
+            signals.pre_save.has_listeners(self.model) or \
+            signals.post_save.has_listeners(self.model)
+
+    def index_data(self, instances, fields=None):
+        """
+        Rebuilds the rows of I{instances} in the
+        L{list indexes<indexes.ListIndex>} and
+        L{full-text indexes<indexes.FullTextIndex>} of the model, after they
+        have been created or updated.
+
+        @type instances: list
+        @param instances: Saved model instances
+
+        @type fields: iterable
+        @param fields: Names of the updated fields. If given, only the indexes
+        of these fields are rebuilt.
+        """
+        if instances:
+            indexes.update_list_indexes(self.model, instances, fields)
+            for index in indexes.fulltext_indexes(self.model, fields):
+                index.update(instances)
+
+    def unindex_data(self, data):
+        """
+        Deletes the rows of I{data} in the
+        L{full-text indexes<indexes.FullTextIndex>} of the model, before it
+        is deleted. The rows of list indexes are deleted along with the data,
+        through their foreign keys.
+
+        @type data: QuerySet or list
+        @param data: Data to delete
+        """
+        for index in indexes.fulltext_indexes(self.model):
+            if isinstance(data, models.query.QuerySet) and \
+                data._result_cache is None:
+                index.delete_data(data)
             else:
-                return instance
+                index.delete([instance.pk for instance in data])
 
-        if isinstance(request.data, self.model):
-            request.data = persist(request.data)
-        elif request.data:
-            request.data = \
-                [instance for instance in request.data if persist(instance)]
+    def set_updatable(self, request):
+        """
+        Returns whether the plural I{PUT} request can be performed as a
+        set-based update (see L{set_update}). That's the case if
+        L{set_update} is enabled, the handler doesn't override L{validate} or
+        L{update}, the model doesn't override I{clean} and has no
+        L{save hooks<save_hooks>}, and all incoming fields are editable
+        concrete fields of the model, which are not unique (uniqueness can't
+        be validated without the records), nor are indexed by a
+        L{list index<indexes.ListIndex>} or
+        L{full-text index<indexes.FullTextIndex>} (the index rows are built
+        from the records).
 
-        return super(ModelHandler, self).create(request, *args, **kwargs)
+        @type request: HTTPRequest
+        @param request: Incoming request
+
+        @rtype: bool
+        """
+        if not self.set_update or not request.data:
+            return False
+
+        cls = type(self)
+        if cls.validate.im_func is not ModelHandler.validate.im_func or \
+            cls.update.im_func is not ModelHandler.update.im_func or \
+            self.model.clean.im_func is not models.Model.clean.im_func or \
+            self.save_hooks():
+            return False
+
+        opts = self.model._meta
+        unique_together = set()
+        for fields in opts.unique_together:
+            unique_together.update(fields)
+
+        fields = dict(
+            (name, field) for field in opts.concrete_fields
+            for name in (field.name, field.attname)
+        )
+        for name in request.data:
+            field = fields.get(name)
+            if field is None or not field.editable or field.unique or \
+                field.name in unique_together or \
+                indexes.list_index(self.model, field.name) or \
+                indexes.fulltext_indexes(self.model, [field.name]):
+                return False
+        return True
+
+    def clean_update_values(self, values):
+        """
+        Validates the incoming I{values} of a set-based update against the
+        model fields, and returns them cleaned. Fields with I{auto_now} are
+        updated as well, and so are the
+        L{shadow columns<indexes.LowerCaseField>} of the incoming fields.
+
+        @type values: dict
+        @param values: Dictionary of {field name: value}
+
+        @rtype: dict
+        @return: Dictionary of {field name: cleaned value}, to pass to
+        I{QuerySet.update}
+
+        @raise ValidationError: If any of the values is invalid
+        """
+        instance = self.model()
+        fields = dict(
+            (name, field) for field in self.model._meta.concrete_fields
+            for name in (field.name, field.attname)
+        )
+
+        cleaned, errors = {}, {}
+        for name, value in values.iteritems():
+            field = fields[name]
+            try:
+                cleaned[field.name] = field.clean(value, instance)
+            except ValidationError as e:
+                errors[name] = e.messages
+        if errors:
+            raise ValidationError(errors)
+
+        for field in self.model._meta.concrete_fields:
+            if getattr(field, 'auto_now', False) and field.name not in cleaned:
+                cleaned[field.name] = field.pre_save(instance, False)
+            elif isinstance(field, indexes.LowerCaseField) and \
+                field.source in cleaned:
+                cleaned[field.name] = field.shadow(cleaned[field.source])
+        return cleaned
+
+    def set_update_data(self, request, data, values, *args, **kwargs):
+        """
+        Updates I{data} with I{values}, using I{QuerySet.update}, in a single
+        transaction. The primary keys of I{data} are selected first, and the
+        records are updated in batches of L{sample_batch_size} primary keys,
+        so that the updated records can be selected again, even if they don't
+        match the filters of the request any more.
+
+        If L{set_update} is I{count}, I{data} is updated with a single query,
+        and the number of updated records is returned.
+
+        @type data: QuerySet
+        @param data: Data to update
+
+        @type values: dict
+        @param values: Cleaned values (see L{clean_update_values})
+
+        @rtype: QuerySet, list or int
+        @return: The updated records, or their number
+        """
+        using = router.db_for_write(self.model)
+
+        if self.set_update == 'count':
+            with transaction.atomic(using=using):
+                return data.update(**values)
+
+        pks = list(data.values_list('pk', flat=True))
+        size = self.sample_batch_size
+        with transaction.atomic(using=using):
+            for start in xrange(0, len(pks), size):
+                self.model.objects.filter(pk__in=pks[start:start + size]).\
+                    update(**values)
+
+        if self.minimal_requested(request):
+            # Only the primary keys are needed
+            return [self.model(pk=pk) for pk in pks]
+
+        updated = self.working_set(request, *args, **kwargs)
+        if data.query.order_by:
+            updated = updated.order_by(*data.query.order_by)
+        return self.sample_data(updated, pks)
 
     def update(self, request, *args, **kwargs):
         """
@@ -906,29 +2469,233 @@ class ModelHandler(BaseHandler):
         subset of {request.data} which contains the successfully updated
         model instances.
 
+        Set-based updates (see L{set_update}) are performed with
+        L{set_update_data}. Otherwise, the list and full-text indexes of the
+        updated instances are rebuilt with L{index_data}. If an instance
+        violates a database constraint, nothing is updated, and a
+        I{ValidationError} is raised.
+
         @type request: HTTPRequest
         @param request: Incoming request
 
         @rtype: Model or Queryset
         @return: Succesfully updated instance(s)
         """
+        if getattr(request, 'update_values', None) is not None:
+            request.data = self.set_update_data(
+                request, request.data, request.update_values, *args, **kwargs)
+            return super(ModelHandler, self).update(request, *args, **kwargs)
+
+        original_values = getattr(request, 'original_values', {})
+        using = router.db_for_write(self.model)
+
         def persist(instance):
             try:
-                instance.save(force_update=True)
+                # Within a savepoint, so that a failed instance doesn't break
+                # the transaction for the rest of them
+                with transaction.atomic(using=using):
+                    if instance.pk in original_values:
+                        changed = self.changed_fields(
+                            instance, original_values[instance.pk])
+                        # Unchanged instances are not written at all
+                        if changed:
+                            instance.save(force_update=True,
+                                          update_fields=changed)
+                    else:
+                        instance.save(force_update=True)
+            except IntegrityError:
+                # A conflict that validation didn't catch (see
+                # ``validate_unique_data``) fails the whole request
+                raise
             except Exception:
                 logger.exception("Updating obj (%r) failed", instance)
                 return None
             else:
                 return instance
 
-        if isinstance(request.data, self.model):
-            request.data = persist(request.data)
-        elif request.data:
-            request.data = \
-                [instance for instance in request.data if persist(instance)]
+        try:
+            with transaction.atomic(using=using):
+                if isinstance(request.data, self.model):
+                    request.data = persist(request.data)
+                    updated = request.data and [request.data] or []
+                elif request.data:
+                    request.data = [instance for instance in request.data
+                                    if persist(instance)]
+                    updated = request.data
+                else:
+                    updated = []
+                self.index_data(updated, getattr(request, 'update_fields', None))
+        except IntegrityError:
+            logger.exception("Updating %s failed", self.model.__name__)
+            raise ValidationError(
+                'Could not be saved, because of a conflict with other data')
 
         return super(ModelHandler, self).update(request, *args, **kwargs)
 
+    def minimal_requested(self, request):
+        """
+        Returns the minimal representation of the response data of a write
+        request; I{pk}, I{count} or I{None} for the full representation. The
+        querystring parameter ``minimal`` decides, and if not given, the
+        I{Prefer} header, and if not given either, the L{minimal} attribute.
+
+        If the I{Prefer} header decides for a minimal representation,
+        I{request.preference_applied} is set, for the I{Preference-Applied}
+        header of the response.
+
+        @type request: HTTPRequest object
+        @param request: Incoming request
+
+        @rtype: str
+        """
+        if request.method.upper() not in ('POST', 'PUT', 'DELETE'):
+            return None
+
+        minimal = request.GET.get('minimal', None)
+        if minimal is not None:
+            if minimal == 'false':
+                return None
+            return minimal == 'count' and 'count' or 'pk'
+
+        preferences = [
+            preference.split(';')[0].strip().lower()
+            for preference in request.META.get('HTTP_PREFER', '').split(',')
+        ]
+        if 'return=minimal' in preferences:
+            request.preference_applied = 'return=minimal'
+            return 'pk'
+        if 'return=representation' in preferences:
+            return None
+
+        if self.minimal is True:
+            return 'pk'
+        return self.minimal or None
+
+    def minimal_data(self, data, minimal):
+        """
+        Returns the minimal representation of I{data}; the primary keys of
+        its records, or their number. Querysets that haven't been evaluated
+        are not evaluated; only their primary keys are selected, or they are
+        counted.
+
+        @param data: Result of the write operation; model instance, queryset,
+        list of model instances, or number of records (see L{set_update})
+
+        @type minimal: str
+        @param minimal: I{pk} or I{count}
+
+        @return: Primary key, list of primary keys, or number
+        """
+        if data is None or isinstance(data, self.model):
+            if minimal == 'count':
+                return data is not None and 1 or 0
+            return data is not None and data.pk or None
+
+        if isinstance(data, (int, long)):
+            # Only the number of records is known
+            return data
+
+        if isinstance(data, models.query.QuerySet) and \
+            data._result_cache is None:
+            if minimal == 'count':
+                return data.count()
+            return list(data.values_list('pk', flat=True))
+
+        if minimal == 'count':
+            return len(data)
+        return [instance.pk for instance in data]
+
+    def delete(self, request, *args, **kwargs):
+        """
+        Returns the data to delete.
+
+        Unless the data can be deleted without loading it (see
+        L{fast_deletable}), it is evaluated here, so that the same model
+        instances are serialized in the response and collected for deletion,
+        instead of being loaded twice.
+
+        @type request: HTTPRequest
+        @param request: Incoming request
+
+        @rtype: Model or QuerySet
+        @return: Model instance(s) to be deleted
+        """
+        data = super(ModelHandler, self).delete(request, *args, **kwargs)
+        if isinstance(data, models.query.QuerySet) and \
+            not self.fast_deletable(data):
+            # Fills the result cache of the queryset
+            len(data)
+        return data
+
+    def fast_deletable(self, data):
+        """
+        Returns whether queryset I{data} can be deleted with direct I{DELETE}
+        queries, without loading its model instances. That's the case if the
+        model has no cascading relations, no parent models and no receivers
+        of the deletion signals.
+
+        @type data: QuerySet
+        @param data: Data to delete
+
+        @rtype: bool
+        """
+        using = router.db_for_write(self.model)
+        return Collector(using=using).can_fast_delete(data)
+
+    def delete_data(self, data):
+        """
+        Deletes the records of queryset I{data}, in batches of
+        L{delete_batch_size} records ordered by primary key, every batch in
+        its own transaction. If L{delete_batch_size} is I{None}, they are all
+        deleted in a single transaction.
+
+        If the records are L{fast deletable<fast_deletable>}, every batch is
+        deleted with a single I{DELETE} query. Otherwise the cascades of the
+        model instances, which L{delete} has already loaded, are collected
+        and deleted along with them. Their full-text index rows are deleted
+        in the same transaction, with L{unindex_data}.
+
+        @type data: QuerySet
+        @param data: Data to delete
+
+        @rtype: None
+        @return: None
+        """
+        using = router.db_for_write(self.model)
+        size = self.delete_batch_size
+
+        if self.fast_deletable(data):
+            if not size:
+                with transaction.atomic(using=using):
+                    self.unindex_data(data)
+                    data.delete()
+                return
+
+            if data._result_cache is not None:
+                pks = sorted(instance.pk for instance in data)
+            else:
+                pks = list(data.order_by('pk').values_list('pk', flat=True))
+            batches = [
+                self.model.objects.filter(pk__in=pks[start:start + size])
+                for start in xrange(0, len(pks), size)
+            ]
+        else:
+            instances = sorted(data, key=lambda instance: instance.pk)
+            if not instances:
+                return
+            size = size or len(instances)
+            batches = [
+                instances[start:start + size]
+                for start in xrange(0, len(instances), size)
+            ]
+
+        for batch in batches:
+            with transaction.atomic(using=using):
+                self.unindex_data(batch)
+                collector = Collector(using=using)
+                collector.collect(batch)
+                collector.delete()
+
     def data_safe_for_delete(self, data):
         """
         We only run this method AFTER the result data have been serialized into
@@ -937,13 +2704,19 @@ class ModelHandler(BaseHandler):
         equal to I{None}, and hence their I{id} would not be available for
         serialization.
 
+        Querysets are deleted with L{delete_data}.
+
         @type data: Model or QuerySet
         @param data: Model instance(s) to be deleted
 
         @rtype: None
         @return: None
         """
-        if data:
-            data.delete()
+        if isinstance(data, models.query.QuerySet):
+            self.delete_data(data)
+        elif data:
+            with transaction.atomic(using=router.db_for_write(self.model)):
+                self.unindex_data([data])
+                data.delete()
 
         return super(ModelHandler, self).data_safe_for_delete(data)
@@ -0,0 +1,659 @@
+"""
+Indexes that speed up the custom filters (see L{custom_filters}), by keeping
+the values that the filters look for in indexed columns.
+
+List indexes serve the ``__in_list`` filter. Instead of scanning the JSON
+text of a list field for every value, the filter looks the values up in a
+companion table of (owner, value) rows, with an indexed I{value} column. A
+list index is declared by extending L{ListIndex}, in the application that
+defines the model of the list field::
+
+    class ContactEmail(ListIndex):
+        owner = models.ForeignKey(Contact, related_name='email_index')
+        indexed_field = 'emails'
+
+Declared indexes are registered automatically, and the ``__in_list`` filter
+uses them from then on. The index rows of model instances are rebuilt
+whenever a L{ModelHandler<handlers.ModelHandler>} creates or updates them,
+and deleted along with them, through the foreign key. Data written in other
+ways has to be indexed with L{update_list_indexes}.
+
+Lower-cased shadow columns serve the ``__isearch`` filter. Instead of
+comparing every value case insensitively with the column, which can't use a
+normal index, the filter compares the lower-cased values with an indexed,
+lower-cased copy of the column, declared with a L{LowerCaseField}::
+
+    class Contact(models.Model):
+        surname = models.CharField(max_length=100)
+        surname_lower = LowerCaseField('surname', max_length=100)
+
+The copy is kept in sync whenever instances are saved (including with
+I{bulk_create}), and by the set-based updates of
+L{ModelHandler<handlers.ModelHandler>}. Rows that exist before the field is
+added, or are written with I{QuerySet.update}, have to be synced with
+L{update_shadow_fields}.
+
+Full-text indexes serve the ``__fulltext`` filter. They index text fields
+of a model in a table of their own; an FTS5 virtual table on SQLite, and a
+table of I{tsvector} documents with a GIN index on PostgreSQL. A full-text
+index is declared with a L{FullTextIndex}, along with the model::
+
+    contact_fulltext = FullTextIndex(Contact, ('name', 'surname'))
+
+and its table is created by a migration of the application, with the
+L{CreateFullTextIndex} operation::
+
+    CreateFullTextIndex('app_contact_fulltext', ('name', 'surname'))
+
+For applications without migrations (and on Django 1.6), it's created by
+I{syncdb}, along with the table of the model. Like list indexes, the index rows of model instances are rebuilt whenever a
+L{ModelHandler<handlers.ModelHandler>} creates or updates them, and they are
+deleted when it deletes them. Data written in other ways has to be indexed
+with L{FullTextIndex.update}.
+"""
+import re
+
+from django.db import connections, models, router, transaction
+from django.db.models import Q
+from django.db.models.signals import class_prepared, post_syncdb
+
+try:
+    from django.db.migrations.operations.base import Operation
+except ImportError:
+    # Django < 1.7
+    Operation = object
+
+
+# Registered list indexes
+LIST_INDEXES = []
+
+
+class ListIndex(models.Model):
+    """
+    Abstract model of list indexes. Concrete list indexes define the
+    foreign key I{owner}, to the model of the list field, and the name of the
+    list field as L{indexed_field}.
+    """
+    value = models.CharField(max_length=255, db_index=True)
+
+    indexed_field = None
+    """
+    Name of the indexed list field, on the I{owner} model.
+    """
+
+    class Meta:
+        abstract = True
+
+    @classmethod
+    def owner_model(cls):
+        """
+        Returns the model of the list field.
+        """
+        return cls._meta.get_field('owner').rel.to
+
+    @classmethod
+    def normalize(cls, value):
+        """
+        Returns the indexed form of a list value. The ``__in_list`` filter is
+        case insensitive, so values are lower-cased.
+
+        @type value: unicode
+        @rtype: unicode
+        """
+        return value.lower()
+
+    @classmethod
+    def indexable(cls, value):
+        """
+        Returns whether the normalized I{value} fits in the I{value} column.
+        Longer values are not indexed, and the ``__in_list`` filter falls
+        back to scanning the list field for them.
+
+        @rtype: bool
+        """
+        return len(value) <= cls._meta.get_field('value').max_length
+
+    @classmethod
+    def values(cls, instance):
+        """
+        Returns the normalized values to index, for the list field of
+        I{instance}. Like the ``__in_list`` filter, only string values are
+        taken into account.
+
+        @type instance: Model
+        @param instance: Instance of the L{owner model<owner_model>}
+
+        @rtype: set
+        """
+        values = set()
+        for value in getattr(instance, cls.indexed_field) or ():
+            if isinstance(value, basestring):
+                value = cls.normalize(value)
+                if cls.indexable(value):
+                    values.add(value)
+        return values
+
+
+def register(sender, **kwargs):
+    """
+    Registers the concrete list indexes, as their models are prepared.
+    """
+    if issubclass(sender, ListIndex) and not sender._meta.abstract:
+        LIST_INDEXES.append(sender)
+
+
+class_prepared.connect(register)
+
+
+def list_indexes(model, field=None):
+    """
+    Returns the list indexes of I{model}, or only the one of its list field
+    I{field}.
+
+    @type model: Model class
+
+    @type field: str
+    @param field: Name of the list field
+
+    @rtype: list
+    """
+    model = model._meta.concrete_model
+    return [
+        index for index in LIST_INDEXES
+        if index.owner_model() is model and
+        (field is None or index.indexed_field == field)
+    ]
+
+
+def list_index(model, field):
+    """
+    Returns the list index of the list field I{field} of I{model}, or None.
+    """
+    indexes = list_indexes(model, field)
+    return indexes and indexes[0] or None
+
+
+def update_list_indexes(model, instances, fields=None, batch_size=500):
+    """
+    Rebuilds the index rows of I{instances}, in the list indexes of
+    I{model}, in a single transaction. The current rows are deleted, and the
+    new ones are inserted with I{bulk_create}, in batches of I{batch_size}.
+
+    @type model: Model class
+
+    @type instances: list
+    @param instances: Saved instances of I{model}
+
+    @type fields: iterable
+    @param fields: Names of the fields that have been written. If given, only
+    the indexes of these fields are rebuilt.
+    """
+    pks = [instance.pk for instance in instances]
+    for index in list_indexes(model):
+        if fields is not None and index.indexed_field not in fields:
+            continue
+
+        using = router.db_for_write(index)
+        with transaction.atomic(using=using):
+            for start in xrange(0, len(pks), batch_size):
+                index.objects.using(using).\
+                    filter(owner__in=pks[start:start + batch_size]).delete()
+            index.objects.using(using).bulk_create([
+                index(owner_id=instance.pk, value=value)
+                for instance in instances for value in index.values(instance)
+            ], batch_size=batch_size)
+
+
+class LowerCaseField(models.CharField):
+    """
+    Indexed, lower-cased copy of another field of the model, its
+    L{source}. The copy is not editable, and is updated from the source
+    whenever the model instance is saved.
+    """
+    def __init__(self, source, *args, **kwargs):
+        self.source = source
+        kwargs.setdefault('max_length', 255)
+        kwargs.setdefault('db_index', True)
+        kwargs.setdefault('editable', False)
+        kwargs.setdefault('blank', True)
+        super(LowerCaseField, self).__init__(*args, **kwargs)
+
+    def deconstruct(self):
+        name, path, args, kwargs = super(LowerCaseField, self).deconstruct()
+        kwargs['source'] = self.source
+        return name, path, args, kwargs
+
+    def shadow(self, value):
+        """
+        Returns the copy of the source I{value}.
+        """
+        if value is None:
+            return None
+        return unicode(value).lower()
+
+    def pre_save(self, model_instance, add):
+        value = self.shadow(getattr(model_instance, self.source))
+        setattr(model_instance, self.attname, value)
+        return value
+
+
+def shadow_fields(model, source=None):
+    """
+    Returns the L{LowerCaseField}s of I{model}, or only the one whose source
+    is I{source}.
+
+    @type model: Model class
+
+    @type source: str
+    @param source: Name of the source field
+
+    @rtype: list
+    """
+    return [
+        field for field in model._meta.concrete_fields
+        if isinstance(field, LowerCaseField) and
+        (source is None or field.source == source)
+    ]
+
+
+def shadow_field(model, source):
+    """
+    Returns the L{LowerCaseField} of the field I{source} of I{model}, or
+    None.
+    """
+    fields = shadow_fields(model, source)
+    return fields and fields[0] or None
+
+
+def update_shadow_fields(data, batch_size=500):
+    """
+    Syncs the L{LowerCaseField}s of the records of the queryset I{data} with
+    their sources, in a single transaction. Records are read in batches of
+    I{batch_size}, and only the ones that are out of sync are updated.
+
+    @type data: QuerySet
+    """
+    fields = shadow_fields(data.model)
+    if not fields:
+        return
+
+    names = ['pk']
+    for field in fields:
+        names.extend((field.source, field.attname))
+
+    using = data.db
+    pks = list(data.values_list('pk', flat=True))
+    with transaction.atomic(using=using):
+        for start in xrange(0, len(pks), batch_size):
+            batch = data.model._default_manager.using(using).\
+                filter(pk__in=pks[start:start + batch_size]).values(*names)
+            for row in batch:
+                values = {}
+                for field in fields:
+                    value = field.shadow(row[field.source])
+                    if value != row[field.attname]:
+                        values[field.attname] = value
+                if values:
+                    data.model._default_manager.using(using).\
+                        filter(pk=row['pk']).update(**values)
+
+
+# Registered full-text indexes
+FULLTEXT_INDEXES = []
+
+# Whether the index tables exist, by L{table_key}
+FULLTEXT_TABLES = {}
+
+# Whether SQLite databases support FTS5, by alias
+FTS5_SUPPORT = {}
+
+
+def table_key(connection, table):
+    return connection.alias, connection.settings_dict['NAME'], table
+
+
+def fulltext_supported(connection):
+    """
+    Returns whether full-text indexes are supported on I{connection}; on
+    PostgreSQL, and on SQLite if it's built with FTS5.
+
+    @rtype: bool
+    """
+    if connection.vendor == 'postgresql':
+        return True
+    if connection.vendor != 'sqlite':
+        return False
+    if connection.alias not in FTS5_SUPPORT:
+        cursor = connection.cursor()
+        cursor.execute("SELECT sqlite_compileoption_used('ENABLE_FTS5')")
+        FTS5_SUPPORT[connection.alias] = bool(cursor.fetchone()[0])
+    return FTS5_SUPPORT[connection.alias]
+
+
+def fulltext_create_sql(connection, table, fields):
+    """
+    Returns the SQL statements that create the table I{table} of a
+    full-text index of I{fields}.
+
+    @rtype: list
+    """
+    qn = connection.ops.quote_name
+    if connection.vendor == 'sqlite':
+        return ['CREATE VIRTUAL TABLE %s USING fts5(%s)' % (
+            qn(table), ', '.join(qn(field) for field in fields),
+        )]
+    return [
+        'CREATE TABLE %s (id bigint PRIMARY KEY, document tsvector NOT NULL)'
+        % qn(table),
+        'CREATE INDEX %s ON %s USING GIN (document)'
+        % (qn('%s_document' % table), qn(table)),
+    ]
+
+
+class CreateFullTextIndex(Operation):
+    """
+    Migration operation that creates the table of a full-text index. The
+    table and the indexed fields are given explicitly, rather than taken
+    from a L{FullTextIndex}, so that the migration doesn't change along with
+    the declaration. Nothing is created on databases that don't support
+    full-text indexes.
+    """
+    reduces_to_sql = False
+    reversible = True
+
+    def __init__(self, table, fields):
+        """
+        @type table: str
+        @param table: Name of the index table (see L{FullTextIndex.db_table})
+
+        @type fields: tuple
+        @param fields: Names of the indexed fields
+        """
+        self.table = table
+        self.fields = tuple(fields)
+
+    def state_forwards(self, app_label, state):
+        pass
+
+    def database_forwards(self, app_label, schema_editor, from_state, to_state):
+        connection = schema_editor.connection
+        if fulltext_supported(connection):
+            for sql in fulltext_create_sql(connection, self.table, self.fields):
+                schema_editor.execute(sql)
+            FULLTEXT_TABLES[table_key(connection, self.table)] = True
+
+    def database_backwards(self, app_label, schema_editor, from_state, to_state):
+        connection = schema_editor.connection
+        if fulltext_supported(connection):
+            schema_editor.execute(
+                'DROP TABLE %s' % connection.ops.quote_name(self.table))
+            FULLTEXT_TABLES[table_key(connection, self.table)] = False
+
+    def describe(self):
+        return 'Create full-text index table %s' % self.table
+
+
+class FullTextIndex(object):
+    """
+    Full-text index of text fields of a model, for the ``__fulltext``
+    filter. On databases other than SQLite (built with FTS5) and PostgreSQL,
+    or while the index table doesn't exist, the index isn't maintained, and
+    the filter falls back to I{icontains} lookups. The primary key of the
+    model has to be an integer.
+
+    Every value of the filter matches the records that contain all of its
+    words, in any of the indexed fields. The records matching any of the
+    values are ordered by rank, best first, unless the request is ordered
+    otherwise.
+    """
+    def __init__(self, model, fields, name='fulltext', config='simple',
+                 batch_size=500):
+        """
+        Declares and registers a full-text index.
+
+        @type model: Model class
+
+        @type fields: tuple
+        @param fields: Names of the indexed fields
+
+        @type name: str
+        @param name: Name of the index, which is the field of ``__fulltext``
+        filters (eg I{fulltext__fulltext}), and the suffix of its table
+
+        @type config: str
+        @param config: Text search configuration, on PostgreSQL
+
+        @type batch_size: int
+        @param batch_size: Maximum number of primary keys in every query that
+        deletes index rows
+        """
+        self.model = model
+        self.fields = tuple(fields)
+        self.name = name
+        self.config = config
+        self.batch_size = batch_size
+        FULLTEXT_INDEXES.append(self)
+
+    @property
+    def db_table(self):
+        return '%s_%s' % (self.model._meta.db_table, self.name)
+
+    @property
+    def rank(self):
+        """
+        Name of the rank, selected along with the filtered records.
+        """
+        return '%s_rank' % self.name
+
+    def supported(self, connection):
+        return fulltext_supported(connection)
+
+    def available(self, connection):
+        """
+        Returns whether the index can be used on I{connection}; that is, the
+        database is supported and the index table exists. Index writes are
+        skipped otherwise, and the ``__fulltext`` filter falls back to
+        I{icontains} lookups.
+
+        @rtype: bool
+        """
+        if not self.supported(connection):
+            return False
+        key = table_key(connection, self.db_table)
+        if key not in FULLTEXT_TABLES:
+            FULLTEXT_TABLES[key] = self.db_table in \
+                connection.introspection.table_names()
+        return FULLTEXT_TABLES[key]
+
+    def create_table(self, connection):
+        """
+        Creates the index table on I{connection}, if the database is
+        supported and the table doesn't exist yet. Migrations create it with
+        L{CreateFullTextIndex} instead.
+        """
+        if self.supported(connection) and not self.available(connection):
+            cursor = connection.cursor()
+            for sql in fulltext_create_sql(connection, self.db_table, self.fields):
+                cursor.execute(sql)
+            FULLTEXT_TABLES[table_key(connection, self.db_table)] = True
+
+    def key(self, connection):
+        """
+        Returns the column of the index table, that holds the primary key of
+        the indexed record.
+        """
+        return connection.vendor == 'sqlite' and 'rowid' or 'id'
+
+    def update(self, instances, using=None):
+        """
+        Rebuilds the index rows of I{instances}, in a single transaction.
+
+        @type instances: list
+        @param instances: Saved instances of the model
+        """
+        using = using or router.db_for_write(self.model)
+        connection = connections[using]
+        if not self.available(connection) or not instances:
+            return
+
+        qn = connection.ops.quote_name
+        rows = []
+        for instance in instances:
+            values = [
+                unicode(getattr(instance, field) or '') for field in self.fields
+            ]
+            if connection.vendor == 'sqlite':
+                rows.append([instance.pk] + values)
+            else:
+                rows.append([instance.pk, self.config, ' '.join(values)])
+
+        if connection.vendor == 'sqlite':
+            sql = 'INSERT INTO %s (rowid, %s) VALUES (%s)' % (
+                qn(self.db_table),
+                ', '.join(qn(field) for field in self.fields),
+                ', '.join(['%s'] * (len(self.fields) + 1)),
+            )
+        else:
+            sql = 'INSERT INTO %s (id, document) VALUES (%%s, to_tsvector(%%s, %%s))' \
+                % qn(self.db_table)
+
+        with transaction.atomic(using=using):
+            self.delete([instance.pk for instance in instances], using)
+            connection.cursor().executemany(sql, rows)
+
+    def delete(self, pks, using=None):
+        """
+        Deletes the index rows of the records with primary keys I{pks}.
+
+        @type pks: list
+        """
+        using = using or router.db_for_write(self.model)
+        connection = connections[using]
+        if not self.available(connection):
+            return
+
+        cursor = connection.cursor()
+        for start in xrange(0, len(pks), self.batch_size):
+            batch = pks[start:start + self.batch_size]
+            cursor.execute('DELETE FROM %s WHERE %s IN (%s)' % (
+                connection.ops.quote_name(self.db_table),
+                self.key(connection),
+                ', '.join(['%s'] * len(batch)),
+            ), batch)
+
+    def delete_data(self, data):
+        """
+        Deletes the index rows of the records of queryset I{data}, with a
+        single query.
+
+        @type data: QuerySet
+        """
+        connection = connections[data.db]
+        if not self.available(connection):
+            return
+
+        sql, params = data.values('pk').query.sql_with_params()
+        connection.cursor().execute('DELETE FROM %s WHERE %s IN (%s)' % (
+            connection.ops.quote_name(self.db_table),
+            self.key(connection),
+            sql,
+        ), params)
+
+    def filter(self, data, values):
+        """
+        Limits the queryset I{data} to the records that match any of the
+        search I{values}, and orders them by rank.
+
+        @type data: QuerySet
+
+        @type values: list
+        @param values: Search terms
+
+        @rtype: QuerySet
+        """
+        connection = connections[data.db]
+        if not self.available(connection):
+            query = Q()
+            for value in values:
+                for field in self.fields:
+                    query |= Q(**{'%s__icontains' % field: value})
+            return data.filter(query)
+
+        qn = connection.ops.quote_name
+        table = qn(self.db_table)
+        join = '%s.%s = %s.%s' % (
+            table, self.key(connection),
+            qn(data.model._meta.db_table), qn(data.model._meta.pk.column),
+        )
+
+        if connection.vendor == 'sqlite':
+            # Every value is a group of quoted words, so that the values are
+            # not parsed as FTS5 query syntax.
+            groups = []
+            for value in values:
+                words = re.findall(r'\w+', value, re.UNICODE)
+                if words:
+                    groups.append('(%s)' % ' '.join('"%s"' % word for word in words))
+            if not groups:
+                return data.none()
+
+            params = [' OR '.join(groups)]
+            where = [join, '%s MATCH %%s' % table]
+            rank, select_params, order = 'bm25(%s)' % table, [], self.rank
+        else:
+            tsquery = '(%s)' % ' || '.join(['plainto_tsquery(%s, %s)'] * len(values))
+            params = []
+            for value in values:
+                params.extend((self.config, value))
+            where = [join, '%s.document @@ %s' % (table, tsquery)]
+            rank = 'ts_rank(%s.document, %s)' % (table, tsquery)
+            select_params, order = params, '-%s' % self.rank
+
+        return data.extra(
+            select={self.rank: rank}, select_params=select_params,
+            tables=[self.db_table], where=where, params=params,
+        ).order_by(order, 'pk')
+
+
+def fulltext_indexes(model, fields=None):
+    """
+    Returns the full-text indexes of I{model}, or only the ones that index
+    any of I{fields}.
+
+    @type model: Model class
+
+    @type fields: iterable
+    @param fields: Field names
+
+    @rtype: list
+    """
+    model = model._meta.concrete_model
+    return [
+        index for index in FULLTEXT_INDEXES
+        if index.model._meta.concrete_model is model and
+        (fields is None or set(index.fields).intersection(fields))
+    ]
+
+
+def fulltext_index(model, name):
+    """
+    Returns the full-text index of I{model} named I{name}, or None.
+    """
+    for index in fulltext_indexes(model):
+        if index.name == name:
+            return index
+    return None
+
+
+def create_fulltext_tables(sender, created_models, db, **kwargs):
+    """
+    Creates the tables of the full-text indexes of the models that
+    I{syncdb} creates, for applications without migrations (and Django
+    1.6).
+    """
+    for index in FULLTEXT_INDEXES:
+        if index.model in created_models:
+            index.create_table(connections[db])
+
+
+post_syncdb.connect(create_fulltext_tables)
@@ -1,17 +1,22 @@
 import sys
+from hashlib import md5
+from types import GeneratorType
 
 from django.views.decorators.vary import vary_on_headers
-from django.http import HttpResponse
+from django.http import HttpResponse, StreamingHttpResponse
 from django.conf import settings
 
 from django.core.exceptions import ValidationError, ObjectDoesNotExist, \
     PermissionDenied
 from django.http import HttpResponseBadRequest, \
     HttpResponseGone, HttpResponseNotAllowed, \
-    HttpResponseForbidden, HttpResponseServerError
+    HttpResponseForbidden, HttpResponseServerError, HttpResponseNotModified
+from django.utils.encoding import force_bytes
+from django.utils.http import parse_etags, quote_etag
 
 from django.db import connection
 
+from . import cache
 from .utils import coerce_put_post, translate_mime
 from .exceptions import MethodNotAllowed, UnprocessableEntity,\
     ValidationErrorList, UnprocessableEntityList
@@ -120,14 +125,47 @@ class Resource:
         emitter_format = self.determine_emitter_format(request, *args, **kwargs)
         kwargs.pop('emitter_format', None)
 
-        # Execute request
-        try:
-            # Dictionary containing {'data': <Serialized result>}
-            response_dictionary = self.handler.execute_request(request, *args, **kwargs)
-        except Exception, e:
-            return self.error_response(e, request)
+        # Conditional GET, decided with the handler's validator, before the
+        # request is executed.
+        etag = None
+        if request.method.upper() == 'GET' and self.handler.etag:
+            try:
+                validator = self.handler.etag_validator(request, *args, **kwargs)
+            except Exception, e:
+                return self.error_response(e, request)
+
+            if validator is not None:
+                etag = self.etag(request, emitter_format, validator)
+                if self.etag_matches(request, etag):
+                    return self.not_modified_response(etag)
+
+        # Cached response
+        response_dictionary = cache_key = None
+        if request.method.upper() == 'GET' and self.handler.response_cache:
+            cache_key = cache.response_key(self.handler, request, kwargs, emitter_format)
+            response_dictionary = cache.get(cache_key)
+
+        if response_dictionary is None:
+            # Execute request
+            try:
+                # Dictionary containing {'data': <Serialized result>}
+                response_dictionary = self.handler.execute_request(request, *args, **kwargs)
+            except Exception, e:
+                return self.error_response(e, request)
 
-        return self.non_error_response(request, response_dictionary, emitter_format)
+            # Streamed responses are not cached
+            if cache_key and \
+                not isinstance(response_dictionary.get('data'), GeneratorType):
+                cache.set(cache_key, response_dictionary,
+                    self.handler.response_cache)
+
+        # Preferences of the ``Prefer`` header that the handler applied
+        additional_headers = {}
+        if getattr(request, 'preference_applied', None):
+            additional_headers['Preference-Applied'] = request.preference_applied
+
+        return self.non_error_response(request, response_dictionary,
+            emitter_format, additional_headers, etag=etag)
 
     def authenticate(self, request, *args, **kwargs):
         """
@@ -296,7 +334,73 @@ class Resource:
                     (key, value) for key, value in request.data.iteritems() \
                     if key in self.handler.allowed_in_fields))
 
-    def non_error_response(self, request, response_dictionary, emitter_format, additional_headers={}):
+    def etag(self, request, emitter_format, validator):
+        """
+        Returns the I{ETag} of the response to I{request}. It identifies the
+        handler, the requested URL, the emitter format, the authenticated user
+        and the validator of the response data.
+
+        @type request: HTTPRequest
+        @param request: Incoming request
+
+        @type emitter_format: str
+        @param emitter_format: Emitter format
+
+        @param validator: Validator of the response data. Either the value
+        returned by the handler's I{etag_validator}, or the serialized
+        response.
+
+        @rtype: str
+        @return: ETag, without quotes
+        """
+        user = getattr(request, 'user', None)
+        key = repr((
+            self.handler.__class__.__module__,
+            self.handler.__class__.__name__,
+            request.get_full_path(),
+            emitter_format,
+            getattr(user, 'pk', None),
+            validator,
+        ))
+        return md5(key).hexdigest()
+
+    def data_hash(self, response_dictionary):
+        """
+        Returns a hash of I{response_dictionary}, used as the validator of
+        responses whose handler doesn't provide one. It's computed from the
+        compact JSON representation of the dictionary, regardless of the
+        emitter format, so the response itself is only serialized once.
+
+        @type response_dictionary: dict
+        @param response_dictionary: Response data, without debug messages
+
+        @rtype: str
+        """
+        emitter = JSONEmitter(self.handler, response_dictionary)
+        return md5(force_bytes(
+            emitter.dumps(response_dictionary, compact=True))).hexdigest()
+
+    def etag_matches(self, request, etag):
+        """
+        Returns I{True} if I{etag} matches the I{If-None-Match} header of the
+        request.
+        """
+        if_none_match = request.META.get('HTTP_IF_NONE_MATCH', None)
+        if not if_none_match:
+            return False
+
+        etags = parse_etags(if_none_match)
+        return etag in etags or '*' in etags
+
+    def not_modified_response(self, etag):
+        """
+        Returns a I{304 Not Modified} response, with an empty body.
+        """
+        response = HttpResponseNotModified()
+        response['ETag'] = quote_etag(etag)
+        return response
+
+    def non_error_response(self, request, response_dictionary, emitter_format, additional_headers={}, etag=None):
         """
         No exception has been raised in the handler.
         Here we construct and return the HTTP response object, with the
@@ -316,9 +420,34 @@ class Resource:
         @param response_headers: Dictionary that includes additional headers to
         be added to the response ``Http-Header: Value``
 
+        @type etag: str
+        @param etag: I{ETag} of the response, if already known. For I{GET}
+        requests, it's otherwise computed from the serialized response.
+
         @rtype: HTTPResponse
         @return: Response object
         """
+        if etag is not None:
+            additional_headers = dict(additional_headers, ETag=quote_etag(etag))
+
+        if isinstance(response_dictionary.get('data'), GeneratorType):
+            # Streamed response data (see ``BaseHandler.stream``)
+            emitter_class, content_type = Emitter.get(emitter_format)
+            if hasattr(emitter_class, 'stream'):
+                return self.streaming_response(request, response_dictionary,
+                    emitter_format, additional_headers)
+            # The emitter can't stream, so the data is serialized as a whole
+            response_dictionary['data'] = list(response_dictionary['data'])
+
+        if etag is None and request.method.upper() == 'GET' and self.handler.etag:
+            # The ETag is computed from the response data without the debug
+            # messages, since they differ between requests.
+            etag = self.etag(request, emitter_format,
+                self.data_hash(response_dictionary))
+            if self.etag_matches(request, etag):
+                return self.not_modified_response(etag)
+            additional_headers = dict(additional_headers, ETag=quote_etag(etag))
+
         # Add debug messages to response dictionary
         self.response_add_debug(response_dictionary)
 
@@ -345,6 +474,57 @@ class Resource:
 
         return response
 
+    def streaming_response(self, request, response_dictionary, emitter_format, additional_headers={}):
+        """
+        Constructs and returns a streaming HTTP response, whose content is
+        serialized while it's being sent. The I{data} key of
+        I{response_dictionary} is an iterator of serialized records.
+
+        Debug messages are added to the response dictionary once all records
+        have been emitted, so that they include the queries performed while
+        streaming.
+
+        I{Note:}
+
+        Since the response has already started by the time the records are
+        loaded, any exception raised while streaming can't be turned into an
+        error response.
+
+        @type request: HTTPRequest
+        @param request: Incoming request
+
+        @type response_dictionary: dict
+        @param response_dictionary: Dictionary that includes all the response
+        data.
+
+        @type emitter_format: str
+        @param emitter_format: Emitter format. Its emitter should implement
+        I{stream}.
+
+        @type additional_headers: dict
+        @param additional_headers: Dictionary that includes additional headers
+        to be added to the response ``Http-Header: Value``
+
+        @rtype: StreamingHttpResponse
+        @return: Response object
+        """
+        def data(records):
+            for record in records:
+                yield record
+            self.response_add_debug(response_dictionary)
+        response_dictionary['data'] = data(response_dictionary['data'])
+
+        emitter_class, content_type = Emitter.get(emitter_format)
+        serializer = emitter_class(self.handler, response_dictionary, None)
+
+        response = StreamingHttpResponse(serializer.stream(request),
+            content_type=content_type, status=200)
+
+        for key, value in additional_headers.iteritems():
+            response[key] = value
+
+        return response
+
     def error_response(self, e, request):
         """
         Creates and returns the appropriate HttpResponse object, depending on
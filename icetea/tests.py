@@ -268,7 +268,11 @@ class TestResponseContentBase(BaseTest):
         type = length = None
         if response.status_code == 200:
             try:
-                content = json.loads(response.content)['data']
+                if getattr(response, 'streaming', False):
+                    body = ''.join(response.streaming_content)
+                else:
+                    body = response.content
+                content = json.loads(body)['data']
             except:
                 if 'Content-Disposition' in response:
                     type = 'attachment'
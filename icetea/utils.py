@@ -1,3 +1,4 @@
+import base64
 import json
 
 from django.core.exceptions import ValidationError
@@ -19,6 +20,58 @@ def coerce_put_post(request):
         request.PUT = request.POST
 
 
+def encode_cursor(values, forward=True):
+    """
+    Encodes the values of the ordering fields of a record into an opaque,
+    url-safe cursor. See L{handlers.ModelHandler.cursor_data}.
+
+    Dates and times are encoded in full precision, in ISO 8601 format, and
+    any other non-JSON values as strings.
+
+    @type values: list
+    @param values: Values of the ordering fields of the record
+
+    @type forward: bool
+    @param forward: Whether the cursor points to the records that follow
+    (I{True}) or precede (I{False}) the record.
+
+    @rtype: str
+    """
+    def default(value):
+        if hasattr(value, 'isoformat'):
+            return value.isoformat()
+        return unicode(value)
+
+    cursor = json.dumps([forward and 1 or 0, values], default=default,
+        separators=(',', ':'))
+    return base64.urlsafe_b64encode(cursor).rstrip('=')
+
+
+def decode_cursor(cursor):
+    """
+    Decodes a cursor encoded by L{encode_cursor}.
+
+    @type cursor: str
+    @param cursor: Cursor
+
+    @rtype: tuple
+    @return: (values, forward)
+
+    @raise ValueError: If the cursor is invalid
+    """
+    try:
+        cursor = str(cursor)
+        cursor = base64.urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4))
+        forward, values = json.loads(cursor)
+    except (TypeError, ValueError, UnicodeEncodeError):
+        raise ValueError('Invalid cursor')
+
+    if not isinstance(values, list):
+        raise ValueError('Invalid cursor')
+
+    return values, bool(forward)
+
+
 def translate_mime(request):
     request = Mimer(request).translate()
 
@@ -17,6 +17,9 @@ setup(
         "Django>=1.6,<1.8",
         "xlwt",
     ),
+    extras_require={
+        "simplejson": ("simplejson",),
+    },
     zip_safe=False,
     classifiers=(
         "Programming Language :: Python",
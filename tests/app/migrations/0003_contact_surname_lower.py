@@ -0,0 +1,28 @@
+# -*- coding: utf-8 -*-
+from __future__ import unicode_literals
+
+from django.db import models, migrations
+import icetea.indexes
+
+
+def update_surname_lower(apps, schema_editor):
+    Contact = apps.get_model('app', 'Contact')
+    icetea.indexes.update_shadow_fields(
+        Contact.objects.using(schema_editor.connection.alias))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('app', '0002_contact_emails'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='contact',
+            name='surname_lower',
+            field=icetea.indexes.LowerCaseField(db_index=True, source=b'surname', max_length=100, editable=False, blank=True),
+            preserve_default=True,
+        ),
+        migrations.RunPython(update_surname_lower),
+    ]
@@ -0,0 +1,20 @@
+# -*- coding: utf-8 -*-
+from __future__ import unicode_literals
+
+from django.db import migrations
+
+import icetea.indexes
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('app', '0003_contact_surname_lower'),
+    ]
+
+    operations = [
+        icetea.indexes.CreateFullTextIndex(
+            table='app_contact_fulltext',
+            fields=('name', 'surname'),
+        ),
+    ]
@@ -1,9 +1,28 @@
+import json
 from datetime import datetime
 
 from django.contrib import admin
 from django.contrib.auth.models import User
 from django.db import models
 
+from icetea.indexes import FullTextIndex, ListIndex, LowerCaseField
+
+
+class ListField(models.TextField):
+    """
+    List, stored as JSON text, like the JSONFields that the ``__in_list``
+    filter is meant for.
+    """
+    __metaclass__ = models.SubfieldBase
+
+    def to_python(self, value):
+        if isinstance(value, basestring):
+            return json.loads(value or '[]')
+        return value
+
+    def get_prep_value(self, value):
+        return json.dumps(value or [])
+
 
 class Client(models.Model):
 
@@ -38,6 +57,8 @@ class Contact(models.Model):
 
     surname = models.CharField(max_length=100, blank=True, db_index=True)
 
+    surname_lower = LowerCaseField('surname', max_length=100)
+
     GENDER_CHOICES = (
         ('M', 'Male'),
         ('F', 'Female'),
@@ -45,6 +66,18 @@ class Contact(models.Model):
 
     gender = models.CharField(blank=True, max_length=1, choices=GENDER_CHOICES)
 
+    emails = ListField(blank=True, default=list)
+
+
+contact_fulltext = FullTextIndex(Contact, ('name', 'surname'))
+
+
+class ContactEmail(ListIndex):
+
+    owner = models.ForeignKey(Contact, related_name='email_index')
+
+    indexed_field = 'emails'
+
 
 class Group(models.Model):
 
@@ -0,0 +1,203 @@
+from django.db import connection
+from django.test import TestCase
+
+from icetea import indexes
+from icetea.custom_filters import IN_ALL_STRATEGIES, in_all_filter, \
+    fulltext_filter, in_all_strategy, in_list_filter, isearch_filter
+
+from app.models import Client, Contact, ContactEmail, Group, contact_fulltext
+
+
+class TestInAllFilter(TestCase):
+
+    def setUp(self):
+        client = Client.objects.create(name='client')
+        self.contacts = [
+            Contact.objects.create(client=client, name='contact%d' % i)
+            for i in range(5)
+        ]
+        self.groups = [Group.objects.create() for i in range(3)]
+
+        # Contact i is a member of the groups with index <= i % 4
+        for i, contact in enumerate(self.contacts):
+            for group in self.groups[:i % 4]:
+                group.members.add(contact)
+
+    def filter(self, values, strategy=None):
+        data = in_all_filter(Contact.objects.all(), 'group__in_all', values,
+                             strategy)
+        return sorted(contact.name for contact in data)
+
+    def values(self, *indexes):
+        return [str(self.groups[index].id) for index in indexes]
+
+    def test_strategies(self):
+        for strategy in IN_ALL_STRATEGIES:
+            self.assertEqual(['contact1', 'contact2', 'contact3'],
+                             self.filter(self.values(0), strategy), strategy)
+            self.assertEqual(['contact2', 'contact3'],
+                             self.filter(self.values(0, 1), strategy), strategy)
+            self.assertEqual(['contact3'],
+                             self.filter(self.values(0, 1, 2), strategy), strategy)
+            # Repeated values
+            self.assertEqual(['contact3'],
+                             self.filter(self.values(2, 2), strategy), strategy)
+            self.assertEqual([], self.filter(['0', self.values(0)[0]], strategy),
+                             strategy)
+
+    def test_null(self):
+        self.assertEqual(['contact0', 'contact4'],
+                         self.filter(self.values(0) + ['null']))
+
+    def test_in_all_strategy(self):
+        data = Contact.objects.all()
+        self.assertEqual('exists', in_all_strategy(data, ['1', '2']))
+        self.assertEqual('intersect', in_all_strategy(data, ['1', '2', '3']))
+
+        with self.settings(ICETEA_IN_ALL_STRATEGY='count'):
+            data = in_all_filter(data, 'group__in_all', self.values(0, 1))
+            self.assertTrue(data.query.group_by)
+
+
+class TestInListFilter(TestCase):
+
+    def setUp(self):
+        client = Client.objects.create(name='client')
+        contacts = [
+            Contact.objects.create(client=client, name='contact0',
+                                   emails=['one@example.com', 'Two@example.com']),
+            Contact.objects.create(client=client, name='contact1',
+                                   emails=['two@example.com']),
+            Contact.objects.create(client=client, name='contact2',
+                                   emails=['x' * 300]),
+        ]
+        indexes.update_list_indexes(Contact, contacts)
+
+    def filter(self, values):
+        data = in_list_filter(Contact.objects.all(), 'emails__in_list', values)
+        return sorted(contact.name for contact in data)
+
+    def test_index(self):
+        self.assertEqual(3, ContactEmail.objects.count())
+
+        data = in_list_filter(Contact.objects.all(), 'emails__in_list', ['a'])
+        self.assertIn(ContactEmail._meta.db_table, str(data.query))
+        self.assertEqual(['contact0'], self.filter(['ONE@example.com']))
+        self.assertEqual(['contact0', 'contact1'],
+                         self.filter(['two@example.com', 'one@example.com']))
+        self.assertEqual([], self.filter(['example.com']))
+
+    def test_unindexable(self):
+        """
+        Values too long for the index are searched for in the list field.
+        """
+        data = in_list_filter(Contact.objects.all(), 'emails__in_list',
+                              ['x' * 300])
+        self.assertNotIn(ContactEmail._meta.db_table, str(data.query))
+        self.assertEqual(['contact2'], [contact.name for contact in data])
+
+    def test_no_index(self):
+        ContactEmail.indexed_field = 'other'
+        try:
+            data = in_list_filter(Contact.objects.all(), 'emails__in_list',
+                                  ['one@example.com'])
+            self.assertNotIn(ContactEmail._meta.db_table, str(data.query))
+            self.assertEqual(['contact0'], [contact.name for contact in data])
+        finally:
+            ContactEmail.indexed_field = 'emails'
+
+
+class TestISearchFilter(TestCase):
+
+    def setUp(self):
+        client = Client.objects.create(name='client')
+        for i, surname in enumerate(['Smith', 'SMITH', 'Jones', u'\xd6zil']):
+            Contact.objects.create(client=client, name='Contact%d' % i,
+                                   surname=surname)
+
+    def filter(self, field, values):
+        data = isearch_filter(Contact.objects.all(), '%s__isearch' % field,
+                              values)
+        return data, sorted(contact.name for contact in data)
+
+    def test_shadow(self):
+        self.assertEqual(['smith', 'smith', 'jones', u'\xf6zil'], list(
+            Contact.objects.order_by('id').values_list('surname_lower', flat=True)))
+
+        data, names = self.filter('surname', ['smith', 'JONES', u'\xd6ZIL'])
+        self.assertIn('"surname_lower" IN', unicode(data.query))
+        self.assertEqual(['Contact0', 'Contact1', 'Contact2', 'Contact3'], names)
+
+    def test_no_shadow(self):
+        data, names = self.filter('name', ['contact0', 'CONTACT2'])
+        self.assertNotIn(' IN ', str(data.query))
+        self.assertEqual(['Contact0', 'Contact2'], names)
+
+    def test_update_shadow_fields(self):
+        Contact.objects.filter(name='Contact2').update(surname='Brown')
+        self.assertEqual([], self.filter('surname', ['brown'])[1])
+
+        indexes.update_shadow_fields(Contact.objects.all())
+        self.assertEqual(['Contact2'], self.filter('surname', ['brown'])[1])
+
+
+class TestFullTextFilter(TestCase):
+
+    def setUp(self):
+        client = Client.objects.create(name='client')
+        contacts = [
+            Contact.objects.create(client=client, name=name, surname=surname)
+            for name, surname in (('John', 'Smith'), ('Jane', 'Smith-Smith'),
+                                  ('Joe', 'Black'), ('Smithers', ''))
+        ]
+        contact_fulltext.update(contacts)
+
+    def filter(self, values, definition='fulltext__fulltext'):
+        data = fulltext_filter(Contact.objects.all(), definition, values)
+        return [contact.name for contact in data]
+
+    def test_filter(self):
+        # The more occurrences, the better the rank
+        self.assertEqual(['Jane', 'John'], self.filter(['smith']))
+        self.assertEqual(['John'], self.filter(['SMITH john']))
+        self.assertEqual(['Joe', 'John'], sorted(self.filter(['john', 'joe'])))
+        self.assertEqual([], self.filter(['smith joe']))
+
+        data = fulltext_filter(Contact.objects.all(), 'fulltext__fulltext',
+                               ['smith'])
+        self.assertTrue(all(contact.fulltext_rank < 0 for contact in data))
+        # Ordering by request overrides the rank
+        self.assertEqual(['John', 'Jane'],
+                         [contact.name for contact in data.order_by('-name')])
+
+    def test_syntax(self):
+        """
+        Values are searched for as words, not as FTS5 queries.
+        """
+        self.assertEqual([], self.filter(['"']))
+        # ``OR`` is a word, that none of them contains
+        self.assertEqual([], self.filter(['john OR joe']))
+        self.assertEqual(['John'], self.filter(['"john" (']))
+        # No prefix queries
+        self.assertEqual(['Jane', 'John'], self.filter(['smith*']))
+
+    def test_no_index(self):
+        self.assertEqual(['Jane', 'Smithers'],
+                         sorted(self.filter(['smith', 'jane'], 'name__fulltext')))
+
+    def test_no_table(self):
+        """
+        Without the index table, the index isn't maintained, and the filter
+        falls back to ``icontains`` lookups.
+        """
+        key = indexes.table_key(connection, contact_fulltext.db_table)
+        indexes.FULLTEXT_TABLES[key] = False
+        try:
+            contact = Contact.objects.get(name='Joe')
+            contact.name = 'Joseph'
+            with self.assertNumQueries(0):
+                contact_fulltext.update([contact])
+            self.assertEqual(['Jane', 'John', 'Smithers'],
+                             sorted(self.filter(['smith'])))
+        finally:
+            indexes.FULLTEXT_TABLES[key] = True
@@ -0,0 +1,62 @@
+from icetea.tests import TestDatabaseOperations
+
+from app.handlers import AccountHandler, ClientHandler, ContactHandler
+
+
+class TestQueries(TestDatabaseOperations):
+    """
+    Counting the amount of queries that requests perform.
+
+    The counts include the queries that every request performs before it
+    touches the handler's working set: the session, the logged in user and
+    the account of the user (and for L{ClientModelHandler} subclasses, the
+    client of the account).
+    """
+    fixtures = ['fixtures_all']
+    USERNAME = 'user1'
+    PASSWORD = 'pass1'
+    endpoints = {
+        AccountHandler: '/api/accounts/',
+        ClientHandler: '/api/clients/',
+        ContactHandler: '/api/contacts/',
+    }
+
+    def test_ContactHandler_read_select_related(self):
+        """
+        The nested ``client`` of every contact is fetched in the same query
+        as the contacts.
+        """
+        handler = ContactHandler
+        type = 'read'
+        query = 'SELECT'
+        test_data = (
+            ('', {}, 5),
+            ('1/', {}, 5),
+            ('?field=name', {}, 5),
+        )
+        self.execute(type, handler, query, test_data)
+
+    def test_AccountHandler_read_select_related(self):
+        handler = AccountHandler
+        type = 'read'
+        query = 'SELECT'
+        test_data = (
+            ('', {}, 5),
+            ('?field=client', {}, 5),
+        )
+        self.execute(type, handler, query, test_data)
+
+    def test_ClientHandler_read_prefetch_related(self):
+        """
+        The ``accounts`` and ``contacts`` of the client are prefetched with
+        one query each.
+        """
+        handler = ClientHandler
+        type = 'read'
+        query = 'SELECT'
+        test_data = (
+            ('', {}, 6),
+            ('1/', {}, 6),
+            ('?field=name', {}, 4),
+        )
+        self.execute(type, handler, query, test_data)
@@ -1,10 +1,19 @@
+import datetime
+import json
+import decimal
+from unittest import skipUnless
+
 from django.test import TestCase
+from django.test.client import RequestFactory
+from django.test.utils import override_settings
+from django.utils.functional import lazy
 
-from icetea.handlers import BaseHandler
-from icetea.emitters import Emitter
+from icetea.handlers import BaseHandler, ModelHandler
+from icetea import emitters
+from icetea.emitters import Emitter, JSONEmitter, TypeMapper
 
 from app.handlers import AccountHandler, ClientHandler, ContactHandler
-from app.models import Account, Client
+from app.models import Account, Client, Contact, Group
 
 
 class FooHandler(BaseHandler):
@@ -65,6 +74,110 @@ class TestEmitterWithSequence(TestCase):
         self.assertEqual(result, list(payload))
 
 
+class TestJSONEmitterStream(TestCase):
+
+    def setUp(self):
+        self.handler = FooHandler()
+
+    def stream(self, payload):
+        payload = dict(payload, data=iter(payload['data']))
+        return ''.join(JSONEmitter(self.handler, payload).stream(None))
+
+    def test_stream(self):
+        """
+        Streaming gives the same output as rendering.
+        """
+        payload = {'data': [{'a': 1, 'b': {'c': [1, 2]}}, {'a': 2}]}
+        self.assertEqual(
+            JSONEmitter(self.handler, payload).render(None),
+            self.stream(payload),
+        )
+
+    def test_stream_empty(self):
+        payload = {'data': []}
+        self.assertEqual(
+            JSONEmitter(self.handler, payload).render(None),
+            self.stream(payload),
+        )
+
+    def test_stream_envelope(self):
+        payload = {'data': [{'a': 1}], 'total': 10}
+        self.assertEqual(
+            '{\n    "data": [\n        {\n            "a": 1\n        }\n    ], '
+            '\n    "total": 10\n}',
+            self.stream(payload),
+        )
+
+
+try:
+    import simplejson
+except ImportError:
+    simplejson = None
+
+
+class TestJSONEmitterBackends(TestCase):
+
+    def setUp(self):
+        self.handler = FooHandler()
+        self.payload = {
+            'data': [{
+                'datetime': datetime.datetime(2014, 1, 2, 3, 4, 5, 678000),
+                'date': datetime.date(2014, 1, 2),
+                'decimal': decimal.Decimal('1.10'),
+                'lazy': lazy(lambda: u'lazy', unicode)(),
+                'text': u'\u20ac',
+            }],
+            'total': 1,
+        }
+
+    def render(self, request=None):
+        return JSONEmitter(self.handler, self.payload).render(request)
+
+    @override_settings(ICETEA_JSON_BACKEND='json')
+    def test_json(self):
+        self.assertEqual(
+            {'data': [{
+                'datetime': '2014-01-02T03:04:05.678',
+                'date': '2014-01-02',
+                'decimal': '1.10',
+                'lazy': 'lazy',
+                'text': u'\u20ac',
+            }], 'total': 1},
+            json.loads(self.render()),
+        )
+
+    @skipUnless(simplejson, 'simplejson is not installed')
+    def test_simplejson(self):
+        with self.settings(ICETEA_JSON_BACKEND='json'):
+            expected = self.render()
+        with self.settings(ICETEA_JSON_BACKEND='simplejson'):
+            self.assertEqual(expected, self.render())
+
+    def test_compact(self):
+        pretty = self.render()
+
+        with self.settings(ICETEA_JSON_COMPACT=True):
+            compact = self.render()
+            self.assertNotIn('\n', compact)
+            self.assertEqual(json.loads(pretty), json.loads(compact))
+            self.assertEqual(
+                pretty, self.render(RequestFactory().get('/?compact=false')))
+
+        self.assertEqual(
+            compact, self.render(RequestFactory().get('/?compact=true')))
+
+    def test_compact_stream(self):
+        payload = {'data': [{'a': 1}, {'b': [1, 2]}], 'total': 2}
+        streamed = JSONEmitter(
+            self.handler, dict(payload, data=iter(payload['data'])))
+        request = RequestFactory().get('/?compact=true')
+
+        self.assertEqual(
+            '{"data":[{"a":1},{"b":[1,2]}],"total":2}',
+            ''.join(streamed.stream(request)),
+        )
+
+
 class TestEmitterWithModel(TestCase):
 
     def setUp(self):
@@ -103,5 +216,192 @@ class TestEmitterWithModel(TestCase):
         )
 
 
+class GroupHandler(ModelHandler):
+    model = Group
+    allowed_out_fields = ('id', 'members')
+
+
 class TestEmitterWithQuerySet(TestCase):
-    pass
+
+    def setUp(self):
+        self.client_handler = ClientHandler()
+        self.contact_handler = ContactHandler()
+        self.group_handler = GroupHandler()
+
+        # Hack into typemapper
+        Emitter.TYPEMAPPER[self.client_handler] = self.client_handler.model
+        Emitter.TYPEMAPPER[self.contact_handler] = self.contact_handler.model
+        Emitter.TYPEMAPPER[self.group_handler] = self.group_handler.model
+
+        for i in range(3):
+            client = Client.objects.create(name="client%d" % i)
+            group = Group.objects.create()
+            for j in range(2):
+                group.members.add(Contact.objects.create(
+                    client=client, name="contact%d%d" % (i, j)))
+
+    def tearDown(self):
+        del Emitter.TYPEMAPPER[self.client_handler]
+        del Emitter.TYPEMAPPER[self.contact_handler]
+        del Emitter.TYPEMAPPER[self.group_handler]
+
+    def test_construct_related(self):
+        """
+        Without prefetching, every client's contacts are fetched separately.
+        """
+        data = Client.objects.order_by('id')
+        e = Emitter(self.client_handler, data, fields=("name", "contacts"))
+
+        with self.assertNumQueries(4):
+            result = e.construct()
+
+        self.assertEqual(3, len(result))
+        self.assertEqual(
+            [{"name": "contact00", "surname": "", "gender": ""},
+             {"name": "contact01", "surname": "", "gender": ""}],
+            sorted(result[0]["contacts"], key=lambda contact: contact["name"]),
+        )
+
+    def test_construct_related_prefetched(self):
+        data = Client.objects.order_by('id')
+        expected = Emitter(
+            self.client_handler, data, fields=("name", "contacts")).construct()
+
+        e = Emitter(self.client_handler, data.prefetch_related("contacts"),
+                    fields=("name", "contacts"))
+        with self.assertNumQueries(2):
+            result = e.construct()
+
+        self.assertEqual(expected, result)
+
+    def test_construct_flat(self):
+        """
+        Querysets whose output fields are all database columns are read with
+        ``values_list``, and give the same representation as model instances.
+        """
+        data = Contact.objects.order_by('id')
+        fields = ("name", "surname")
+        e = Emitter(self.contact_handler, data, fields=fields)
+
+        self.assertEqual(fields, e.flat_columns(data, fields))
+        self.assertEqual(None, e.flat_columns(data, ("name", "client")))
+        self.assertEqual(None, e.flat_columns(data.distinct(), fields))
+
+        with self.assertNumQueries(1):
+            result = e.construct()
+
+        self.assertEqual(
+            Emitter(self.contact_handler, list(data), fields=fields).construct(),
+            result,
+        )
+
+    def test_construct_m2m_prefetched(self):
+        data = Group.objects.order_by('id').prefetch_related("members")
+        e = Emitter(self.group_handler, data, fields=("id", "members"))
+
+        with self.assertNumQueries(2):
+            result = e.construct()
+
+        self.assertEqual(3, len(result))
+        self.assertEqual(
+            ["contact00", "contact01"],
+            sorted(contact["name"] for contact in result[0]["members"]),
+        )
+
+
+class TestEmitterPlans(TestCase):
+
+    def setUp(self):
+        self.client = Client.objects.create(name="klm")
+        self.account = Account.objects.create(client=self.client)
+
+        self.account_handler = AccountHandler()
+        self.client_handler = ClientHandler()
+
+        # Hack into typemapper
+        Emitter.TYPEMAPPER[self.account_handler] = self.account_handler.model
+        Emitter.TYPEMAPPER[self.client_handler] = self.client_handler.model
+
+        Emitter.PLANS.clear()
+
+    def tearDown(self):
+        del Emitter.TYPEMAPPER[self.account_handler]
+        del Emitter.TYPEMAPPER[self.client_handler]
+
+    def test_plan_is_reused(self):
+        """
+        The serialization plan of a model is compiled once, and reused for
+        every instance of the model.
+        """
+        other = Account.objects.create(client=self.client, username="other")
+
+        e = Emitter(self.account_handler, [self.account, other],
+                    fields=("id", "client"))
+        first = e.construct()
+        plans = dict(Emitter.PLANS)
+
+        self.assertEqual(first, e.construct())
+        self.assertEqual(plans, Emitter.PLANS)
+        # One plan for the accounts, one for the nested clients
+        self.assertEqual(2, len(Emitter.PLANS))
+
+    def test_plan_kinds(self):
+        e = Emitter(self.account_handler, self.account)
+        plan = dict(
+            (name, kind) for name, kind, _ in
+            e.get_plan(self.account_handler, Account,
+                       ("id", "client", "client_id", "datetime_now"), False)
+        )
+        self.assertEqual(
+            {
+                "id": emitters.OTHER,
+                "client": emitters.FK,
+                "client_id": emitters.FAKE_DYNAMIC,
+                "datetime_now": emitters.FAKE_STATIC,
+            },
+            plan,
+        )
+
+    def test_plans_are_bounded(self):
+        size = Emitter.PLANS_SIZE
+        Emitter.PLANS_SIZE = 2
+        try:
+            for fields in (["id"], ["client"], ["client_id"]):
+                Emitter(self.account_handler, self.account, fields).construct()
+                self.assertTrue(len(Emitter.PLANS) <= 2)
+        finally:
+            Emitter.PLANS_SIZE = size
+
+
+class TestTypeMapper(TestCase):
+
+    def setUp(self):
+        self.account_handler = AccountHandler()
+        self.client_handler = ClientHandler()
+        self.typemapper = TypeMapper()
+        self.typemapper[self.client_handler] = Client
+
+    def test_direct(self):
+        self.assertTrue(self.typemapper.get_handler(Client) is self.client_handler)
+        self.assertEqual(None, self.typemapper.get_handler(Account))
+
+    def test_subclass(self):
+        """
+        Deferred model classes are resolved through their MRO.
+        """
+        client = Client.objects.create(name="klm")
+        deferred = Client.objects.only("id").get(pk=client.pk)
+
+        self.assertTrue(type(deferred) is not Client)
+        self.assertTrue(
+            self.typemapper.get_handler(type(deferred)) is self.client_handler)
+
+    def test_invalidation(self):
+        self.assertEqual(None, self.typemapper.get_handler(Account))
+
+        self.typemapper[self.account_handler] = Account
+        self.assertTrue(
+            self.typemapper.get_handler(Account) is self.account_handler)
+
+        del self.typemapper[self.account_handler]
+        self.assertEqual(None, self.typemapper.get_handler(Account))
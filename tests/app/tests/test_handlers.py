@@ -0,0 +1,1080 @@
+from unittest import skipUnless
+
+from django.core.exceptions import ValidationError
+from django.db import connection
+from django.test import TestCase
+from django.test.client import RequestFactory
+
+from icetea import cache
+from icetea.emitters import Emitter
+from icetea.exceptions import ValidationErrorList
+from icetea.handlers import ModelHandler
+
+from app.handlers import AccountHandler, ClientHandler, ContactHandler
+from app.models import Account, Client, Contact, ContactEmail, Group, \
+    contact_fulltext
+
+
+class HandlerTestCase(TestCase):
+    """
+    Test case of the handler class I{Handler}. An instance of it,
+    I{self.handler}, is registered in the typemapper during every test.
+    """
+    Handler = None
+
+    def setUp(self):
+        self.handler = self.Handler()
+        Emitter.TYPEMAPPER[self.handler] = self.handler.model
+
+    def tearDown(self):
+        del Emitter.TYPEMAPPER[self.handler]
+
+    def execute(self, path='/', method='get', data=None, **params):
+        """
+        Executes a request to the handler, and returns its response
+        dictionary. I{params} are the querystring parameters of I{GET}
+        requests, and I{data} is the incoming data of write requests.
+        """
+        if method == 'get':
+            request = RequestFactory().get(path, params)
+        else:
+            request = getattr(RequestFactory(), method)(path)
+            request.data = data
+        return self.handler.execute_request(request)
+
+
+class TestRelatedLookups(TestCase):
+
+    def setUp(self):
+        self.account_handler = AccountHandler()
+        self.client_handler = ClientHandler()
+        self.contact_handler = ContactHandler()
+
+        # Hack into typemapper. Handlers of other tests, registered for the
+        # same models, are put aside, since any of them could win.
+        self.typemapper = dict(Emitter.TYPEMAPPER)
+        Emitter.TYPEMAPPER.clear()
+        Emitter.TYPEMAPPER[self.account_handler] = self.account_handler.model
+        Emitter.TYPEMAPPER[self.client_handler] = self.client_handler.model
+        Emitter.TYPEMAPPER[self.contact_handler] = self.contact_handler.model
+
+    def tearDown(self):
+        Emitter.TYPEMAPPER.clear()
+        Emitter.TYPEMAPPER.update(self.typemapper)
+
+    def test_foreign_key(self):
+        self.assertEqual(
+            (['client'], []),
+            self.contact_handler.related_lookups(('name', 'client')),
+        )
+
+    def test_foreign_key_attname(self):
+        """
+        ``client_id`` is emitted as is, so there's nothing to follow.
+        """
+        self.assertEqual(
+            ([], []),
+            self.account_handler.related_lookups(('id', 'client_id')),
+        )
+
+    def test_reverse_foreign_key(self):
+        select, prefetch = self.client_handler.related_lookups(
+            ('name', 'accounts', 'contacts'))
+        self.assertEqual([], select)
+        self.assertEqual(set(['accounts', 'contacts']), set(prefetch))
+
+    def test_working_set(self):
+        request = RequestFactory().get('/')
+
+        class Handler(ModelHandler):
+            model = Contact
+            allowed_out_fields = ContactHandler.allowed_out_fields
+
+        data = Handler().working_set(request)
+        self.assertEqual({'client': {}}, data.query.select_related)
+
+        Handler.auto_related = False
+        data = Handler().working_set(request)
+        self.assertFalse(data.query.select_related)
+
+
+class TestOnlyData(TestCase):
+
+    def setUp(self):
+        self.contact_handler = ContactHandler()
+
+    def test_output_columns(self):
+        self.assertEqual(
+            ['id', 'name', 'client'],
+            self.contact_handler.output_columns(('name', 'client')),
+        )
+
+    def test_output_columns_fake_field(self):
+        self.assertEqual(
+            None,
+            self.contact_handler.output_columns(('name', 'fake')),
+        )
+
+    def test_only_data(self):
+        request = RequestFactory().get('/', {'field': ['name', 'client']})
+
+        data = self.contact_handler.only_data(request, Contact.objects.all())
+        self.assertEqual(
+            (set(['id', 'name', 'client']), False),
+            data.query.deferred_loading,
+        )
+
+        # Already limited querysets are left alone
+        limited = Contact.objects.only('surname')
+        data = self.contact_handler.only_data(request, limited)
+        self.assertEqual(limited.query.deferred_loading, data.query.deferred_loading)
+
+
+class TestStream(TestCase):
+
+    def setUp(self):
+        self.client_handler = ClientHandler()
+        Emitter.TYPEMAPPER[self.client_handler] = self.client_handler.model
+
+        for i in range(5):
+            client = Client.objects.create(name="client%d" % i)
+            Contact.objects.create(client=client, name="contact%d" % i)
+
+    def tearDown(self):
+        del Emitter.TYPEMAPPER[self.client_handler]
+
+    def test_stream_response(self):
+        handler = ContactHandler()
+        data = Contact.objects.all()
+        factory = RequestFactory()
+
+        self.assertFalse(handler.stream_response(factory.get('/'), data))
+        self.assertTrue(
+            handler.stream_response(factory.get('/', {'stream': 'true'}), data))
+        self.assertFalse(
+            handler.stream_response(factory.post('/?stream=true'), data))
+        self.assertFalse(handler.stream_response(
+            factory.get('/', {'stream': 'true'}), data[0]))
+
+        handler.stream = True
+        self.assertTrue(handler.stream_response(factory.get('/'), data))
+        self.assertFalse(
+            handler.stream_response(factory.get('/', {'stream': 'false'}), data))
+
+        # The hooks that expect the sliced data as a whole are overridden
+        handler = AccountHandler()
+        handler.stream = True
+        self.assertFalse(handler.stream_response(factory.get('/'),
+                                                 Account.objects.all()))
+
+    def test_stream_data(self):
+        """
+        Records are serialized in chunks, and relations are prefetched per
+        chunk.
+        """
+        request = RequestFactory().get('/')
+        fields = ('name', 'contacts')
+        data = Client.objects.order_by('id').prefetch_related('contacts')
+        expected = Emitter(self.client_handler, data, fields).construct()
+
+        # One query for the clients, and one per chunk for their contacts
+        self.client_handler.stream_chunk_size = 2
+        with self.assertNumQueries(4):
+            result = list(self.client_handler.stream_data(request, data, fields))
+
+        self.assertEqual(expected, result)
+
+
+class TestCursor(HandlerTestCase):
+
+    class Handler(ModelHandler):
+        read = True
+        model = Contact
+        allowed_out_fields = ('id', 'name')
+        cursor = True
+        cursor_size = 2
+        order = True
+
+    def setUp(self):
+        super(TestCursor, self).setUp()
+        client = Client.objects.create(name='client')
+        for name in ('b', 'a', 'c', 'a', 'b', 'a', 'c'):
+            Contact.objects.create(client=client, name=name)
+
+    def page(self, **params):
+        response = self.execute(**params)
+        return [item['id'] for item in response['data']], response
+
+    def walk(self, order, direction='next', cursor=''):
+        """
+        Walks through all pages, starting from the page of I{cursor}.
+        """
+        ids = []
+        while cursor is not None:
+            page, response = self.page(order=order, cursor=cursor)
+            if direction == 'prev':
+                ids = page + ids
+            else:
+                ids.extend(page)
+            cursor = response[direction]
+        return ids, response
+
+    def test_cursor_ordering(self):
+        data = Contact.objects.order_by('-name')
+        self.assertEqual(
+            [('name', True), ('id', False)],
+            self.handler.cursor_ordering(data),
+        )
+        self.assertEqual(
+            [('client_id', False), ('id', True)],
+            self.handler.cursor_ordering(data.order_by('client', '-pk')),
+        )
+
+    def test_walk(self):
+        for order in ('name', '-name', 'id', '-id'):
+            expected = list(Contact.objects.order_by(order, 'id').
+                values_list('id', flat=True))
+
+            ids, response = self.walk(order)
+            self.assertEqual(expected, ids)
+
+            # And back again, from the last page
+            ids, _ = self.walk(order, 'prev', response['prev'])
+            self.assertEqual(expected[:-1], ids)
+
+    def test_first_page(self):
+        ids, response = self.page(cursor='', limit=3, count='true')
+        self.assertEqual(3, len(ids))
+        self.assertEqual(7, response['total'])
+        self.assertEqual(None, response['prev'])
+        self.assertTrue(response['next'])
+
+    def test_no_count(self):
+        """
+        Pages are only counted when explicitly requested.
+        """
+        with self.settings(DEBUG=True):
+            start = len(connection.queries)
+            ids, response = self.page(cursor='')
+            queries = connection.queries[start:]
+        self.assertEqual(2, len(ids))
+        self.assertNotIn('total', response)
+        self.assertEqual(
+            [], [query for query in queries if 'COUNT' in query['sql']])
+
+    def test_invalid_cursor(self):
+        self.assertRaises(ValidationError, self.page, cursor='invalid')
+
+    def test_fulltext(self):
+        """
+        The rank of full-text searches can't be sought, but explicit
+        orderings can.
+        """
+        self.handler.filters = dict(search='fulltext__fulltext')
+        contact_fulltext.update(Contact.objects.all())
+        self.assertRaises(ValidationError, self.page, cursor='', search='a')
+
+        expected = list(Contact.objects.filter(name='a').order_by('-id').
+            values_list('id', flat=True))
+        page, response = self.page(cursor='', search='a', order='-id')
+        self.assertEqual(expected[:2], page)
+        page, response = self.page(cursor=response['next'], search='a',
+                                   order='-id')
+        self.assertEqual(expected[2:], page)
+
+
+class TestHasMore(HandlerTestCase):
+
+    class Handler(ModelHandler):
+        read = True
+        model = Contact
+        allowed_out_fields = ('id', 'name')
+        slice = True
+        has_more = True
+
+    def setUp(self):
+        super(TestHasMore, self).setUp()
+        client = Client.objects.create(name='client')
+        for i in range(7):
+            Contact.objects.create(client=client, name='contact%d' % i)
+
+    def test_has_more(self):
+        # No COUNT query
+        with self.assertNumQueries(1):
+            response = self.execute(slice='0:3')
+        self.assertEqual(3, len(response['data']))
+        self.assertTrue(response['has_more'])
+        self.assertNotIn('total', response)
+
+        response = self.execute(slice='5:7')
+        self.assertEqual(2, len(response['data']))
+        self.assertFalse(response['has_more'])
+
+        response = self.execute(slice='0:6:2')
+        self.assertEqual(3, len(response['data']))
+        self.assertTrue(response['has_more'])
+
+        response = self.execute(slice='4:')
+        self.assertEqual(3, len(response['data']))
+        self.assertFalse(response['has_more'])
+
+    def test_count(self):
+        response = self.execute(slice='0:3', count='true')
+        self.assertTrue(response['has_more'])
+        self.assertEqual(7, response['total'])
+
+        response = self.execute(slice='0:3', has_more='false')
+        self.assertNotIn('has_more', response)
+        self.assertEqual(7, response['total'])
+
+
+class TestCountData(HandlerTestCase):
+
+    class Handler(ModelHandler):
+        read = True
+        model = Contact
+        allowed_out_fields = ('id', 'name')
+        slice = True
+        filters = {'name': 'name__in'}
+        count_cache = True
+
+    def setUp(self):
+        super(TestCountData, self).setUp()
+        cache.cache().clear()
+        client = Client.objects.create(name='client')
+        for i in range(7):
+            Contact.objects.create(client=client, name='contact%d' % (i % 2))
+
+    def test_count_cache(self):
+        self.assertEqual(7, self.execute(slice='0:2')['total'])
+
+        # The total is cached, only the page is read
+        with self.assertNumQueries(1):
+            self.assertEqual(7, self.execute(slice='2:4')['total'])
+
+        # Filtered data is counted separately
+        self.assertEqual(4, self.execute(slice='0:2', name='contact0')['total'])
+
+        # Writes through the handler invalidate the total
+        Contact.objects.filter(name='contact1').delete()
+        cache.invalidate(self.handler)
+        self.assertEqual(4, self.execute(slice='0:2')['total'])
+
+    def test_approximate(self):
+        self.handler.count_cache = False
+        self.handler.count_strategy = 'approximate'
+
+        # No estimates on SQLite
+        response = self.execute(slice='0:2')
+        self.assertEqual(7, response['total'])
+        self.assertNotIn('approximate', response)
+
+        self.handler.estimate_count = lambda data: 20000
+        response = self.execute(slice='0:2')
+        self.assertEqual(20000, response['total'])
+        self.assertTrue(response['approximate'])
+
+        # Small estimates are counted exactly
+        self.handler.estimate_count = lambda data: 20
+        self.assertEqual(7, self.execute(slice='0:2')['total'])
+
+
+class TestSliceData(TestCase):
+
+    def setUp(self):
+        self.handler = ContactHandler()
+
+        client = Client.objects.create(name='client')
+        for i in range(20):
+            Contact.objects.create(client=client, name='contact%d' % (i % 7))
+
+        self.data = Contact.objects.order_by('-name', 'id')
+
+    def test_stepped(self):
+        """
+        Stepped slices read the primary keys of the range, and then only the
+        selected records.
+        """
+        with self.assertNumQueries(2):
+            sliced = list(self.handler.slice_data(self.data, '2:17:3'))
+        self.assertEqual(list(self.data)[2:17:3], sliced)
+
+        with self.assertNumQueries(2):
+            sliced = list(self.handler.slice_data(self.data, '5::4'))
+        self.assertEqual(list(self.data)[5::4], sliced)
+
+    def test_stepped_batches(self):
+        self.handler.sample_batch_size = 2
+        with self.assertNumQueries(4):
+            sliced = self.handler.slice_data(self.data, ':15:3')
+        self.assertEqual(list(self.data)[:15:3], sliced)
+
+
+class TestBulkCreate(HandlerTestCase):
+
+    class Handler(ModelHandler):
+        model = Client
+        create = True
+        bulk_create = True
+        bulk_create_batch_size = 2
+        allowed_in_fields = ('name',)
+        allowed_out_fields = ('name',)
+
+        # Names of clients created concurrently, after validation
+        concurrent = ()
+
+        def validate(self, request, *args, **kwargs):
+            super(TestBulkCreate.Handler, self).validate(request, *args, **kwargs)
+            for name in self.concurrent:
+                Client.objects.create(name=name)
+
+    def post(self, *names):
+        return self.execute(method='post',
+                            data=[{'name': name} for name in names])
+
+    def inserts(self, queries):
+        return [query for query in queries
+                if 'INSERT INTO' in query['sql']]
+
+    def test_batches(self):
+        with self.settings(DEBUG=True):
+            start = len(connection.queries)
+            response = self.post('a', 'b', 'c', 'd', 'e')
+            queries = connection.queries[start:]
+
+        self.assertEqual(['a', 'b', 'c', 'd', 'e'],
+                         [item['name'] for item in response['data']])
+        self.assertEqual(3, len(self.inserts(queries)))
+        self.assertEqual(5, Client.objects.count())
+
+    def test_save(self):
+        """
+        Instances are saved one at a time if their primary keys are needed.
+        """
+        self.handler.allowed_out_fields = ('id', 'name')
+        response = self.post('a', 'b', 'c')
+        self.assertEqual(
+            list(Client.objects.order_by('id').values_list('id', flat=True)),
+            [item['id'] for item in response['data']],
+        )
+
+    def test_minimal(self):
+        """
+        Instances are saved one at a time if their primary keys are
+        requested as the minimal representation.
+        """
+        requests = (RequestFactory().post('/?minimal=pk'),
+                    RequestFactory().post('/', HTTP_PREFER='return=minimal'))
+        for names, request in zip((('a', 'b'), ('c', 'd')), requests):
+            request.data = [{'name': name} for name in names]
+            response = self.handler.execute_request(request)
+            self.assertEqual(
+                list(Client.objects.order_by('-id').values_list('id', flat=True)[:2])[::-1],
+                response['data'],
+            )
+
+    def test_partial(self):
+        self.handler.concurrent = ('b',)
+        response = self.post('a', 'b', 'c', 'd')
+        self.assertEqual(['a', 'c', 'd'],
+                         [item['name'] for item in response['data']])
+        self.assertEqual([1], [error['index'] for error in response['errors']])
+        self.assertEqual(4, Client.objects.count())
+
+    def test_atomic(self):
+        self.handler.bulk_create_atomic = True
+        self.handler.concurrent = ('d',)
+        with self.assertRaises(ValidationErrorList) as context:
+            self.post('a', 'b', 'c', 'd')
+        self.assertEqual([{'index': 3}],
+                         [error.params for error in context.exception.error_list])
+        self.assertEqual(['d'], [client.name for client in Client.objects.all()])
+
+
+class TestValidateUnique(HandlerTestCase):
+
+    Handler = TestBulkCreate.Handler
+
+    def setUp(self):
+        super(TestValidateUnique, self).setUp()
+        Client.objects.create(name='existing')
+
+    def test_batched(self):
+        """
+        Uniqueness is validated with a query per unique constraint, also
+        among the instances themselves.
+        """
+        instances = [Client(name=name) for name in
+                     ('a', 'existing', 'b', 'a', 'c')]
+        with self.assertNumQueries(1):
+            errors = self.handler.validate_unique_data(instances)
+        self.assertEqual([False, True, False, True, False],
+                         [bool(instance_errors) for instance_errors in errors])
+        self.assertEqual(['name'], errors[1].keys())
+
+        self.handler.unique_batch_size = 2
+        with self.assertNumQueries(2):
+            errors = self.handler.validate_unique_data(instances)
+        self.assertEqual([False, True, False, True, False],
+                         [bool(instance_errors) for instance_errors in errors])
+
+    def test_exclude(self):
+        instances = [Client(name='existing'), Client(name='existing')]
+        self.assertEqual(
+            [{}, {}],
+            self.handler.validate_unique_data(instances, [['name'], ['name']]),
+        )
+
+    def test_update(self):
+        """
+        Updated instances are not compared to their current values.
+        """
+        instances = list(Client.objects.all())
+        self.assertEqual([{}], self.handler.validate_unique_data(instances))
+
+    def test_validate(self):
+        request = RequestFactory().post('/')
+        request.method = 'POST'
+        request.data = [{'name': 'existing'}, {'name': ''}, {'name': 'a'}]
+        with self.assertRaises(ValidationErrorList) as context:
+            self.handler.validate(request)
+        self.assertEqual(
+            [({'index': 0}, ['name']), ({'index': 1}, ['name'])],
+            [(error.params, error.message_dict.keys())
+             for error in context.exception.error_list],
+        )
+
+    def test_missing_field(self):
+        """
+        Items missing a required field are invalid, and nothing is created.
+        """
+        with self.assertRaises(ValidationErrorList) as context:
+            self.execute(method='post', data=[{'name': 'a'}, {}])
+        self.assertEqual(
+            [({'index': 1}, ['name'])],
+            [(error.params, error.message_dict.keys())
+             for error in context.exception.error_list],
+        )
+        self.assertEqual(['existing'],
+                         list(Client.objects.values_list('name', flat=True)))
+
+    def test_conflict(self):
+        """
+        Conflicts that validation misses (eg under case-insensitive
+        collations) are reported as validation errors when saving.
+        """
+        class Handler(ModelHandler):
+            model = Client
+            update = True
+            plural_update = True
+            allowed_in_fields = ('name',)
+            allowed_out_fields = ('name',)
+
+            def validate_unique_data(self, instances, exclude=None):
+                return [{} for instance in instances]
+
+        Client.objects.create(name='other')
+        request = RequestFactory().put('/')
+        request.data = {'name': 'renamed'}
+        with self.assertRaises(ValidationError):
+            Handler().execute_request(request)
+        # Nothing is updated
+        self.assertEqual(['existing', 'other'],
+                         sorted(Client.objects.values_list('name', flat=True)))
+
+
+class TestSetUpdate(HandlerTestCase):
+
+    class Handler(ModelHandler):
+        model = Contact
+        update = True
+        plural_update = True
+        set_update = True
+        allowed_in_fields = ('name', 'gender')
+        allowed_out_fields = ('name', 'gender')
+        filters = dict(gender='gender__in')
+
+    def setUp(self):
+        super(TestSetUpdate, self).setUp()
+        client = Client.objects.create(name='client')
+        for i in range(5):
+            Contact.objects.create(client=client, name='contact%d' % i,
+                                   gender='M')
+
+    def put(self, data, path='/?gender=M'):
+        return self.execute(path, 'put', data)
+
+    def test_update(self):
+        """
+        The records are updated with a single query, and selected again even
+        though they don't match the filters any more.
+        """
+        self.handler.sample_batch_size = 3
+        # Primary keys, 2 updates within a savepoint, 2 selects
+        with self.assertNumQueries(7):
+            response = self.put({'gender': 'F'})
+        self.assertEqual(['F'] * 5, [item['gender'] for item in response['data']])
+        self.assertEqual(5, Contact.objects.filter(gender='F').count())
+
+    def test_count(self):
+        self.handler.set_update = 'count'
+        # An update within a savepoint
+        with self.assertNumQueries(3):
+            response = self.put({'gender': 'F'})
+        self.assertEqual(5, response['data'])
+        self.assertEqual(5, Contact.objects.filter(gender='F').count())
+
+    def test_count_slice(self):
+        """
+        The number of updated records is neither sliced nor counted.
+        """
+        self.handler.set_update = 'count'
+        self.handler.slice = 'slice'
+        response = self.put({'gender': 'F'}, '/?gender=M&slice=:2&count')
+        self.assertEqual({'data': 5}, response)
+        self.assertEqual(5, Contact.objects.filter(gender='F').count())
+
+    def test_shadow(self):
+        values = self.handler.clean_update_values({'surname': 'Renamed'})
+        self.assertEqual('renamed', values['surname_lower'])
+
+    def test_invalid(self):
+        with self.assertRaises(ValidationError) as context:
+            self.put({'gender': 'X'})
+        self.assertEqual(['gender'], context.exception.message_dict.keys())
+        self.assertEqual(5, Contact.objects.filter(gender='M').count())
+
+    def test_set_updatable(self):
+        request = RequestFactory().put('/')
+        request.data = {'gender': 'F'}
+        self.assertTrue(self.handler.set_updatable(request))
+
+        # Unique fields are validated per record
+        self.assertFalse(ClientHandler.set_update)
+        handler = self.Handler()
+        handler.model = Client
+        request.data = {'name': 'other'}
+        self.assertFalse(handler.set_updatable(request))
+
+        # So are handlers that validate on their own
+        class Handler(self.Handler):
+            update = True
+
+            def validate(self, request, *args, **kwargs):
+                super(Handler, self).validate(request, *args, **kwargs)
+
+        request.data = {'gender': 'F'}
+        self.assertFalse(Handler().set_updatable(request))
+
+
+class TestUpdateChangedFields(HandlerTestCase):
+
+    class Handler(ModelHandler):
+        model = Contact
+        update = True
+        plural_update = True
+        update_changed_fields = True
+        allowed_in_fields = ('name', 'surname', 'gender', 'client_id')
+        allowed_out_fields = ('name', 'surname', 'gender')
+
+    def setUp(self):
+        super(TestUpdateChangedFields, self).setUp()
+        self.client = Client.objects.create(name='client')
+        for i in range(3):
+            Contact.objects.create(client=self.client, name='contact%d' % i,
+                                   surname='surname', gender='M')
+
+    def put(self, data, **kwargs):
+        request = RequestFactory().put('/')
+        request.data = data
+        with self.settings(DEBUG=True):
+            start = len(connection.queries)
+            self.handler.execute_request(request, **kwargs)
+            return [query['sql'] for query in connection.queries[start:]
+                    if 'UPDATE' in query['sql']]
+
+    def test_changed(self):
+        contact = Contact.objects.get(name='contact0')
+        updates = self.put({'name': 'renamed', 'gender': 'M'}, id=contact.pk)
+        self.assertEqual(1, len(updates))
+        self.assertIn('"name"', updates[0])
+        self.assertNotIn('"gender"', updates[0])
+        self.assertNotIn('"surname"', updates[0])
+        self.assertEqual('renamed', Contact.objects.get(id=contact.pk).name)
+
+    def test_unchanged(self):
+        """
+        Unchanged instances are not written, also when the values only
+        differ before validation.
+        """
+        self.assertEqual([], self.put({'surname': 'surname'}))
+        self.assertEqual(
+            [], self.put({'client_id': str(self.client.pk)}))
+
+        updates = self.put({'name': 'contact1'})
+        self.assertEqual(2, len(updates))
+        self.assertEqual(3, Contact.objects.filter(name='contact1').count())
+
+    @skipUnless(connection.vendor == 'sqlite', 'SQLite trigger')
+    def test_failed(self):
+        """
+        An instance that fails to be saved doesn't prevent the rest of them
+        from being saved.
+        """
+        def fail():
+            raise Exception
+
+        cursor = connection.cursor()
+        # Exceptions of user-defined functions are OperationalErrors
+        connection.connection.create_function('fail', 0, fail)
+        cursor.execute(
+            "CREATE TRIGGER fail BEFORE UPDATE ON app_contact "
+            "WHEN OLD.name = 'contact1' BEGIN SELECT fail(); END"
+        )
+        try:
+            self.put({'surname': 'renamed'})
+        finally:
+            cursor.execute("DROP TRIGGER fail")
+        self.assertEqual(
+            ['contact0', 'contact2'],
+            sorted(Contact.objects.filter(surname='renamed').
+                   values_list('name', flat=True)),
+        )
+
+    def test_disabled(self):
+        self.handler.update_changed_fields = False
+        updates = self.put({'surname': 'surname'})
+        self.assertEqual(3, len(updates))
+        self.assertIn('"gender"', updates[0])
+
+    def test_shadow(self):
+        contact = Contact.objects.get(name='contact0')
+        updates = self.put({'surname': 'Renamed'}, id=contact.pk)
+        self.assertIn('"surname_lower"', updates[0])
+        self.assertEqual('renamed',
+                         Contact.objects.get(id=contact.pk).surname_lower)
+
+
+class TestDeleteData(TestCase):
+
+    class ContactHandler(ModelHandler):
+        model = Contact
+        delete = True
+        plural_delete = True
+        allowed_out_fields = ('name',)
+
+    class MemberHandler(ModelHandler):
+        model = Group.members.through
+        delete = True
+        plural_delete = True
+        allowed_out_fields = ('contact_id',)
+
+    def setUp(self):
+        self.contact_handler = self.ContactHandler()
+        self.member_handler = self.MemberHandler()
+        Emitter.TYPEMAPPER[self.contact_handler] = Contact
+        Emitter.TYPEMAPPER[self.member_handler] = Group.members.through
+
+        client = Client.objects.create(name='client')
+        group = Group.objects.create()
+        for i in range(5):
+            group.members.add(
+                Contact.objects.create(client=client, name='contact%d' % i))
+
+    def tearDown(self):
+        del Emitter.TYPEMAPPER[self.contact_handler]
+        del Emitter.TYPEMAPPER[self.member_handler]
+
+    def delete(self, handler):
+        """
+        Performs a plural DELETE request, and returns its response along with
+        the SQL of its queries.
+        """
+        request = RequestFactory().delete('/')
+        with self.settings(DEBUG=True):
+            start = len(connection.queries)
+            response = handler.execute_request(request)
+            return response, [query['sql'] for query in connection.queries[start:]]
+
+    def selects(self, queries, table):
+        return [sql for sql in queries
+                if 'SELECT' in sql and 'FROM "%s"' % table in sql]
+
+    def deletes(self, queries, table):
+        return [sql for sql in queries if 'DELETE FROM "%s"' % table in sql]
+
+    def test_collected(self):
+        """
+        Model instances with cascades are loaded once, for both the response
+        and the deletion.
+        """
+        self.assertFalse(self.contact_handler.fast_deletable(Contact.objects.all()))
+
+        response, queries = self.delete(self.contact_handler)
+        self.assertEqual(5, len(response['data']))
+        self.assertEqual(1, len(self.selects(queries, 'app_contact')))
+        self.assertEqual(1, len(self.deletes(queries, 'app_contact')))
+        self.assertEqual(0, Contact.objects.count())
+        self.assertEqual(0, Group.members.through.objects.count())
+
+    def test_collected_batches(self):
+        self.contact_handler.delete_batch_size = 2
+        response, queries = self.delete(self.contact_handler)
+        self.assertEqual(1, len(self.selects(queries, 'app_contact')))
+        self.assertEqual(3, len(self.deletes(queries, 'app_contact')))
+        self.assertEqual(0, Contact.objects.count())
+
+    def test_fast(self):
+        """
+        Model instances without cascades are never loaded.
+        """
+        table = Group.members.through._meta.db_table
+        response, queries = self.delete(self.member_handler)
+        self.assertEqual(5, len(response['data']))
+        # Only the one of the response
+        self.assertEqual(1, len(self.selects(queries, table)))
+        self.assertEqual(1, len(self.deletes(queries, table)))
+        self.assertEqual(0, Group.members.through.objects.count())
+
+    def test_fast_batches(self):
+        table = Group.members.through._meta.db_table
+        self.member_handler.delete_batch_size = 2
+        response, queries = self.delete(self.member_handler)
+        # The primary keys are read from the instances of the response
+        self.assertEqual(1, len(self.selects(queries, table)))
+        self.assertEqual(3, len(self.deletes(queries, table)))
+        self.assertEqual(0, Group.members.through.objects.count())
+
+
+class TestMinimal(HandlerTestCase):
+
+    class Handler(ModelHandler):
+        model = Contact
+        create = True
+        update = True
+        delete = True
+        bulk_create = True
+        plural_update = True
+        plural_delete = True
+        allowed_in_fields = ('name', 'client_id')
+        allowed_out_fields = ('name', 'client')
+
+    def setUp(self):
+        super(TestMinimal, self).setUp()
+        self.client = Client.objects.create(name='client')
+        for i in range(3):
+            Contact.objects.create(client=self.client, name='contact%d' % i)
+
+    def test_minimal_requested(self):
+        factory = RequestFactory()
+        requested = self.handler.minimal_requested
+
+        self.assertEqual(None, requested(factory.delete('/')))
+        self.assertEqual('pk', requested(factory.delete('/?minimal')))
+        self.assertEqual('count', requested(factory.delete('/?minimal=count')))
+        # Only for write requests
+        self.assertEqual(None, requested(factory.get('/?minimal')))
+
+        request = factory.delete('/', HTTP_PREFER='respond-async, return=minimal')
+        self.assertEqual('pk', requested(request))
+        self.assertEqual('return=minimal', request.preference_applied)
+        # The querystring has precedence
+        request = factory.delete('/?minimal=false', HTTP_PREFER='return=minimal')
+        self.assertEqual(None, requested(request))
+
+        self.handler.minimal = True
+        self.assertEqual('pk', requested(factory.delete('/')))
+        self.assertEqual(None, requested(
+            factory.delete('/', HTTP_PREFER='return=representation')))
+
+    def test_delete(self):
+        pks = list(Contact.objects.order_by('id').values_list('id', flat=True))
+        response = self.execute('/?minimal', 'delete')
+        self.assertEqual(pks, sorted(response['data']))
+        self.assertEqual(0, Contact.objects.count())
+
+    def test_create(self):
+        response = self.execute(
+            '/?minimal=count', 'post',
+            [{'name': 'new', 'client_id': self.client.pk}] * 2)
+        self.assertEqual({'data': 2}, response)
+
+    def test_update(self):
+        """
+        Relations are not loaded.
+        """
+        request = RequestFactory().put('/?minimal')
+        request.data = {'name': 'renamed'}
+        request.dataset = self.handler.data(request)
+        self.assertFalse(request.dataset.query.select_related)
+
+        response = self.handler.execute_request(request)
+        self.assertEqual(3, len(response['data']))
+        self.assertEqual(3, Contact.objects.filter(name='renamed').count())
+
+
+class TestIndexData(HandlerTestCase):
+
+    class Handler(ModelHandler):
+        model = Contact
+        read = True
+        create = True
+        update = True
+        delete = True
+        bulk_create = True
+        plural_update = True
+        plural_delete = True
+        set_update = True
+        allowed_in_fields = ('client_id', 'name', 'emails')
+        allowed_out_fields = ('name', 'emails')
+        filters = dict(email='emails__in_list')
+
+    def setUp(self):
+        super(TestIndexData, self).setUp()
+        self.client_id = Client.objects.create(name='client').id
+
+    def request(self, method, data=None, path='/'):
+        return self.execute(path, method, data)
+
+    def values(self):
+        return sorted(ContactEmail.objects.values_list('owner__name', 'value'))
+
+    def fulltext(self):
+        cursor = connection.cursor()
+        cursor.execute('SELECT rowid, name FROM %s ORDER BY name'
+                       % contact_fulltext.db_table)
+        return [name for pk, name in cursor.fetchall()]
+
+    def test_write(self):
+        self.request('post', [
+            dict(client_id=self.client_id, name='contact0',
+                 emails=['One@example.com']),
+            dict(client_id=self.client_id, name='contact1',
+                 emails=['one@example.com', 'two@example.com']),
+        ])
+        self.assertEqual([
+            ('contact0', 'one@example.com'),
+            ('contact1', 'one@example.com'),
+            ('contact1', 'two@example.com'),
+        ], self.values())
+
+        response = self.request('get', path='/?email=two@example.com')
+        self.assertEqual(['contact1'], [item['name'] for item in response['data']])
+
+        # The index rows of the updated list field are rebuilt
+        self.request('put', {'emails': ['three@example.com']},
+                     '/?email=one@example.com')
+        self.assertEqual([
+            ('contact0', 'three@example.com'),
+            ('contact1', 'three@example.com'),
+        ], self.values())
+
+        self.request('delete', path='/?email=three@example.com')
+        self.assertEqual([], self.values())
+
+    def test_fulltext(self):
+        self.handler.filters = dict(search='fulltext__fulltext')
+        self.request('post', [
+            dict(client_id=self.client_id, name='John Smith'),
+            dict(client_id=self.client_id, name='Jane Smith'),
+        ])
+        self.assertEqual(['Jane Smith', 'John Smith'], self.fulltext())
+
+        self.request('put', {'name': 'Jane Brown'}, '/?search=jane')
+        self.assertEqual(['Jane Brown', 'John Smith'], self.fulltext())
+        response = self.request('get', path='/?search=smith')
+        self.assertEqual(['John Smith'], [item['name'] for item in response['data']])
+
+        self.request('delete', path='/?search=brown')
+        self.assertEqual(['John Smith'], self.fulltext())
+        self.handler.delete_batch_size = 1
+        self.request('delete')
+        self.assertEqual([], self.fulltext())
+
+    def test_other_fields(self):
+        """
+        Updates of other fields leave the index alone, and can still be
+        set-based.
+        """
+        self.request('post', dict(client_id=self.client_id, name='contact0',
+                                  emails=['one@example.com']))
+
+        request = RequestFactory().put('/')
+        request.data = {'emails': []}
+        self.assertFalse(self.handler.set_updatable(request))
+
+        contacts = list(Contact.objects.all())
+        with self.assertNumQueries(0):
+            self.handler.index_data(contacts, ['gender'])
+
+
+class TestFilterCache(HandlerTestCase):
+
+    class Handler(ModelHandler):
+        model = Contact
+        read = True
+        delete = True
+        plural_delete = True
+        filter_cache = True
+        order = 'order'
+        allowed_out_fields = ('name',)
+        filters = dict(name='name__isearch', gender='gender__in')
+
+    def setUp(self):
+        super(TestFilterCache, self).setUp()
+        cache.cache().clear()
+        client = Client.objects.create(name='client')
+        for i in range(5):
+            Contact.objects.create(client=client, name='contact%d' % i,
+                                   gender='MF'[i % 2])
+
+    def request(self, path, method='get'):
+        """
+        Returns the names in the response to I{request}, along with the SQL of
+        its queries.
+        """
+        with self.settings(DEBUG=True):
+            start = len(connection.queries)
+            response = self.execute(path, method)
+            return [item['name'] for item in response['data']], \
+                [query['sql'] for query in connection.queries[start:]]
+
+    def test_cached(self):
+        names, queries = self.request('/?name=contact1&name=contact2')
+        self.assertEqual(['contact1', 'contact2'], sorted(names))
+
+        # The order of the values doesn't matter
+        names, queries = self.request('/?name=contact2&name=contact1&name=contact2')
+        self.assertEqual(['contact1', 'contact2'], sorted(names))
+        self.assertEqual(1, len(queries))
+        self.assertNotIn('LIKE', queries[0])
+
+        # Neither do other parameters
+        names, queries = self.request('/?name=contact2&name=contact1&order=-name')
+        self.assertEqual(['contact2', 'contact1'], names)
+        self.assertEqual(1, len(queries))
+
+        # Other filters are cached separately
+        names, queries = self.request('/?name=contact1&name=contact2&gender=M')
+        self.assertEqual(['contact2'], names)
+        self.assertEqual(2, len(queries))
+
+    def test_invalidate_on_write(self):
+        self.request('/?gender=M')
+        self.request('/?name=contact0', 'delete')
+
+        names, queries = self.request('/?gender=M')
+        self.assertEqual(['contact2', 'contact4'], sorted(names))
+        self.assertEqual(2, len(queries))
+
+    def test_size(self):
+        self.handler.filter_cache_size = 2
+        self.request('/?gender=M')
+        names, queries = self.request('/?gender=M')
+        self.assertEqual(3, len(names))
+        self.assertIn('"gender" IN', queries[0])
+
+        self.request('/?gender=F')
+        names, queries = self.request('/?gender=F')
+        self.assertEqual(2, len(names))
+        self.assertNotIn('"gender" IN', queries[0])
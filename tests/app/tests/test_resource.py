@@ -0,0 +1,206 @@
+import json
+
+from django.contrib.auth.models import User
+from django.db import connection
+from django.test import TestCase
+from django.test.client import Client, RequestFactory
+
+from icetea import cache
+from icetea.resource import Resource
+
+from app.handlers import ClientHandler, ContactHandler
+from app.models import Contact
+
+
+class ETagContactHandler(ContactHandler):
+    read = True
+    etag = True
+
+
+class ValidatedContactHandler(ContactHandler):
+    read = True
+    etag = True
+    etag_field = 'id'
+
+
+class CachedContactHandler(ContactHandler):
+    read = True
+    delete = True
+    response_cache = True
+    cache_dependencies = ('app.handlers.ClientHandler',)
+
+
+class ResourceTestCase(TestCase):
+    fixtures = ['fixtures_all']
+
+    def call(self, resource, request, **kwargs):
+        """
+        Calls I{resource}, and returns the response along with the amount of
+        queries it performed. The resource resets ``connection.queries`` on
+        every call.
+        """
+        with self.settings(DEBUG=True):
+            response = resource(request, **kwargs)
+            return response, len(connection.queries)
+
+
+class TestConditionalGet(ResourceTestCase):
+
+    def setUp(self):
+        self.browser = Client()
+        self.browser.login(username='user1', password='pass1')
+
+    def get(self, resource, path='/api/contacts/', **extra):
+        request = RequestFactory().get(path, **extra)
+        request.user = User.objects.get(username='user1')
+        return resource(request)
+
+    def test_etag(self):
+        resource = Resource(ETagContactHandler)
+        response = self.get(resource)
+        etag = response['ETag']
+
+        response = self.get(resource, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(304, response.status_code)
+        self.assertEqual('', response.content)
+        self.assertEqual(etag, response['ETag'])
+
+        # Other representations have other ETags
+        response = self.get(resource, '/api/contacts/?field=name',
+                            HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(200, response.status_code)
+        self.assertNotEqual(etag, response['ETag'])
+
+        # Modifications change the ETag
+        Contact.objects.filter(id=1).update(name='modified')
+        response = self.get(resource, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(200, response.status_code)
+        self.assertNotEqual(etag, response['ETag'])
+
+    def test_no_etag(self):
+        """
+        Handlers opt in to ETags.
+        """
+        response = self.browser.get('/api/contacts/')
+        self.assertFalse(response.has_header('ETag'))
+
+    def test_etag_debug(self):
+        """
+        The ETag leaves out the debug messages, and the response is
+        serialized once.
+        """
+        resource = Resource(ETagContactHandler)
+        etag = self.get(resource)['ETag']
+
+        serialized = []
+        serialize_result = resource.serialize_result
+
+        def counted(result, *args):
+            serialized.append(result)
+            return serialize_result(result, *args)
+        resource.serialize_result = counted
+
+        with self.settings(DEBUG=True):
+            response = self.get(resource)
+        self.assertEqual(etag, response['ETag'])
+        self.assertIn('debug', json.loads(response.content))
+        self.assertEqual(1, len(serialized))
+
+        with self.settings(DEBUG=True):
+            response = self.get(resource, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(304, response.status_code)
+        self.assertEqual(1, len(serialized))
+
+    def test_etag_validator(self):
+        """
+        With a validator, matching requests are answered before the request
+        is executed.
+        """
+        resource = Resource(ValidatedContactHandler)
+        request = RequestFactory().get('/api/contacts/')
+        request.user = User.objects.get(username='user1')
+
+        response = resource(request)
+        etag = response['ETag']
+
+        request.META['HTTP_IF_NONE_MATCH'] = etag
+        response, queries = self.call(resource, request)
+        self.assertEqual(304, response.status_code)
+        # Only the aggregate of the validator
+        self.assertEqual(1, queries)
+
+        Contact.objects.filter(client_id=1, id=5).delete()
+        response = resource(request)
+        self.assertEqual(200, response.status_code)
+        self.assertNotEqual(etag, response['ETag'])
+
+
+class TestResponseCache(ResourceTestCase):
+
+    def setUp(self):
+        cache.cache().clear()
+        self.resource = Resource(CachedContactHandler)
+        self.user = User.objects.get(username='user1')
+
+    def get(self, path='/api/contacts/', **kwargs):
+        """
+        Returns the response of a GET request, along with the amount of
+        queries it performed.
+        """
+        request = RequestFactory().get(path)
+        request.user = self.user
+        return self.call(self.resource, request, **kwargs)
+
+    def test_cached(self):
+        response, queries = self.get()
+        self.assertTrue(queries)
+
+        cached_response, queries = self.get()
+        self.assertEqual(0, queries)
+        self.assertEqual(
+            json.loads(response.content)['data'],
+            json.loads(cached_response.content)['data'],
+        )
+
+        # Other querystrings and URLs are cached separately
+        self.assertEqual(1, self.get('/api/contacts/?field=name')[1])
+        self.assertEqual(1, self.get('/api/contacts/1/', id='1')[1])
+        self.assertEqual(0, self.get('/api/contacts/1/', id='1')[1])
+
+    def test_invalidate_on_write(self):
+        self.get()
+
+        request = RequestFactory().delete('/api/contacts/1/')
+        request.user = self.user
+        self.assertEqual(200, self.resource(request, id='1').status_code)
+
+        response, queries = self.get()
+        self.assertEqual(1, queries)
+        self.assertEqual(4, len(json.loads(response.content)['data']))
+
+    def test_invalidate_dependencies(self):
+        self.get()
+
+        cache.invalidate(ClientHandler)
+        self.assertEqual(1, self.get()[1])
+
+
+class TestMinimal(ResourceTestCase):
+
+    def setUp(self):
+        self.browser = Client()
+        self.browser.login(username='user1', password='pass1')
+
+    def test_prefer(self):
+        pks = list(Contact.objects.filter(client_id=1).values_list('id', flat=True))
+
+        response = self.browser.delete('/api/contacts/',
+                                       HTTP_PREFER='return=minimal')
+        self.assertEqual(200, response.status_code)
+        self.assertEqual('return=minimal', response['Preference-Applied'])
+        self.assertEqual(sorted(pks), sorted(json.loads(response.content)['data']))
+
+    def test_querystring(self):
+        response = self.browser.delete('/api/contacts/1/?minimal=count')
+        self.assertFalse(response.has_header('Preference-Applied'))
+        self.assertEqual(1, json.loads(response.content)['data'])
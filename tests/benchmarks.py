@@ -0,0 +1,322 @@
+#!/usr/bin/env python
+"""
+Benchmarks of django-icetea, on the data of the test app.
+
+Usage::
+
+    benchmarks.py [<benchmark> ...] [--records=<amount>] [--repeat=<times>]
+
+Runs all benchmarks if none is given. Benchmarks run on an in-memory test
+database.
+"""
+import os
+import resource
+import sys
+import time
+import timeit
+from optparse import OptionParser
+
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "sample.settings")
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+def setup():
+    """
+    Sets up Django, and creates the test database.
+    """
+    import django
+    try:
+        django.setup()
+    except AttributeError:
+        pass
+
+    from django.db import connection
+    from django.test.utils import setup_test_environment
+    setup_test_environment()
+    connection.creation.create_test_db(verbosity=0)
+
+
+def create_contacts(amount):
+    """
+    Creates I{amount} contacts, evenly spread over 10 clients.
+    """
+    from app.models import Client, Contact
+
+    clients = [
+        Client.objects.create(name='Client %d' % i) for i in range(10)
+    ]
+    Contact.objects.bulk_create([
+        Contact(
+            client=clients[i % len(clients)],
+            name=u'Contact %d' % i,
+            surname=u'Surname \u20ac%d' % i,
+            gender='MF'[i % 2],
+        ) for i in xrange(amount)
+    ])
+
+
+def report(name, timings, size=None, memory=None):
+    best = min(timings)
+    line = '    %-32s %10.2f ms' % (name, best * 1000)
+    if size is not None:
+        line += ' %12d bytes' % size
+    if memory is not None:
+        line += ' %12d KB max RSS growth' % memory
+    print line
+
+
+def bench_json(options):
+    """
+    JSON backends, rendering the serialized contacts indented and compact.
+    """
+    from django.conf import settings
+
+    from icetea.emitters import Emitter, JSONEmitter, JSON_BACKENDS
+
+    from app.handlers import ContactHandler
+    from app.models import Contact
+
+    handler = ContactHandler()
+    Emitter.TYPEMAPPER[handler] = Contact
+    fields = ('name', 'surname', 'gender', 'client')
+    data = {
+        'data': Emitter(
+            handler, Contact.objects.select_related('client'), fields
+        ).construct(),
+        'total': options.records,
+    }
+
+    for backend in [None] + sorted(JSON_BACKENDS):
+        settings.ICETEA_JSON_BACKEND = backend
+        for compact in (False, True):
+            emitter = JSONEmitter(handler, data)
+            try:
+                output = emitter.dumps(data, compact)
+            except ImportError:
+                print '    %-32s not installed' % backend
+                break
+
+            timings = timeit.repeat(
+                lambda: emitter.dumps(data, compact),
+                number=1, repeat=options.repeat,
+            )
+            report('%s (%s)' % (backend or 'auto',
+                                compact and 'compact' or 'indented'),
+                   timings, len(output.encode('utf-8')))
+
+
+def measure(function):
+    """
+    Runs I{function} in a forked child process, and returns its duration in
+    seconds and the growth of the maximum resident set size in kilobytes.
+    Forking isolates the memory that I{function} allocates.
+    """
+    read, write = os.pipe()
+    pid = os.fork()
+    if pid == 0:
+        os.close(read)
+        before = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        started = time.time()
+        function()
+        duration = time.time() - started
+        after = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        os.write(write, '%f %d' % (duration, after - before))
+        os._exit(0)
+
+    os.close(write)
+    result = os.read(read, 1024)
+    os.close(read)
+    os.waitpid(pid, 0)
+    duration, memory = result.split()
+    return float(duration), int(memory)
+
+
+def bench_slice(options):
+    """
+    Stepped slicing of the contacts, in Python and sampled by primary key.
+    """
+    from icetea.handlers import BaseHandler
+
+    from app.handlers import ContactHandler
+    from app.models import Contact
+
+    handler = ContactHandler()
+    data = Contact.objects.order_by('name', 'id')
+    step = max(1, options.records // 1000)
+    slice = '0:%d:%d' % (options.records, step)
+
+    strategies = (
+        ('python', lambda: list(BaseHandler.slice_data.im_func(handler, data, slice))),
+        ('sampled', lambda: list(handler.slice_data(data, slice))),
+    )
+    for name, function in strategies:
+        timings, memory = [], []
+        for i in range(options.repeat):
+            duration, rss = measure(function)
+            timings.append(duration)
+            memory.append(rss)
+        report('%s (%s)' % (name, slice), timings, memory=max(memory))
+
+
+def create_memberships(groups, per_contact):
+    """
+    Creates I{groups} groups, and adds every contact to I{per_contact} random
+    groups.
+    """
+    import random
+
+    from app.models import Contact, Group
+
+    random.seed(0)
+    groups = [Group.objects.create() for i in range(groups)]
+    through = Group.members.through
+    memberships = []
+    for contact_id in Contact.objects.values_list('id', flat=True):
+        for group in random.sample(groups, per_contact):
+            memberships.append(through(group_id=group.id, contact_id=contact_id))
+    through.objects.bulk_create(memberships, batch_size=500)
+    return [group.id for group in groups]
+
+
+def bench_in_all(options):
+    """
+    Strategies of the ``__in_all`` filter, on contacts in 5 of 20 groups.
+    """
+    from icetea.custom_filters import IN_ALL_STRATEGIES, in_all_filter, \
+        in_all_strategy
+
+    from app.models import Contact
+
+    groups = create_memberships(20, 5)
+    data = Contact.objects.all()
+
+    for count in (1, 2, 3, 5, 10):
+        values = [str(group) for group in groups[:count]]
+        print '    %d value(s), auto: %s' % (count, in_all_strategy(data, values))
+        for strategy in sorted(IN_ALL_STRATEGIES):
+            function = lambda: list(in_all_filter(
+                data, 'group__in_all', values, strategy
+            ).values_list('id', flat=True))
+            size = len(function())
+            timings = timeit.repeat(function, number=1, repeat=options.repeat)
+            report('%s (%d matches)' % (strategy, size), timings)
+
+
+def bench_isearch(options):
+    """
+    The ``__isearch`` filter on the surnames of the contacts, with an
+    ``iexact`` lookup per value, and on their lower-cased shadow column.
+    """
+    from django.db.models import Q
+
+    from icetea.custom_filters import isearch_filter
+
+    from app.models import Contact
+
+    data = Contact.objects.all()
+    for count in (10, 200, 500):
+        values = [u'SURNAME \u20ac%d' % i for i in xrange(0, count * 7, 7)]
+        query = reduce(lambda query, value: query | Q(surname__iexact=value),
+                       values, Q())
+        strategies = (
+            ('iexact', lambda: list(data.filter(query).values_list('id', flat=True))),
+            ('shadow', lambda: list(isearch_filter(
+                data, 'surname__isearch', values).values_list('id', flat=True))),
+        )
+        for name, function in strategies:
+            size = len(function())
+            timings = timeit.repeat(function, number=1, repeat=options.repeat)
+            report('%s (%d values, %d matches)' % (name, count, size), timings)
+
+
+def bench_fulltext(options):
+    """
+    Searches of the names and surnames of the contacts, with the tuple form
+    of ``ModelHandler.filters`` and with the ``__fulltext`` filter.
+    """
+    from icetea.custom_filters import fulltext_filter
+
+    from app.handlers import ContactHandler
+    from app.models import Contact, contact_fulltext
+
+    contact_fulltext.update(list(Contact.objects.all()))
+
+    handler = ContactHandler()
+    data = Contact.objects.all()
+    for values in (['Contact 7'], [u'Surname \u20ac123', 'Contact 456']):
+        strategies = (
+            ('icontains', lambda: list(handler.filter_data(
+                None, data, ('name', 'surname'), values).values_list('id', flat=True))),
+            ('fulltext', lambda: list(fulltext_filter(
+                data, 'fulltext__fulltext', values).values_list('id', flat=True))),
+        )
+        for name, function in strategies:
+            size = len(function())
+            timings = timeit.repeat(function, number=1, repeat=options.repeat)
+            report('%s (%d values, %d matches)' % (name, len(values), size),
+                   timings)
+
+
+def bench_filter_cache(options):
+    """
+    Repeated ``__in_all`` filtering of the contacts in 3 of 20 groups,
+    without and with the filter cache.
+    """
+    from django.test.client import RequestFactory
+
+    from icetea import cache
+    from icetea.handlers import ModelHandler
+
+    from app.models import Contact
+
+    class Handler(ModelHandler):
+        model = Contact
+        read = True
+        filters = dict(group='group__in_all')
+
+    groups = create_memberships(20, 5)
+    path = '/?' + '&'.join('group=%d' % group for group in groups[:3])
+    request = RequestFactory().get(path)
+
+    for filter_cache in (False, True):
+        cache.cache().clear()
+        handler = Handler()
+        handler.filter_cache = filter_cache
+        function = lambda: list(handler.data_set(request).values_list('id', flat=True))
+        size = len(function())
+        timings = timeit.repeat(function, number=1, repeat=options.repeat)
+        report('%s (%d matches)' % (filter_cache and 'cached' or 'uncached', size),
+               timings)
+
+
+BENCHMARKS = (
+    ('json', bench_json),
+    ('slice', bench_slice),
+    ('in_all', bench_in_all),
+    ('isearch', bench_isearch),
+    ('fulltext', bench_fulltext),
+    ('filter_cache', bench_filter_cache),
+)
+
+
+def main():
+    parser = OptionParser(usage=__doc__.strip())
+    parser.add_option('--records', type='int', default=20000,
+                      help='Amount of records to benchmark on')
+    parser.add_option('--repeat', type='int', default=5,
+                      help='Times to repeat every measurement')
+    options, args = parser.parse_args()
+
+    setup()
+    create_contacts(options.records)
+
+    for name, benchmark in BENCHMARKS:
+        if args and name not in args:
+            continue
+        print '%s: %s' % (name, benchmark.__doc__.strip())
+        benchmark(options)
+
+
+if __name__ == '__main__':
+    main()